@@ -8,12 +8,14 @@ from langchain_openai import AzureChatOpenAI
 from langgraph.graph import StateGraph, END
 from config.settings import AZURE_OPENAI_CONFIG
 from models.state import MeetingQAState
+from utils.rate_limiter import RateLimitedLLM
 
 # 분리된 모듈들 import
 from .steps import (
     QuestionProcessor,
     RAGSearchProcessor,
     ScriptFetcher,
+    ScriptPipeline,
     TextProcessor,
     AnswerGenerator,
     QualityEvaluator,
@@ -22,24 +24,35 @@ from .steps import (
 
 logger = logging.getLogger(__name__)
 
+# 업스트림 서킷이 열렸을 때 단계별 축소 응답
+UPSTREAM_UNAVAILABLE_MESSAGES = {
+    "rag_service_unavailable": "현재 회의록 검색 서비스에 일시적인 장애가 있어 답변을 드릴 수 없습니다. 잠시 후 다시 시도해 주세요.",
+    "script_service_unavailable": "현재 회의록 원문 서비스에 일시적인 장애가 있어 답변을 드릴 수 없습니다. 잠시 후 다시 시도해 주세요."
+}
+
 class MeetingQAAgent:
     """회의록 QA Agent - 리팩토링된 버전"""
     
     def __init__(self):
-        # LLM 초기화
-        self.llm = AzureChatOpenAI(
+        # LLM 초기화 (배포별 TPM/RPM 스케줄러를 거쳐 호출, 429 재시도는 스케줄러가 담당)
+        self.llm = RateLimitedLLM(AzureChatOpenAI(
             api_key=AZURE_OPENAI_CONFIG["api_key"],
             azure_endpoint=AZURE_OPENAI_CONFIG["endpoint"],
             api_version=AZURE_OPENAI_CONFIG["api_version"],
             azure_deployment=AZURE_OPENAI_CONFIG["deployment_name"],
-            temperature=1
-        )
+            temperature=1,
+            max_retries=0
+        ))
         
         # 분리된 모듈들 초기화
         self.question_processor = QuestionProcessor(self.llm)
-        self.rag_processor = RAGSearchProcessor()
-        self.script_fetcher = ScriptFetcher()
         self.text_processor = TextProcessor()
+        # TextProcessor의 임베딩 매니저를 RAG 검색에서도 재사용
+        self.rag_processor = RAGSearchProcessor(self.text_processor.embedding_manager)
+        # 요약본 갱신 시각으로 원본 스크립트 캐시 검증
+        self.script_fetcher = ScriptFetcher(self.rag_processor.rag_client.get_summary_timestamp)
+        # 원본 스크립트 조회/청킹/임베딩을 스크립트 단위로 겹쳐 처리
+        self.script_pipeline = ScriptPipeline(self.script_fetcher, self.text_processor)
         self.answer_generator = AnswerGenerator(self.llm)
         self.quality_evaluator = QualityEvaluator(self.llm)
         self.memory_manager = MemoryManager(self.llm)
@@ -58,8 +71,7 @@ class MeetingQAAgent:
         builder.add_node("handle_content_filter", self._handle_content_filter)
         builder.add_node("search_rag", self.rag_processor.get_all_rag_summaries)
         builder.add_node("get_specific_summary", self.rag_processor.get_summary_by_id)
-        builder.add_node("fetch_scripts", self.script_fetcher.fetch_original_scripts)
-        builder.add_node("process_scripts", self.text_processor.process_original_scripts)
+        builder.add_node("fetch_and_process_scripts", self.script_pipeline.fetch_and_process_scripts)
         builder.add_node("select_chunks", self.text_processor.select_relevant_chunks)
         builder.add_node("generate_answer", self.answer_generator.generate_final_answer)
         builder.add_node("evaluate_answer", self.quality_evaluator.evaluate_answer_quality)
@@ -93,18 +105,36 @@ class MeetingQAAgent:
                 "specific_search": "get_specific_summary" # 특정 스크립트 검색
             }
         )
-        builder.add_edge("search_rag", "fetch_scripts")
+        # 업스트림 서킷이 열려 있으면 축소 응답 후 종료
+        builder.add_node("handle_upstream_unavailable", self._handle_upstream_unavailable)
+        builder.add_edge("handle_upstream_unavailable", END)
+
+        builder.add_conditional_edges(
+            "search_rag",
+            self._check_upstream_available,
+            {
+                "upstream_unavailable": "handle_upstream_unavailable",  # RAG 서비스 차단 시 축소 응답
+                "available": "fetch_and_process_scripts"
+            }
+        )
         # get_specific_summary 후 문서 없음 처리
         builder.add_conditional_edges(
             "get_specific_summary",
             self._check_document_found,
             {
                 "document_not_found": END,  # 문서 없음 시 즉시 종료
-                "document_found": "fetch_scripts"  # 문서 있음 시 계속
+                "upstream_unavailable": "handle_upstream_unavailable",  # RAG 서비스 차단 시 축소 응답
+                "document_found": "fetch_and_process_scripts"  # 문서 있음 시 계속
+            }
+        )
+        builder.add_conditional_edges(
+            "fetch_and_process_scripts",
+            self._check_upstream_available,
+            {
+                "upstream_unavailable": "handle_upstream_unavailable",  # 회의록 서비스 차단 시 축소 응답
+                "available": "select_chunks"
             }
         )
-        builder.add_edge("fetch_scripts", "process_scripts")
-        builder.add_edge("process_scripts", "select_chunks")
         builder.add_edge("select_chunks", "generate_answer")
         
         # generate_answer 후 콘텐츠 필터 체크
@@ -165,9 +195,30 @@ class MeetingQAAgent:
         if current_step == "document_not_found":
             logger.info("요청된 문서를 찾을 수 없어 프로세스를 종료합니다.")
             return "document_not_found"
+        elif current_step in UPSTREAM_UNAVAILABLE_MESSAGES:
+            return "upstream_unavailable"
         else:
             return "document_found"
     
+    def _check_upstream_available(self, state: MeetingQAState) -> str:
+        """업스트림 서비스 차단(서킷 열림) 여부 확인"""
+        if state.get("current_step", "") in UPSTREAM_UNAVAILABLE_MESSAGES:
+            return "upstream_unavailable"
+        return "available"
+    
+    def _handle_upstream_unavailable(self, state: MeetingQAState) -> MeetingQAState:
+        """업스트림 장애 시 축소 응답 생성 (대기 없이 즉시 반환)"""
+        logger.warning(f"업스트림 서비스 차단으로 축소 응답을 반환합니다: {state.get('current_step')}")
+        
+        return {
+            **state,
+            "final_answer": UPSTREAM_UNAVAILABLE_MESSAGES[state.get("current_step", "")],
+            "sources": [],
+            "confidence_score": 0.0,
+            "used_script_ids": [],
+            "current_step": "upstream_unavailable_handled"
+        }
+    
     def _handle_content_filter(self, state: MeetingQAState) -> MeetingQAState:
         """콘텐츠 필터 감지 시 안전 응답 생성"""
         logger.warning("콘텐츠 필터가 감지되어 안전 응답을 생성합니다.")
@@ -201,6 +252,10 @@ class MeetingQAAgent:
             logger.info(f"🔍 [DEBUG] - 분기 결정: general_search (기본 챗봇)")
             return "general_search"   # 기본 챗봇
     
+    async def aclose(self) -> None:
+        """공용 HTTP 연결 정리 (앱 종료 시)"""
+        await self.script_fetcher.aclose()
+    
     async def run(self, initial_state: MeetingQAState) -> MeetingQAState:
         """Agent 실행"""
         try:
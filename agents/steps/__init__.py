@@ -5,6 +5,7 @@ Agent 단계별 모듈들
 from .question_processing import QuestionProcessor
 from .rag_search import RAGSearchProcessor
 from .script_fetch import ScriptFetcher
+from .script_pipeline import ScriptPipeline
 from .text_processing import TextProcessor
 from .answer_generation import AnswerGenerator
 from .quality_evaluation import QualityEvaluator
@@ -14,6 +15,7 @@ __all__ = [
     "QuestionProcessor",
     "RAGSearchProcessor", 
     "ScriptFetcher",
+    "ScriptPipeline",
     "TextProcessor",
     "AnswerGenerator",
     "QualityEvaluator",
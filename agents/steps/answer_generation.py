@@ -24,12 +24,12 @@ class AnswerGenerator:
         if not chunks:
             return []
         
-        # 1차: relevance_score 내림차순 (높은 점수 우선)
+        # 1차: hybrid_score(없으면 relevance_score) 내림차순 (높은 점수 우선)
         # 2차: script_id 오름차순 (동일 점수일 때 일관된 순서)
         # 3차: chunk_index 오름차순 (동일 script_id일 때 일관된 순서)
         sorted_chunks = sorted(chunks, 
                               key=lambda x: (
-                                  -x.get("relevance_score", 0.0),  # 음수로 내림차순
+                                  -x.get("hybrid_score", x.get("relevance_score", 0.0)),  # 음수로 내림차순
                                   x.get("script_id", ""),          # 오름차순
                                   x.get("chunk_index", 0)          # 오름차순
                               ))
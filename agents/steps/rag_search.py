@@ -2,19 +2,31 @@
 2단계: RAG 검색 로직
 """
 
+import asyncio
 import logging
+import re
 from typing import Dict, List
 from services.rag_client import RAGClient
+from services.async_rag_client import get_async_rag_client
+from utils.embeddings import EmbeddingManager
+from utils.similarity import SimilarityIndex
+from utils.circuit_breaker import CircuitOpenError
 from config.settings import RAG_SERVICE_URL
 from models.state import MeetingQAState
 
 logger = logging.getLogger(__name__)
 
+# script_id UUID 형태 검증용 패턴
+UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+
 class RAGSearchProcessor:
     """RAG 검색 처리 클래스"""
     
-    def __init__(self):
+    def __init__(self, embedding_manager: EmbeddingManager = None):
         self.rag_client = RAGClient(RAG_SERVICE_URL)
+        self.async_rag_client = get_async_rag_client()
+        # 에이전트가 넘겨준 임베딩 매니저 공유 (없으면 생성)
+        self.embedding_manager = embedding_manager or EmbeddingManager()
     
     def _deduplicate_summaries(self, summaries: List[Dict]) -> List[Dict]:
         """script_id 기준 중복 제거 (최고 점수만 유지)"""
@@ -25,34 +37,26 @@ class RAGSearchProcessor:
                 seen[script_id] = summary
         return list(seen.values())
     
-    def get_all_rag_summaries(self, state: MeetingQAState) -> MeetingQAState:
-        """2단계: RAG 서비스에서 전체 요약본 호출"""
+    async def get_all_rag_summaries(self, state: MeetingQAState) -> MeetingQAState:
+        """2단계: RAG 서비스에서 전체 요약본 호출 (이벤트 루프에서 비동기 실행)"""
         try:
             processed_question = state.get("processed_question", "")
-            
-            # 전체 요약본 가져오기
-            all_summaries = self.rag_client.get_all_summaries()
-            # all_summaries 구조: Dict[str, Dict[str, List[float]]]
-            
-            # 질문 임베딩 생성 (EmbeddingManager 필요)
-            from utils.embeddings import EmbeddingManager
-            embedding_manager = EmbeddingManager()
-            query_embedding = embedding_manager.embed_query(processed_question)
-            
-            # 유사도 계산 및 선별
-            relevant_summaries = []
-            for script_id, summary_data in all_summaries.items():
-                embedding = summary_data.get("embedding", [])
-                if embedding:
-                    # 코사인 유사도 계산
-                    from utils.embeddings import cosine_similarity
-                    similarity = cosine_similarity(query_embedding, embedding)
-                    
-                    if similarity > 0.7:  # 유사도 임계값
-                        relevant_summaries.append({
-                            "script_id": script_id,
-                            "relevance_score": similarity
-                        })
+            query_embeddings = dict(state.get("query_embeddings") or {})
+            
+            # 전체 요약본 스냅샷(정규화된 float32 행렬 + script_id 테이블)과 질문 임베딩을 동시에 준비
+            # 스냅샷 조회(ETag/증분 동기화)와 임베딩 호출은 동기 API이므로 스레드에서 실행
+            summary_store, query_embedding = await asyncio.gather(
+                asyncio.to_thread(self.rag_client.get_summary_store),
+                asyncio.to_thread(self.embedding_manager.embed_query, processed_question, query_embeddings)
+            )
+            
+            # 유사도 계산 및 선별 (전체 요약본 행렬에 대해 한 번에 계산)
+            relevant_summaries = [
+                {"script_id": script_id, "relevance_score": similarity}
+                for script_id, similarity in summary_store.search(
+                    query_embedding, top_k=5, threshold=0.7, inclusive=False  # 유사도 임계값
+                )
+            ]
             
             # script_id 기준 중복 제거 (최고 점수만 유지)
             relevant_summaries = self._deduplicate_summaries(relevant_summaries)
@@ -70,9 +74,16 @@ class RAGSearchProcessor:
                 **state,
                 "relevant_summaries": relevant_summaries,
                 "selected_script_ids": selected_script_ids,
+                "query_embeddings": query_embeddings,
                 "current_step": "rag_search_completed"
             }
             
+        except CircuitOpenError as e:
+            logger.warning(f"RAG 서비스 차단 중, 축소 응답으로 전환: {str(e)}")
+            return {
+                **state,
+                "current_step": "rag_service_unavailable"
+            }
         except Exception as e:
             logger.error(f"RAG 검색 실패: {str(e)}")
             return {
@@ -82,8 +93,8 @@ class RAGSearchProcessor:
             }
     
     
-    def get_summary_by_id(self, state: MeetingQAState) -> MeetingQAState:
-        """특정 script_id들의 요약본 조회 및 유사도 검색 (상세 챗봇용)"""
+    async def get_summary_by_id(self, state: MeetingQAState) -> MeetingQAState:
+        """특정 script_id들의 요약본 조회 및 유사도 검색 (상세 챗봇용, 이벤트 루프에서 비동기 실행)"""
         try:
             user_selected_script_ids = state.get("user_selected_script_ids", [])
             # user_selected_script_ids (사용자가 선택한 스크립트들) : List[str]
@@ -92,7 +103,7 @@ class RAGSearchProcessor:
                 raise ValueError("user_selected_script_ids가 없습니다.")
 
             # 선택된 요약본 가져오기
-            selected_summaries = self.rag_client.get_summary_by_ids(user_selected_script_ids)
+            selected_summaries = await self.async_rag_client.get_summary_by_ids(user_selected_script_ids)
             
             # 404 오류로 빈 결과가 반환된 경우 예외처리
             if not selected_summaries:
@@ -122,9 +133,11 @@ class RAGSearchProcessor:
             processed_question = state.get("processed_question", "")
             
             # 질문 임베딩 생성
-            from utils.embeddings import EmbeddingManager, cosine_similarity
-            embedding_manager = EmbeddingManager()
-            query_embedding = embedding_manager.embed_query(processed_question)
+            query_embeddings = dict(state.get("query_embeddings") or {})
+            # 임베딩 호출은 동기 API이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+            query_embedding = await asyncio.to_thread(
+                self.embedding_manager.embed_query, processed_question, query_embeddings
+            )
             
             # 선택된 스크립트들의 요약본 조회 및 유사도 검색
             relevant_summaries = []
@@ -143,35 +156,35 @@ class RAGSearchProcessor:
                 else:
                     logger.info(f"🔍 [DEBUG] key='{key}', value={str(value)[:100]}...")
             
+            # 추가 방어 로직: UUID 패턴 검증 + 임베딩 존재 여부 확인
+            valid_script_ids = []
             for script_id, summary_data in selected_summaries.items():
-                try:
-                    # 추가 방어 로직: UUID 패턴 검증
-                    import re
-                    uuid_pattern = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
-                    if not uuid_pattern.match(script_id):
-                        logger.info(f"🚫 [DEBUG] 유효하지 않은 script_id 형태 건너뛰기: {script_id}")
-                        continue
-                        
-                    if summary_data and "embedding" in summary_data:
-                        embedding = summary_data["embedding"]
-                        
-                        # 코사인 유사도 계산
-                        similarity = cosine_similarity(query_embedding, embedding)
-                        
-                        if similarity > 0.7:  # 유사도 임계값
-                            relevant_summaries.append({
-                                "script_id": script_id,
-                                "relevance_score": similarity
-                            })
-                            logger.info(f"✅ [DEBUG] 스크립트 추가: {script_id} (유사도: {similarity:.3f})")
-                        else:
-                            logger.info(f"❌ [DEBUG] 유사도 부족: {script_id} (유사도: {similarity:.3f})")
-                    else:
-                        logger.warning(f"⚠️ [DEBUG] 임베딩 없음: {script_id}, summary_data={summary_data}")
-                        
-                except Exception as e:
-                    logger.warning(f"💥 [DEBUG] 처리 실패: {script_id}, 오류={str(e)}")
+                if not UUID_PATTERN.match(script_id):
+                    logger.info(f"🚫 [DEBUG] 유효하지 않은 script_id 형태 건너뛰기: {script_id}")
                     continue
+                if summary_data and summary_data.get("embedding"):
+                    valid_script_ids.append(script_id)
+                else:
+                    logger.warning(f"⚠️ [DEBUG] 임베딩 없음: {script_id}, summary_data={summary_data}")
+            
+            # 코사인 유사도 계산 (선택된 요약본 행렬에 대해 한 번에 계산)
+            try:
+                index = SimilarityIndex([selected_summaries[sid]["embedding"] for sid in valid_script_ids])
+                scores = index.score(query_embedding) if valid_script_ids else []
+            except Exception as e:
+                logger.warning(f"💥 [DEBUG] 유사도 계산 실패: 오류={str(e)}")
+                valid_script_ids, scores = [], []
+            
+            for script_id, similarity in zip(valid_script_ids, scores):
+                similarity = float(similarity)
+                if similarity > 0.7:  # 유사도 임계값
+                    relevant_summaries.append({
+                        "script_id": script_id,
+                        "relevance_score": similarity
+                    })
+                    logger.info(f"✅ [DEBUG] 스크립트 추가: {script_id} (유사도: {similarity:.3f})")
+                else:
+                    logger.info(f"❌ [DEBUG] 유사도 부족: {script_id} (유사도: {similarity:.3f})")
             
             # script_id 기준 중복 제거 (최고 점수만 유지)
             relevant_summaries = self._deduplicate_summaries(relevant_summaries)
@@ -188,9 +201,16 @@ class RAGSearchProcessor:
                 **state,
                 "relevant_summaries": relevant_summaries,
                 "selected_script_ids": selected_script_ids,
+                "query_embeddings": query_embeddings,
                 "current_step": "specific_rag_search_completed"
             }
             
+        except CircuitOpenError as e:
+            logger.warning(f"RAG 서비스 차단 중, 축소 응답으로 전환: {str(e)}")
+            return {
+                **state,
+                "current_step": "rag_service_unavailable"
+            }
         except Exception as e:
             logger.error(f"특정 스크립트 유사도 검색 실패: {str(e)}")
             return {
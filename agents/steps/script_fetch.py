@@ -2,121 +2,201 @@
 4단계: 원본 스크립트 조회 로직
 """
 
+import asyncio
+import hashlib
 import logging
 import httpx
-from typing import Dict, List
-from config.settings import MEETING_API_URL
-from models.state import MeetingQAState
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from config.settings import (
+    MEETING_API_URL, SCRIPT_CACHE_MAX_BYTES, SCRIPT_CACHE_TTL,
+    SCRIPT_FETCH_SHARD_SIZE, SCRIPT_FETCH_MAX_CONCURRENCY, SCRIPT_FETCH_TIMEOUT, SCRIPT_FETCH_CONNECT_TIMEOUT
+)
+from utils.circuit_breaker import get_circuit_breaker
+from utils.script_cache import ScriptCache
 
 logger = logging.getLogger(__name__)
 
 class ScriptFetcher:
     """원본 스크립트 조회 처리 클래스"""
     
-    def __init__(self):
+    def __init__(self, version_source: Optional[Callable[[str], Optional[str]]] = None):
         self.meeting_api_url = MEETING_API_URL
+        # 원본 스크립트 캐시 (같은 회의에 대한 반복 질문은 네트워크 생략)
+        self.cache = ScriptCache(SCRIPT_CACHE_MAX_BYTES, SCRIPT_CACHE_TTL) if SCRIPT_CACHE_MAX_BYTES > 0 else None
+        # script_id → 갱신 시각 (캐시 검증용, 예: RAG 요약본 갱신 시각)
+        self.version_source = version_source
+        # 프로세스 공용 비동기 클라이언트 (keep-alive 연결 재사용, 첫 호출 시 생성)
+        self._client: Optional[httpx.AsyncClient] = None
+        # 회의록 서비스 서킷 브레이커 (장애 시 즉시 실패, 조회 GET은 헤지 요청)
+        self.breaker = get_circuit_breaker("meeting_api")
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(SCRIPT_FETCH_TIMEOUT, connect=SCRIPT_FETCH_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=max(SCRIPT_FETCH_MAX_CONCURRENCY * 2, 10),
+                    max_keepalive_connections=max(SCRIPT_FETCH_MAX_CONCURRENCY, 5)
+                )
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """연결 풀 종료"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def _get_scripts(self, api_url: str, params: Dict[str, str]) -> httpx.Response:
+        """서킷 브레이커를 거친 스크립트 조회 GET (5xx/연결 오류는 실패로 집계)"""
+        client = self._get_client()
+
+        async def _send() -> httpx.Response:
+            response = await client.get(api_url, params=params)
+            if response.status_code >= 500:
+                response.raise_for_status()
+            return response
+        return await self.breaker.acall(_send, hedge=True)
     
-    def fetch_original_scripts(self, state: MeetingQAState) -> MeetingQAState:
-        """4단계: 외부 회의록 API에서 원본 스크립트 직접 조회
+    def _normalize_script(self, item: Dict) -> Optional[Dict]:
+        """회의록 API 항목을 original_scripts 형식으로 정규화 (script_id가 없으면 None)"""
+        script_id = item.get("scriptId") or item.get("id") or item.get("meeting_id")
+        if not script_id:
+            return None
+
+        # 1) 기본: scriptText 사용
+        script_text = item.get("scriptText")
+
+        # 2) 대안: segments 배열 → speaker: text 로 합쳐서 원문 구성 (발화 단위 청킹용으로 segments도 보관)
+        segments = None
+        if not script_text:
+            raw_segments = item.get("segments")
+            if isinstance(raw_segments, list):
+                segments = []
+                lines = []
+                for i, seg in enumerate(raw_segments):
+                    try:
+                        speaker = (seg.get("speaker") or "").strip()
+                        text = (seg.get("text") or "").strip()
+                        if not text:
+                            continue
+                        line = f"{speaker}: {text}" if speaker else text
+                        lines.append(line)
+                        segments.append({
+                            "segment_id": seg.get("segmentId") or seg.get("id") or i,
+                            "speaker": speaker,
+                            "text": text
+                        })
+                    except Exception:
+                        continue
+                script_text = "\n".join(lines)
+
+        script_text = script_text or ""
+        
+        # 제목과 타임스탬프 추출
+        title = item.get("title", "")
+        timestamp = item.get("timestamp", "")
+        
+        script = {
+            "script_id": script_id,
+            "content": script_text,
+            "title": title,
+            "timestamp": timestamp,  # 추가 (날짜 정보)
+            "content_hash": hashlib.sha256(script_text.encode("utf-8")).hexdigest(),  # 청크 저장소 버전 검증용
+            "filename": f"meeting_{script_id}.txt"
+        }
+        if segments:
+            script["segments"] = segments
+        return script
+
+    async def _fetch_shard(self, script_ids: List[str]) -> Dict[str, Dict]:
+        """회의록 API 다중 조회 한 번 → {script_id: 정규화된 스크립트}
 
         사양:
-        - 전체:  GET /api/scripts                      → 배열
         - 단일:  GET /api/scripts?ids=abc123           → 객체
         - 다중:  GET /api/scripts?ids=a,b,c            → 배열 (요청 순서 보장)
         응답 필드: { "scriptId", "title", "timestamp", "segments" | "scriptText" }
         """
+        params = {"ids": ",".join(script_ids)}
+        api_url = f"{self.meeting_api_url}/api/scripts"
+
+        response = await self._get_scripts(api_url, params)
+        if response.status_code != 200:
+            raise Exception(f"API 호출 실패: {response.status_code}")
+        result = response.json()
+
+        # 배열이 아닐 수 있어 보정
+        items = result if isinstance(result, list) else [result]
+
+        scripts = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            script = self._normalize_script(item)
+            if script is not None:
+                scripts.setdefault(str(script["script_id"]), script)
+        return scripts
+
+    @staticmethod
+    def order_scripts(script_ids: List[str], by_id: Dict[str, Dict]) -> List[Dict]:
+        """요청 순서대로 스크립트 정렬 (중복/누락 ID 제외)"""
+        return [by_id[sid] for sid in dict.fromkeys(str(sid) for sid in script_ids) if sid in by_id]
+
+    def _cache_version(self, script_id: str) -> Optional[str]:
+        """캐시 검증용 버전 (요약본 갱신 시각, 모르면 None → TTL 검증)"""
+        if self.version_source is None:
+            return None
         try:
-            selected_script_ids = state.get("selected_script_ids", [])
-            
-            if not selected_script_ids:
-                raise ValueError("selected_script_ids가 없습니다.")
-
-            # API 호출
-            params = {"ids": ",".join(selected_script_ids)}
-            api_url = f"{self.meeting_api_url}/api/scripts"
-
-            with httpx.Client(timeout=30) as client:
-                response = client.get(api_url, params=params)
-                if response.status_code != 200:
-                    raise Exception(f"API 호출 실패: {response.status_code}")
-                result = response.json()
-
-            # 배열이 아닐 수 있어 보정
-            items = result if isinstance(result, list) else [result]
-
-            # 요청 순서 보장: 응답이 순서를 보장한다고 했지만 안전하게 재정렬
-            by_id = {}
-            for it in items:
-                if isinstance(it, dict):
-                    sid = it.get("scriptId") or it.get("id") or it.get("meeting_id")
-                    if sid:
-                        by_id[str(sid)] = it
-            items = [by_id[sid] for sid in selected_script_ids if sid in by_id]
-            original_scripts = []
-            seen_script_ids = set()  # 중복 방지용 집합
-            
-            for item in items:
-                if not isinstance(item, dict):
-                    continue
-                script_id = item.get("scriptId") or item.get("id") or item.get("meeting_id")
-                if not script_id:
-                    continue
-                
-                # 중복 스크립트 ID 건너뛰기
-                if script_id in seen_script_ids:
-                    logger.debug(f"중복된 스크립트 ID 건너뛰기: {script_id}")
-                    continue
-                seen_script_ids.add(script_id)
-
-                # 1) 기본: scriptText 사용
-                script_text = item.get("scriptText")
-
-                # 2) 대안: segments 배열 → speaker: text 로 합쳐서 원문 구성
-                if not script_text:
-                    segments = item.get("segments")
-                    if isinstance(segments, list):
-                        lines = []
-                        for seg in segments:
-                            try:
-                                speaker = (seg.get("speaker") or "").strip()
-                                text = (seg.get("text") or "").strip()
-                                if not text:
-                                    continue
-                                line = f"{speaker}: {text}" if speaker else text
-                                lines.append(line)
-                            except Exception:
-                                continue
-                        script_text = "\n".join(lines)
-
-                script_text = script_text or ""
-                
-                # 제목과 타임스탬프 추출 (디버깅 로그 추가)
-                title = item.get("title", "")
-                timestamp = item.get("timestamp", "")
-                
-                
-                original_scripts.append({
-                    "script_id": script_id,
-                    "content": script_text,
-                    "title": title,
-                    "timestamp": timestamp,  # 추가 (날짜 정보)
-                    "filename": f"meeting_{script_id}.txt"
-                })
-            
-            logger.info(f"원본 스크립트 다운로드 완료: {len(original_scripts)}개 파일")
-            
-            return {
-                **state,
-                "original_scripts": original_scripts,
-                "current_step": "scripts_fetched"
-            }
-            
-        except Exception as e:
-            logger.error(f"원본 스크립트 다운로드 실패: {str(e)}")
-            return {
-                **state,
-                "error_message": f"원본 스크립트 다운로드 실패: {str(e)}",
-                "current_step": "fetch_scripts_failed"
-            }
-    
+            return self.version_source(script_id)
+        except Exception:
+            return None
+
+    async def iter_scripts(self, script_ids: List[str]) -> AsyncIterator[Dict]:
+        """script_id 목록의 스크립트를 준비되는 순서대로 반환
+
+        캐시 적중분을 먼저 내보내고, 나머지는 SCRIPT_FETCH_SHARD_SIZE개씩 나눠 동시에 조회하며
+        (동시 요청 수 제한) 먼저 끝난 분할부터 내보낸다. 중복 ID는 한 번만 조회한다.
+        """
+        requested_ids = list(dict.fromkeys(str(sid) for sid in script_ids))
+        versions = {sid: self._cache_version(sid) for sid in requested_ids}
+
+        missing_ids = []
+        for sid in requested_ids:
+            cached = self.cache.get(sid, versions[sid]) if self.cache is not None else None
+            if cached is not None:
+                yield cached
+            else:
+                missing_ids.append(sid)
+        if not missing_ids:
+            return
+
+        shards = [
+            missing_ids[start:start + SCRIPT_FETCH_SHARD_SIZE]
+            for start in range(0, len(missing_ids), SCRIPT_FETCH_SHARD_SIZE)
+        ]
+        semaphore = asyncio.Semaphore(SCRIPT_FETCH_MAX_CONCURRENCY)
+
+        async def _bounded(shard: List[str]) -> Tuple[List[str], Dict[str, Dict]]:
+            async with semaphore:
+                return shard, await self._fetch_shard(shard)
+
+        logger.info(
+            f"원본 스크립트 조회: 캐시 {len(requested_ids) - len(missing_ids)}개, "
+            f"API {len(missing_ids)}개 ({len(shards)}개 요청)"
+        )
+        tasks = [asyncio.ensure_future(_bounded(shard)) for shard in shards]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                shard, fetched = await next_done
+                for sid in shard:
+                    script = fetched.get(sid)
+                    if script is None:
+                        continue
+                    if self.cache is not None:
+                        self.cache.put(sid, script, versions[sid])
+                    yield script
+        finally:
+            for task in tasks:
+                task.cancel()
+
     # 개별 by_id 메서드는 다중 GET로 대체되므로 제거 (필요 시 복구)
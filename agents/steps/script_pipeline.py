@@ -0,0 +1,153 @@
+"""
+4~5단계: 원본 스크립트 조회 → 청킹 → 임베딩 스트리밍 파이프라인
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Tuple
+
+from agents.steps.script_fetch import ScriptFetcher
+from agents.steps.text_processing import TextProcessor
+from config.settings import SCRIPT_PIPELINE_QUEUE_SIZE, SCRIPT_PIPELINE_EMBED_WORKERS
+from models.state import MeetingQAState
+from utils.circuit_breaker import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# 단계 종료 표시
+_DONE = object()
+
+class ScriptPipeline:
+    """스크립트 단위 스트리밍 처리 클래스
+
+    - 조회: ScriptFetcher.iter_scripts가 캐시 적중분과 먼저 끝난 분할 조회 결과부터 내보냄
+    - 청킹: 도착한 스크립트를 바로 정리/청킹 (청크 저장소 적중 시 생략)
+    - 임베딩: SCRIPT_PIPELINE_EMBED_WORKERS개 작업자가 그때까지 청킹된 스크립트를 모두 모아 한 번에 임베딩
+    단계 사이 큐는 SCRIPT_PIPELINE_QUEUE_SIZE로 제한해 뒤 단계가 밀리면 앞 단계가 기다린다.
+    결과(original_scripts, chunked_scripts)는 요청 순서대로 재조립한다.
+    """
+
+    def __init__(self, script_fetcher: ScriptFetcher, text_processor: TextProcessor):
+        self.script_fetcher = script_fetcher
+        self.text_processor = text_processor
+
+    async def _fetch_stage(self, script_ids: List[str], by_id: Dict[str, Dict], chunk_queue: asyncio.Queue) -> None:
+        # 실패/취소 시에는 종료 표시 없이 끝낸다 (나머지 단계는 fetch_and_process_scripts가 취소)
+        async for script in self.script_fetcher.iter_scripts(script_ids):
+            by_id[str(script["script_id"])] = script
+            await chunk_queue.put(script)
+        await chunk_queue.put(_DONE)
+
+    async def _chunk_stage(self, chunk_queue: asyncio.Queue, embed_queue: asyncio.Queue,
+                           chunks_by_script: Dict[str, List[Dict]]) -> None:
+        while True:
+            script = await chunk_queue.get()
+            if script is _DONE:
+                break
+            script_id = script["script_id"]
+            if script_id in chunks_by_script:
+                continue
+
+            version, stored_chunks = self.text_processor.lookup_stored_chunks(script)
+            if stored_chunks is not None:
+                chunks_by_script[script_id] = stored_chunks
+                continue
+
+            chunks = await asyncio.to_thread(self.text_processor.chunk_script, script)
+            chunks_by_script[script_id] = chunks
+            await embed_queue.put((script, version, chunks))
+        for _ in range(SCRIPT_PIPELINE_EMBED_WORKERS):
+            await embed_queue.put(_DONE)
+
+    @staticmethod
+    def _drain_ready(embed_queue: asyncio.Queue, first) -> Tuple[List[Tuple[Dict, str, List[Dict]]], bool]:
+        """첫 항목과 큐에 이미 쌓인 항목을 모아 (임베딩할 스크립트들, 종료 표시를 받았는지)"""
+        batch = []
+        item = first
+        while True:
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+            try:
+                item = embed_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return batch, False
+
+    def _embed_batch(self, batch: List[Tuple[Dict, str, List[Dict]]]) -> Dict[str, List[Dict]]:
+        """여러 스크립트의 새 청크를 한 번에 임베딩하고 청크 저장소에 저장"""
+        embedded = self.text_processor.embed_chunks({script["script_id"]: chunks for script, _, chunks in batch})
+        for script, version, _ in batch:
+            self.text_processor.store_chunks(script, version, embedded[script["script_id"]])
+        return embedded
+
+    async def _embed_stage(self, embed_queue: asyncio.Queue, chunks_by_script: Dict[str, List[Dict]]) -> None:
+        done = False
+        while not done:
+            batch, done = self._drain_ready(embed_queue, await embed_queue.get())
+            if not batch:
+                continue
+            if len(batch) > 1:
+                logger.debug(f"스크립트 {len(batch)}개 임베딩 배치 묶음")
+            embedded = await asyncio.to_thread(self._embed_batch, batch)
+            chunks_by_script.update(embedded)
+
+    async def fetch_and_process_scripts(self, state: MeetingQAState) -> MeetingQAState:
+        """4~5단계: 원본 스크립트를 받는 대로 청킹/임베딩 (조회와 임베딩 지연이 겹치도록)"""
+        try:
+            selected_script_ids = state.get("selected_script_ids", [])
+
+            if not selected_script_ids:
+                raise ValueError("selected_script_ids가 없습니다.")
+
+            by_id: Dict[str, Dict] = {}
+            chunks_by_script: Dict[str, List[Dict]] = {}
+            chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=SCRIPT_PIPELINE_QUEUE_SIZE)
+            embed_queue: asyncio.Queue = asyncio.Queue(maxsize=SCRIPT_PIPELINE_QUEUE_SIZE)
+
+            tasks = [
+                asyncio.ensure_future(self._fetch_stage(selected_script_ids, by_id, chunk_queue)),
+                asyncio.ensure_future(self._chunk_stage(chunk_queue, embed_queue, chunks_by_script)),
+                *(
+                    asyncio.ensure_future(self._embed_stage(embed_queue, chunks_by_script))
+                    for _ in range(SCRIPT_PIPELINE_EMBED_WORKERS)
+                )
+            ]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # 한 단계가 실패하면 나머지 단계도 중단
+                for task in tasks:
+                    task.cancel()
+
+            # 요청 순서대로 재조립 (순차 처리와 같은 결과)
+            original_scripts = self.script_fetcher.order_scripts(selected_script_ids, by_id)
+            all_chunked_scripts = [
+                chunk
+                for script in original_scripts
+                for chunk in chunks_by_script.get(script["script_id"], [])
+            ]
+
+            logger.info(
+                f"원본 스크립트 스트리밍 처리 완료: {len(original_scripts)}개 파일, {len(all_chunked_scripts)}개 청크"
+            )
+
+            return {
+                **state,
+                "original_scripts": original_scripts,
+                "chunked_scripts": all_chunked_scripts,
+                "current_step": "scripts_processed"
+            }
+
+        except CircuitOpenError as e:
+            logger.warning(f"회의록 서비스 차단 중, 축소 응답으로 전환: {str(e)}")
+            return {
+                **state,
+                "current_step": "script_service_unavailable"
+            }
+        except Exception as e:
+            logger.error(f"원본 스크립트 처리 실패: {str(e)}")
+            return {
+                **state,
+                "error_message": f"원본 스크립트 처리 실패: {str(e)}",
+                "current_step": "process_scripts_failed"
+            }
@@ -2,11 +2,22 @@
 5단계: 텍스트 처리 로직
 """
 
+import hashlib
 import logging
-from typing import Dict, List
-from utils.text_processing import chunk_text, clean_text
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from utils.text_processing import chunk_speaker_turns, chunk_text, clean_text, hash_chunk_texts, speaker_turn_text
 from utils.embeddings import EmbeddingManager, find_most_relevant_chunks
-from config.settings import DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP
+from utils.chunk_store import ScriptChunkStore
+from utils.bm25 import BM25Index
+from utils.simhash import collapse_near_duplicates, content_digest, simhash
+from utils.similarity import SimilarityIndex, normalize_rows
+from config.settings import (
+    DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP, CHUNKING_MODE, CHUNK_STORE_MAX_SCRIPTS, INCREMENTAL_CHUNKING_ENABLED,
+    LEXICAL_SEARCH_ENABLED, HYBRID_LEXICAL_WEIGHT, LEXICAL_MIN_SCORE, LEXICAL_MIN_SIMILARITY,
+    NEAR_DUPLICATE_ENABLED, NEAR_DUPLICATE_MAX_DISTANCE, NEAR_DUPLICATE_MIN_JACCARD,
+    AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+)
 from models.state import MeetingQAState
 
 logger = logging.getLogger(__name__)
@@ -16,67 +27,188 @@ class TextProcessor:
     
     def __init__(self):
         self.embedding_manager = EmbeddingManager()
+        self.chunk_store = ScriptChunkStore(max_scripts=CHUNK_STORE_MAX_SCRIPTS)
     
-    def process_original_scripts(self, state: MeetingQAState) -> MeetingQAState:
-        """5단계: 원본 스크립트 청킹 및 임베딩"""
-        try:
-            original_scripts = state.get("original_scripts", [])
+    @staticmethod
+    def _chunking_mode(script: Dict) -> str:
+        """스크립트에 적용할 청킹 방식 (발화 단위는 segments가 있을 때만)"""
+        return "turns" if CHUNKING_MODE == "turns" and script.get("segments") else "text"
+    
+    def _chunking_config(self, script: Dict) -> str:
+        """청킹 결과를 결정하는 설정 (청킹 방식/크기/겹침 + 임베딩 배포)"""
+        return "|".join([
+            self._chunking_mode(script),
+            str(DEFAULT_CHUNK_SIZE),
+            str(DEFAULT_CHUNK_OVERLAP),
+            AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+        ])
+    
+    def _script_version(self, script: Dict) -> str:
+        """청크 저장소 버전 키 (timestamp + 콘텐츠 해시 + 청킹 방식/설정 + 임베딩 배포)"""
+        content_hash = script.get("content_hash") or hashlib.sha256(
+            (script.get("content") or "").encode("utf-8")
+        ).hexdigest()
+        return "|".join([
+            str(script.get("timestamp") or ""),
+            content_hash,
+            self._chunking_config(script)
+        ])
+    
+    def _chunk_source(self, script: Dict) -> str:
+        """청크 start/end의 기준 원문 (발화 단위: segments 원문, 문자 단위: 정리된 텍스트)"""
+        if self._chunking_mode(script) == "turns":
+            return speaker_turn_text(script["segments"])
+        return clean_text(script["content"])
+    
+    def _reusable_prefix(self, script: Dict, source: str) -> Tuple[List[Dict], int]:
+        """증분 청킹: 저장된 청킹 원문이 새 원문의 앞부분이면 (유지할 임베딩 포함 청크, 재청킹 시작 위치)
 
-            if not original_scripts:           
-                logger.warning("원본 스크립트가 없습니다. 빈 상태로 진행합니다.")
-                return {
-                    **state,
-                    "chunked_scripts": [],
-                    "current_step": "scripts_processed"
-                }
-            
-            all_chunked_scripts = []
-            processed_script_ids = set()  # 중복 처리 방지
-            
-            for script in original_scripts:
-                script_id = script["script_id"]
-                
-                # 이미 처리된 스크립트 건너뛰기
-                if script_id in processed_script_ids:
-                    logger.debug(f"이미 처리된 스크립트 건너뛰기: {script_id}")
+        저장 당시 원문 끝에서 chunk_size 이내에 걸친 청크(꼬리 구간)는 뒤에 이어진 내용과
+        다시 묶일 수 있으므로 버리고 그 시작 위치부터 다시 청킹한다.
+        """
+        if not INCREMENTAL_CHUNKING_ENABLED:
+            return [], 0
+        prefix = self.chunk_store.get_prefix(script["script_id"], self._chunking_config(script), source)
+        if prefix is None:
+            return [], 0
+        stored_chunks, source_length = prefix
+        if source_length == len(source):
+            return stored_chunks, source_length
+
+        boundary = source_length - DEFAULT_CHUNK_SIZE
+        keep = 0
+        while keep < len(stored_chunks) - 1 and stored_chunks[keep]["end"] <= boundary:
+            keep += 1
+        if self._chunking_mode(script) == "turns":
+            # 긴 발화 중간에서 나뉜 청크면 그 발화 시작까지 되돌림
+            while keep > 0 and stored_chunks[keep]["segment_ids"][:1] == stored_chunks[keep - 1]["segment_ids"][-1:]:
+                keep -= 1
+        if keep == 0:
+            return [], 0
+        return stored_chunks[:keep], stored_chunks[keep]["start"]
+    
+    def lookup_stored_chunks(self, script: Dict) -> Tuple[str, Optional[List[Dict]]]:
+        """스크립트 버전과 청크 저장소의 임베딩 포함 청크 (없으면 None)"""
+        version = self._script_version(script)
+        stored_chunks = self.chunk_store.get(script["script_id"], version)
+        if stored_chunks is not None:
+            logger.info(f"청크 저장소 적중: {script['script_id']} ({len(stored_chunks)}개 청크)")
+        return version, stored_chunks
+    
+    def chunk_script(self, script: Dict) -> List[Dict]:
+        """청킹: 발화 단위 또는 텍스트 정리 후 문자 단위
+
+        저장된 앞부분 청크가 있으면 임베딩이 포함된 채로 유지하고 꼬리 구간만 새로 청킹한다.
+        새 청크에는 임베딩이 없다.
+        """
+        source = self._chunk_source(script)
+        kept_chunks, resume_from = self._reusable_prefix(script, source)
+        
+        if self._chunking_mode(script) == "turns":
+            new_chunks = chunk_speaker_turns(script["segments"], chunk_size=DEFAULT_CHUNK_SIZE, resume_from=resume_from)
+        else:
+            new_chunks = chunk_text(
+                source[resume_from:], 
+                chunk_size=DEFAULT_CHUNK_SIZE,
+                chunk_overlap=DEFAULT_CHUNK_OVERLAP
+            )
+            for chunk in new_chunks:
+                chunk["start"] += resume_from
+                chunk["end"] += resume_from
+        
+        if kept_chunks:
+            logger.info(
+                f"증분 청킹: {script['script_id']} 기존 청크 {len(kept_chunks)}개 유지, "
+                f"{len(source) - resume_from}자 재청킹 → 새 청크 {len(new_chunks)}개"
+            )
+            for idx, chunk in enumerate(new_chunks, start=len(kept_chunks)):
+                chunk["chunk_index"] = idx
+        return kept_chunks + new_chunks
+    
+    def embed_chunks(self, chunks_by_script: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """임베딩이 없는 청크에 임베딩 추가 (같은 내용의 청크는 대표 청크 하나만 임베딩하고 벡터 공유)
+
+        배치 안에서 정규화 텍스트 해시가 같은 청크만 벡터를 공유하고, 요청 간 재사용은 임베딩 캐시에 맡긴다.
+        내용이 조금이라도 다르면(예: 증분 청킹으로 뒤에 발화가 붙은 청크) 새로 임베딩한다.
+        검색 결과 접기에 쓰도록 각 청크에 SimHash 서명(simhash)을 기록한다.
+        """
+        if not NEAR_DUPLICATE_ENABLED:
+            return self.embedding_manager.add_embeddings_to_script_chunks(chunks_by_script)
+        
+        by_digest: Dict[str, Dict] = {}  # 정규화 텍스트 해시 → 대표 청크
+        representatives: Dict[str, List[Dict]] = {}
+        duplicates: List[Tuple[Dict, Dict]] = []  # (중복 청크, 대표 청크)
+        for script_id, chunks in chunks_by_script.items():
+            for chunk in chunks:
+                if chunk.get("simhash") is None:
+                    chunk["simhash"] = simhash(chunk["chunk_text"])
+                if chunk.get("chunk_embedding") is not None:
                     continue
-                processed_script_ids.add(script_id)
-                
-                full_content = script["content"]
-                
-                # 텍스트 정리
-                cleaned_content = clean_text(full_content)
-                
-                # 청킹
-                chunks = chunk_text(
-                    cleaned_content, 
-                    chunk_size=DEFAULT_CHUNK_SIZE,
-                    chunk_overlap=DEFAULT_CHUNK_OVERLAP
-                )
-                
-                # 임베딩 추가
-                chunks_with_embeddings = self.embedding_manager.add_embeddings_to_chunks(
-                    chunks, script_id
-                )
-                
-                all_chunked_scripts.extend(chunks_with_embeddings)
-            
-            logger.info(f"스크립트 처리 완료: {len(all_chunked_scripts)}개 청크 생성")
-            
-            
-            return {
-                **state,  # 이미 script_metadata가 포함되어 있어야 함
-                "chunked_scripts": all_chunked_scripts,
-                "current_step": "scripts_processed"
-            }
-            
-        except Exception as e:
-            logger.error(f"스크립트 처리 실패: {str(e)}")
-            return {
-                **state,
-                "error_message": f"스크립트 처리 실패: {str(e)}",
-                "current_step": "process_scripts_failed"
-            }
+                digest = content_digest(chunk["chunk_text"])
+                if digest in by_digest:
+                    duplicates.append((chunk, by_digest[digest]))
+                    continue
+                by_digest[digest] = chunk
+                representatives.setdefault(script_id, []).append(chunk)
+        
+        if representatives:
+            self.embedding_manager.add_embeddings_to_script_chunks(representatives)
+        for chunk, representative in duplicates:
+            chunk["chunk_embedding"] = representative["chunk_embedding"]
+        for script_id, chunks in chunks_by_script.items():
+            for chunk in chunks:
+                chunk["script_id"] = script_id
+        if duplicates:
+            logger.info(f"같은 내용 청크 {len(duplicates)}개 임베딩 생략 (벡터 공유)")
+        return chunks_by_script
+    
+    def store_chunks(self, script: Dict, version: str, chunks: List[Dict]) -> None:
+        """임베딩이 추가된 청크를 청크 저장소에 저장 (증분 청킹용 원문 정보 포함)"""
+        self.chunk_store.put(
+            script["script_id"], version, chunks,
+            config=self._chunking_config(script),
+            source=self._chunk_source(script)
+        )
+    
+    def _chunk_similarity_index(self, chunks: List[Dict]) -> Optional[SimilarityIndex]:
+        """청크 목록 순서의 정규화된 임베딩 색인
+
+        스크립트별로 청크 저장소의 정규화 행렬을 그대로 쓰고 (청크 텍스트 해시가 같을 때),
+        여러 스크립트가 선택됐을 때만 하나의 행렬로 합친다. 임베딩 없는 청크가 있으면 None.
+        """
+        rows_by_script: Dict[str, List[int]] = {}
+        for row, chunk in enumerate(chunks):
+            rows_by_script.setdefault(chunk.get("script_id"), []).append(row)
+        
+        parts = []
+        for script_id, rows in rows_by_script.items():
+            matrix = self.chunk_store.get_matrix(
+                script_id, hash_chunk_texts([chunks[row].get("chunk_text", "") for row in rows])
+            )
+            if matrix is None:
+                embeddings = [chunks[row].get("chunk_embedding") for row in rows]
+                if any(embedding is None or len(embedding) == 0 for embedding in embeddings):
+                    return None
+                matrix = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+            parts.append((rows, matrix))
+        
+        if len(parts) == 1:
+            # 스크립트 하나면 저장 행렬을 복사 없이 사용
+            return SimilarityIndex(parts[0][1], normalized=True)
+        combined = np.empty((len(chunks), parts[0][1].shape[1]), dtype=np.float32)
+        for rows, matrix in parts:
+            combined[rows] = matrix
+        return SimilarityIndex(combined, normalized=True)
+    
+    @staticmethod
+    def _collapse_near_duplicates(relevant_chunks: List[Dict], top_k: int) -> List[Dict]:
+        """검색 결과에서 스크립트와 관계없이 유사 중복 청크를 점수가 가장 높은 하나로 접고 상위 top_k개 반환"""
+        if not NEAR_DUPLICATE_ENABLED:
+            return relevant_chunks[:top_k]
+        collapsed = collapse_near_duplicates(relevant_chunks, NEAR_DUPLICATE_MAX_DISTANCE, NEAR_DUPLICATE_MIN_JACCARD)
+        if len(collapsed) < len(relevant_chunks):
+            logger.info(f"유사 중복 청크 {len(relevant_chunks) - len(collapsed)}개 제외")
+        return collapsed[:top_k]
     
     def select_relevant_chunks(self, state: MeetingQAState) -> MeetingQAState:
         """6단계: 질문과 관련된 청크 선별"""
@@ -96,22 +228,41 @@ class TextProcessor:
                     "current_step": "chunks_selected"
                 }
             
-            # 질문 임베딩 생성
-            query_embedding = self.embedding_manager.embed_query(processed_question)
+            # 유사 중복 청크를 접을 여유분까지 후보 선별
+            top_k = 10
+            candidate_k = top_k * 2 if NEAR_DUPLICATE_ENABLED else top_k
+            
+            # BM25 점수 (청크 저장소의 스크립트별 역색인 재사용, 질의 용어 IDF 합 기준 0~1 정규화)
+            lexical_scores = None
+            if LEXICAL_SEARCH_ENABLED:
+                lexical_scores = BM25Index.from_chunks(
+                    chunked_scripts, self.chunk_store.get_postings
+                ).normalized_score(processed_question)
             
-            # 관련 청크 선별
+            # 질문 임베딩 생성 (RAG 검색 단계에서 만든 임베딩이 있으면 재사용)
+            query_embeddings = dict(state.get("query_embeddings") or {})
+            query_embedding = self.embedding_manager.embed_query(processed_question, query_embeddings)
+            
+            # 관련 청크 선별 (BM25 점수가 있으면 벡터 유사도와 결합)
             relevant_chunks = find_most_relevant_chunks(
                 query_embedding=query_embedding,
                 chunks=chunked_scripts,
-                top_k=10,
-                similarity_threshold=0.4  # 0.6에서 0.4로 낮춤
+                top_k=candidate_k,
+                similarity_threshold=0.4,  # 0.6에서 0.4로 낮춤
+                lexical_scores=lexical_scores,
+                lexical_weight=HYBRID_LEXICAL_WEIGHT,
+                lexical_threshold=LEXICAL_MIN_SCORE,
+                lexical_min_similarity=LEXICAL_MIN_SIMILARITY,
+                index=self._chunk_similarity_index(chunked_scripts)
             )
+            relevant_chunks = self._collapse_near_duplicates(relevant_chunks, top_k)
             
             logger.info(f"관련 청크 선별 완료: {len(relevant_chunks)}개 청크")
             
             return {
                 **state,
                 "relevant_chunks": relevant_chunks,
+                "query_embeddings": query_embeddings,
                 "current_step": "chunks_selected"
             }
             
@@ -133,28 +284,21 @@ class TextProcessor:
                 raise ValueError("필수 데이터가 누락되었습니다.")
             
             # 질문 임베딩 생성
-            query_embedding = self.embedding_manager.embed_query(processed_question)
+            query_embeddings = dict(state.get("query_embeddings") or {})
+            query_embedding = self.embedding_manager.embed_query(processed_question, query_embeddings)
             
-            # RAG 요약본들과 유사도 계산
+            # RAG 요약본들과 유사도 계산 (상위 5개, 임계값 0.6)
+            script_ids = [sid for sid, data in all_summaries.items() if data.get("embedding")]
+            index = SimilarityIndex([all_summaries[sid]["embedding"] for sid in script_ids])
             relevant_summaries = []
-            for script_id, summary_data in all_summaries.items():
-                summary_embedding = summary_data.get("embedding", [])
-                if summary_embedding:
-                    # 코사인 유사도 계산
-                    from utils.embeddings import cosine_similarity
-                    similarity = cosine_similarity(query_embedding, summary_embedding)
-                    
-                    if similarity >= 0.6:  # 임계값
-                        relevant_summaries.append({
-                            "script_id": script_id,
-                            "summary_text": summary_data.get("summary_text", ""),
-                            "relevance_score": similarity,
-                            "meeting_date": summary_data.get("meeting_date", "")
-                        })
-            
-            # 유사도 순으로 정렬
-            relevant_summaries.sort(key=lambda x: x["relevance_score"], reverse=True)
-            relevant_summaries = relevant_summaries[:5]  # 상위 5개
+            for row, similarity in index.search(query_embedding, top_k=5, threshold=0.6):
+                summary_data = all_summaries[script_ids[row]]
+                relevant_summaries.append({
+                    "script_id": script_ids[row],
+                    "summary_text": summary_data.get("summary_text", ""),
+                    "relevance_score": similarity,
+                    "meeting_date": summary_data.get("meeting_date", "")
+                })
             
             logger.info(f"RAG 임베딩 기반 검색 완료: {len(relevant_summaries)}개 요약본")
             
@@ -162,6 +306,7 @@ class TextProcessor:
             return {
                 **state,  # script_metadata 포함되어 있어야 함
                 "relevant_summaries": relevant_summaries,
+                "query_embeddings": query_embeddings,
                 "current_step": "rag_embeddings_processed"
             }
             
@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
 import sys
 import os
@@ -7,7 +8,9 @@ import os
 # 프로젝트 루트를 Python path에 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from api.routes import router
+from api import routes
+from api.routes import router, get_agent
+from services.async_rag_client import close_async_rag_client
 from config.settings import API_TITLE, API_DESCRIPTION, API_VERSION
 
 # 로깅 설정
@@ -37,6 +40,22 @@ app.add_middleware(
 # 라우터 포함
 app.include_router(router, prefix="/api/chat", tags=["Chatbot"])
 
+@app.on_event("startup")
+async def startup():
+    """앱 시작 시 에이전트 생성 (디스크 요약본 스냅샷을 미리 로드)"""
+    try:
+        await asyncio.to_thread(get_agent)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"에이전트 사전 생성 실패, 첫 요청 시 다시 시도합니다: {str(e)}")
+
+@app.on_event("shutdown")
+async def shutdown():
+    """앱 종료 시 공용 HTTP 연결 풀 정리"""
+    await close_async_rag_client()
+    agent = routes._agent_instance
+    if agent is not None:
+        await agent.aclose()
+
 @app.get("/")
 async def root():
     """루트 엔드포인트"""
@@ -49,6 +49,7 @@ async def process_meeting_question(
         initial_state: MeetingQAState = {
             "user_question": request.question,
             "processed_question": "",
+            "query_embeddings": {},
             "user_selected_script_ids": request.user_selected_script_ids,
             "relevant_summaries": [],
             "selected_script_ids": [],
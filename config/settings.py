@@ -45,3 +45,120 @@ DEFAULT_RAG_TOP_K = 5
 DEFAULT_SIMILARITY_THRESHOLD = 0.7
 DEFAULT_CHUNK_SIZE = 1000
 DEFAULT_CHUNK_OVERLAP = 200
+
+# 청킹 방식 (text: 정리된 전체 텍스트를 문자 겹침으로 분할 (기본, 기존 동작), turns: segments가 있는 스크립트는 화자 발화 단위로 묶음)
+# turns로 바꾸면 청크 경계/개수가 달라지므로 청크 저장소 버전이 바뀌어 다시 임베딩된다
+CHUNKING_MODE = os.environ.get("CHUNKING_MODE", "text").lower()
+
+# 임베딩 캐시 설정 (청크 텍스트 + 배포명 해시 기반 디스크 캐시)
+EMBEDDING_CACHE_ENABLED = os.environ.get("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.environ.get("EMBEDDING_CACHE_PATH", str(PROJECT_ROOT / ".cache" / "embeddings.sqlite3"))
+EMBEDDING_CACHE_MAX_BYTES = int(os.environ.get("EMBEDDING_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# 쿼리 임베딩 캐시 설정 (크기 제한 + TTL LRU, 0이면 비활성화)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.environ.get("QUERY_EMBEDDING_CACHE_SIZE", 1024))
+QUERY_EMBEDDING_CACHE_TTL = int(os.environ.get("QUERY_EMBEDDING_CACHE_TTL", 3600))
+
+# 스크립트 청크 저장소 설정 (버전이 같은 스크립트는 청킹/임베딩 생략)
+CHUNK_STORE_MAX_SCRIPTS = int(os.environ.get("CHUNK_STORE_MAX_SCRIPTS", 256))
+
+# 청크 하이브리드 검색 설정 (BM25 역색인 점수를 벡터 유사도와 가중 결합, 어휘 점수가 기준 이상이면 유사도 임계값 미달이어도 후보 유지)
+# 어휘 점수로만 남는 후보도 유사도가 LEXICAL_MIN_SIMILARITY 이상이어야 함
+LEXICAL_SEARCH_ENABLED = os.environ.get("LEXICAL_SEARCH_ENABLED", "true").lower() == "true"
+HYBRID_LEXICAL_WEIGHT = float(os.environ.get("HYBRID_LEXICAL_WEIGHT", 0.3))
+LEXICAL_MIN_SCORE = float(os.environ.get("LEXICAL_MIN_SCORE", 0.5))
+LEXICAL_MIN_SIMILARITY = float(os.environ.get("LEXICAL_MIN_SIMILARITY", 0.2))
+
+# 유사 중복 청크 설정 (같은 배치에서 정규화 텍스트가 같은 청크는 임베딩을 한 번만 계산해 벡터 공유,
+# 스크립트와 관계없이 SimHash 해밍 거리 이하이고 shingle Jaccard 유사도 이상인 검색 결과는 점수가 가장 높은 하나만 유지)
+NEAR_DUPLICATE_ENABLED = os.environ.get("NEAR_DUPLICATE_ENABLED", "true").lower() == "true"
+NEAR_DUPLICATE_MAX_DISTANCE = int(os.environ.get("NEAR_DUPLICATE_MAX_DISTANCE", 1))
+NEAR_DUPLICATE_MIN_JACCARD = float(os.environ.get("NEAR_DUPLICATE_MIN_JACCARD", 0.9))
+
+# 증분 청킹 설정 (진행 중 회의처럼 뒤에 내용만 추가된 스크립트는 앞부분 청크/임베딩 유지, 꼬리 구간만 재청킹)
+INCREMENTAL_CHUNKING_ENABLED = os.environ.get("INCREMENTAL_CHUNKING_ENABLED", "true").lower() == "true"
+
+# 임베딩 HTTP 연결 풀 설정 (프로세스 공용 클라이언트)
+EMBEDDING_HTTP_MAX_CONNECTIONS = int(os.environ.get("EMBEDDING_HTTP_MAX_CONNECTIONS", 20))
+EMBEDDING_HTTP_MAX_KEEPALIVE = int(os.environ.get("EMBEDDING_HTTP_MAX_KEEPALIVE", 10))
+EMBEDDING_HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("EMBEDDING_HTTP_KEEPALIVE_EXPIRY", 30))
+EMBEDDING_HTTP_TIMEOUT = float(os.environ.get("EMBEDDING_HTTP_TIMEOUT", 30))
+
+# 임베딩 마이크로 배처 설정 (요청 간 embed_documents 호출 묶음)
+EMBEDDING_BATCH_ENABLED = os.environ.get("EMBEDDING_BATCH_ENABLED", "true").lower() == "true"
+EMBEDDING_BATCH_WINDOW_MS = float(os.environ.get("EMBEDDING_BATCH_WINDOW_MS", 10))
+EMBEDDING_BATCH_MAX_SIZE = int(os.environ.get("EMBEDDING_BATCH_MAX_SIZE", 256))
+EMBEDDING_BATCH_MAX_TOKENS = int(os.environ.get("EMBEDDING_BATCH_MAX_TOKENS", 64000))
+EMBEDDING_MAX_CONCURRENCY = int(os.environ.get("EMBEDDING_MAX_CONCURRENCY", 4))
+
+# 요약본 임베딩 저장소 설정 (float32 또는 float16)
+SUMMARY_EMBEDDING_DTYPE = os.environ.get("SUMMARY_EMBEDDING_DTYPE", "float32")
+
+# 요약본 ANN(IVF) 인덱스 설정 (요약본 수가 SUMMARY_ANN_MIN_SIZE 미만이면 전수 검색)
+SUMMARY_ANN_ENABLED = os.environ.get("SUMMARY_ANN_ENABLED", "true").lower() == "true"
+SUMMARY_ANN_MIN_SIZE = int(os.environ.get("SUMMARY_ANN_MIN_SIZE", 5000))
+SUMMARY_ANN_NPROBE = int(os.environ.get("SUMMARY_ANN_NPROBE", 8))
+
+# 요약본 양자화 설정 (none / int8 / binary) - 양자화 코드로 후보 선별 후 원본으로 재채점
+SUMMARY_QUANTIZATION = os.environ.get("SUMMARY_QUANTIZATION", "none").lower()
+SUMMARY_RERANK_CANDIDATES = int(os.environ.get("SUMMARY_RERANK_CANDIDATES", 200))
+
+# Azure OpenAI 요청 한도 스케줄러 설정 (TPM/RPM 0이면 버킷 없이 동시성 제어와 429 재시도만 적용)
+RATE_LIMIT_CHAT_TPM = int(os.environ.get("RATE_LIMIT_CHAT_TPM", 0))
+RATE_LIMIT_CHAT_RPM = int(os.environ.get("RATE_LIMIT_CHAT_RPM", 0))
+RATE_LIMIT_EMBEDDING_TPM = int(os.environ.get("RATE_LIMIT_EMBEDDING_TPM", 0))
+RATE_LIMIT_EMBEDDING_RPM = int(os.environ.get("RATE_LIMIT_EMBEDDING_RPM", 0))
+RATE_LIMIT_MAX_CONCURRENCY = int(os.environ.get("RATE_LIMIT_MAX_CONCURRENCY", 8))
+RATE_LIMIT_MAX_RETRIES = int(os.environ.get("RATE_LIMIT_MAX_RETRIES", 6))
+CHAT_COMPLETION_TOKEN_ESTIMATE = int(os.environ.get("CHAT_COMPLETION_TOKEN_ESTIMATE", 512))
+
+# 전체 요약본 스냅샷 설정 (초) - MAX_AGE 이후엔 백그라운드 재검증, MAX_STALE 이후엔 동기 갱신
+SUMMARY_SNAPSHOT_MAX_AGE = int(os.environ.get("SUMMARY_SNAPSHOT_MAX_AGE", 60))
+SUMMARY_SNAPSHOT_MAX_STALE = int(os.environ.get("SUMMARY_SNAPSHOT_MAX_STALE", 3600))
+
+# 요약본 증분 동기화 설정 (워터마크 이후 변경분만 조회, 주기적으로 전체 재동기화)
+SUMMARY_DELTA_SYNC_ENABLED = os.environ.get("SUMMARY_DELTA_SYNC_ENABLED", "true").lower() == "true"
+SUMMARY_DELTA_PARAM = os.environ.get("SUMMARY_DELTA_PARAM", "updatedSince")
+SUMMARY_FULL_RESYNC_INTERVAL = int(os.environ.get("SUMMARY_FULL_RESYNC_INTERVAL", 3600))
+
+# RAG 서비스 비동기 HTTP 클라이언트 설정 (HTTP/2 + keep-alive 연결 풀, 초 단위 타임아웃)
+RAG_HTTP2_ENABLED = os.environ.get("RAG_HTTP2_ENABLED", "true").lower() == "true"
+RAG_HTTP_MAX_CONNECTIONS = int(os.environ.get("RAG_HTTP_MAX_CONNECTIONS", 100))
+RAG_HTTP_MAX_KEEPALIVE = int(os.environ.get("RAG_HTTP_MAX_KEEPALIVE", 20))
+RAG_HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("RAG_HTTP_KEEPALIVE_EXPIRY", 30))
+RAG_HTTP_TIMEOUT = float(os.environ.get("RAG_HTTP_TIMEOUT", 30))
+RAG_HTTP_CONNECT_TIMEOUT = float(os.environ.get("RAG_HTTP_CONNECT_TIMEOUT", 5))
+
+# 요약본 응답 스트리밍 디코딩 설정 (응답을 청크 단위로 읽어 임베딩을 float32 버퍼로 바로 디코딩)
+SUMMARY_STREAM_DECODE_ENABLED = os.environ.get("SUMMARY_STREAM_DECODE_ENABLED", "true").lower() == "true"
+
+# 요약본 디스크 스냅샷 설정 (행렬/ID/ANN 배열을 버전별로 저장하고 시작 시 메모리 매핑으로 로드)
+SUMMARY_DISK_SNAPSHOT_ENABLED = os.environ.get("SUMMARY_DISK_SNAPSHOT_ENABLED", "true").lower() == "true"
+SUMMARY_DISK_SNAPSHOT_DIR = os.environ.get("SUMMARY_DISK_SNAPSHOT_DIR", str(PROJECT_ROOT / ".cache" / "summary_snapshot"))
+
+# 업스트림(RAG/회의록 서비스) 서킷 브레이커 설정 - 최근 WINDOW초 실패율(느린 호출 포함)이 기준 이상이면 OPEN초 동안 차단
+CIRCUIT_WINDOW_SECONDS = float(os.environ.get("CIRCUIT_WINDOW_SECONDS", 60))
+CIRCUIT_MIN_REQUESTS = int(os.environ.get("CIRCUIT_MIN_REQUESTS", 10))
+CIRCUIT_FAILURE_RATIO = float(os.environ.get("CIRCUIT_FAILURE_RATIO", 0.5))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.environ.get("CIRCUIT_SLOW_CALL_SECONDS", 10))
+CIRCUIT_OPEN_SECONDS = float(os.environ.get("CIRCUIT_OPEN_SECONDS", 30))
+
+# 헤지 요청 설정 (멱등 GET이 p95 지연 안에 끝나지 않으면 같은 요청을 한 번 더 보냄)
+HEDGE_ENABLED = os.environ.get("HEDGE_ENABLED", "true").lower() == "true"
+HEDGE_MIN_SAMPLES = int(os.environ.get("HEDGE_MIN_SAMPLES", 20))
+HEDGE_MIN_DELAY = float(os.environ.get("HEDGE_MIN_DELAY", 0.05))
+HEDGE_MAX_DELAY = float(os.environ.get("HEDGE_MAX_DELAY", 2.0))
+
+# 원본 스크립트 캐시 설정 (본문 바이트 합 기준 LRU, 요약본 갱신 시각을 모르면 TTL초 동안 사용, 0이면 비활성화)
+SCRIPT_CACHE_MAX_BYTES = int(os.environ.get("SCRIPT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+SCRIPT_CACHE_TTL = int(os.environ.get("SCRIPT_CACHE_TTL", 600))
+
+# 원본 스크립트 분할 조회 설정 (요청당 script_id 수, 동시 요청 수, 초 단위 타임아웃)
+SCRIPT_FETCH_SHARD_SIZE = max(1, int(os.environ.get("SCRIPT_FETCH_SHARD_SIZE", 2)))
+SCRIPT_FETCH_MAX_CONCURRENCY = max(1, int(os.environ.get("SCRIPT_FETCH_MAX_CONCURRENCY", 4)))
+SCRIPT_FETCH_TIMEOUT = float(os.environ.get("SCRIPT_FETCH_TIMEOUT", 30))
+SCRIPT_FETCH_CONNECT_TIMEOUT = float(os.environ.get("SCRIPT_FETCH_CONNECT_TIMEOUT", 5))
+
+# 원본 스크립트 스트리밍 처리 설정 (조회→청킹→임베딩 단계 사이 큐 크기, 임베딩 작업자 수)
+SCRIPT_PIPELINE_QUEUE_SIZE = max(1, int(os.environ.get("SCRIPT_PIPELINE_QUEUE_SIZE", 4)))
+SCRIPT_PIPELINE_EMBED_WORKERS = max(1, int(os.environ.get("SCRIPT_PIPELINE_EMBED_WORKERS", 2)))
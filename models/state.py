@@ -4,6 +4,7 @@ class MeetingQAState(TypedDict):
     # 사용자 입력
     user_question: str
     processed_question: str  # 전처리된 질문
+    query_embeddings: Dict[str, List[float]]  # 요청 단위 쿼리 임베딩 메모 {질문 텍스트: 임베딩}
     
     # RAG 서비스 호출 (요약본 검색)
     relevant_summaries: List[Dict]  # RAG에서 찾은 관련 요약본들
@@ -13,11 +14,12 @@ class MeetingQAState(TypedDict):
     
     
     original_scripts: List[Dict]  # 외부 API에서 받은 원본 스크립트들
-    # [{"script_id": "...", "content": "...", "title": "...", "timestamp": "...", "filename": "..."}]
+    # [{"script_id": "...", "content": "...", "title": "...", "timestamp": "...", "content_hash": "...", "filename": "..."}]
     
     # 원본 스크립트 처리 단계
     chunked_scripts: List[Dict]  # 청킹된 원본들
-    # [{"script_id": "...", "chunk_text": "...", "chunk_index": 0, "chunk_embedding": [...]}]
+    # [{"script_id": "...", "chunk_text": "...", "chunk_index": 0, "start": 0, "end": 0, "chunk_embedding": [...]}]
+    # 발화 단위 청킹 시 "speakers": ["화자01", ...], "segment_ids": [...] 추가
     
     relevant_chunks: List[Dict]  # 질문과 관련된 청크들만 선별
     # [{"script_id": "...", "chunk_text": "...", "relevance_score": 0.9, "chunk_index": 0}]
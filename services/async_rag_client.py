@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Union
+
+import httpx
+
+from config.settings import (
+    RAG_SERVICE_URL, RAG_HTTP2_ENABLED, RAG_HTTP_MAX_CONNECTIONS, RAG_HTTP_MAX_KEEPALIVE,
+    RAG_HTTP_KEEPALIVE_EXPIRY, RAG_HTTP_TIMEOUT, RAG_HTTP_CONNECT_TIMEOUT
+)
+from services.rag_client import SummaryResponseParser
+from utils.circuit_breaker import get_circuit_breaker
+
+logger = logging.getLogger(__name__)
+
+def _http2_available() -> bool:
+    """HTTP/2 사용 가능 여부 (httpx[http2]의 h2 패키지 필요)"""
+    if not RAG_HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("h2 패키지가 없어 RAG 클라이언트를 HTTP/1.1로 사용합니다. (pip install 'httpx[http2]')")
+        return False
+
+class AsyncRAGClient(SummaryResponseParser):
+    """RAG 서비스 비동기 클라이언트 (장기 유지 httpx.AsyncClient, HTTP/2 + keep-alive 연결 풀)
+
+    응답 정규화는 동기 RAGClient와 같은 SummaryResponseParser를 사용한다.
+    """
+
+    def __init__(self, base_url: str, timeout: float = RAG_HTTP_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = httpx.Timeout(timeout, connect=RAG_HTTP_CONNECT_TIMEOUT)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = asyncio.Lock()
+        # 동기 RAGClient와 같은 서킷 브레이커 공유 (같은 업스트림)
+        self.breaker = get_circuit_breaker("rag_service")
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """연결 풀 클라이언트 (첫 호출 시 생성)"""
+        if self._client is None or self._client.is_closed:
+            async with self._lock:
+                if self._client is None or self._client.is_closed:
+                    self._client = httpx.AsyncClient(
+                        http2=_http2_available(),
+                        limits=httpx.Limits(
+                            max_connections=RAG_HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=RAG_HTTP_MAX_KEEPALIVE,
+                            keepalive_expiry=RAG_HTTP_KEEPALIVE_EXPIRY
+                        ),
+                        timeout=self.timeout,
+                        headers={
+                            "Content-Type": "application/json",
+                            "Accept": "application/json"
+                        }
+                    )
+        return self._client
+
+    async def _get(self, path: str, params: Optional[Dict[str, str]] = None,
+                   timeout: Union[float, httpx.Timeout, None] = None, hedge: bool = False) -> httpx.Response:
+        """서킷 브레이커를 거친 GET (timeout 지정 시 해당 호출에만 적용, hedge=True면 p95 지연 후 헤지 요청)"""
+        client = await self._get_client()
+
+        async def _send() -> httpx.Response:
+            response = await client.get(
+                f"{self.base_url}{path}",
+                params=params,
+                timeout=timeout if timeout is not None else self.timeout
+            )
+            if response.status_code >= 500:
+                response.raise_for_status()
+            return response
+
+        return await self.breaker.acall(_send, hedge=hedge)
+
+    async def get_summary_by_ids(self, script_ids: List[str],
+                                 timeout: Optional[float] = None) -> Dict[str, Dict[str, List[float]]]:
+        """특정 script_id들의 요약본 임베딩 조회 (GET, 쉼표 구분 다중 필터)"""
+        if not script_ids:
+            return {}
+        try:
+            response = await self._get(
+                "/api/rag/script-summaries",
+                params={"scriptIds": ",".join(script_ids)},
+                timeout=timeout,
+                hedge=True
+            )
+            if response.status_code == 404:
+                logger.warning(f"⚠️ 특정 요약본 404 오류: {script_ids} - 빈 결과 반환")
+                return {}  # 404 시 빈 딕셔너리 반환 (fallback 가능하게)
+            response.raise_for_status()
+            normalized = self._normalize_summaries(response.json())
+            logger.info(f"특정 요약본 조회 완료(GET, 다중 필터, async): {script_ids}")
+            return normalized
+        except httpx.HTTPError as e:
+            logger.error(f"특정 요약본 조회 실패: {str(e)}")
+            raise Exception(f"특정 요약본 조회 실패: {str(e)}")
+
+    async def health_check(self) -> bool:
+        """RAG 서비스 헬스체크"""
+        try:
+            client = await self._get_client()
+            response = await client.get(f"{self.base_url}/api/health", timeout=5)
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    async def aclose(self) -> None:
+        """연결 풀 종료"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+_async_rag_client: Optional[AsyncRAGClient] = None
+
+def get_async_rag_client() -> AsyncRAGClient:
+    """프로세스 공용 비동기 RAG 클라이언트"""
+    global _async_rag_client
+    if _async_rag_client is None:
+        _async_rag_client = AsyncRAGClient(RAG_SERVICE_URL)
+    return _async_rag_client
+
+async def close_async_rag_client() -> None:
+    """앱 종료 시 공용 클라이언트 연결 정리"""
+    if _async_rag_client is not None:
+        await _async_rag_client.aclose()
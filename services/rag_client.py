@@ -1,24 +1,63 @@
 import requests
 import json
-from typing import List, Dict, Any
+import math
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import logging
+import numpy as np
+from config.settings import (
+    SUMMARY_EMBEDDING_DTYPE, SUMMARY_SNAPSHOT_MAX_AGE, SUMMARY_SNAPSHOT_MAX_STALE,
+    SUMMARY_DELTA_SYNC_ENABLED, SUMMARY_DELTA_PARAM, SUMMARY_FULL_RESYNC_INTERVAL,
+    SUMMARY_STREAM_DECODE_ENABLED, SUMMARY_DISK_SNAPSHOT_ENABLED, SUMMARY_DISK_SNAPSHOT_DIR
+)
+from utils.summary_store import SummaryEmbeddingStore
+from utils.summary_snapshot import SummarySnapshotStore
+from utils.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from utils.summary_stream import decode_summary_stream
 
 logger = logging.getLogger(__name__)
 
-class RAGClient:
-    """RAG 서비스 클라이언트"""
-    
-    def __init__(self, base_url: str, timeout: int = 30):
-        self.base_url = base_url.rstrip('/')
-        self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        })
-    
-    def _normalize_summaries(self, data: Any) -> Dict[str, Dict[str, List[float]]]:
-        """서버 응답을 {script_id: {"embedding": [...]}} 형태로 정규화
+class SummaryResponseParser:
+    """RAG 서비스 요약본 응답 정규화 (동기/비동기 클라이언트 공용)"""
+
+    @staticmethod
+    def _is_embedding(value: Any) -> bool:
+        """임베딩 값 여부 (JSON 리스트 또는 스트리밍 디코딩된 float32 행)"""
+        return isinstance(value, (list, np.ndarray))
+
+    @staticmethod
+    def _record_timestamp(record: Any) -> Optional[str]:
+        """요약본 항목의 갱신 시각 (updatedAt / timestamp / createdAt, 없으면 None)"""
+        if not isinstance(record, dict):
+            return None
+        value = record.get("updatedAt") or record.get("updated_at") or record.get("timestamp") or record.get("createdAt")
+        return str(value) if value else None
+
+    @staticmethod
+    def _timestamp_epoch(value: Optional[str]) -> Optional[float]:
+        """갱신 시각을 epoch 초로 정규화 (epoch 초/밀리초 숫자 또는 ISO 8601, 시간대가 없으면 UTC, 해석 불가면 None)"""
+        if not value:
+            return None
+        text = str(value).strip()
+        try:
+            number = float(text)
+        except ValueError:
+            try:
+                parsed = datetime.fromisoformat(re.sub(r"[Zz]$", "+00:00", text))
+            except ValueError:
+                return None
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed.timestamp()
+        if not math.isfinite(number):
+            return None
+        return number / 1000 if number > 1e11 else number
+
+    def _iter_summary_records(self, data: Any) -> Iterator[Tuple[str, List[float], Optional[str]]]:
+        """서버 응답에서 (script_id, embedding, 갱신 시각) 을 순서대로 추출
         
         지원 형태:
         1. {"all_summaries": {...}} 또는 {"selected_summary": {...}} - 래핑된 응답
@@ -27,8 +66,6 @@ class RAGClient:
         4. [{"scriptId": "...", "embedding": [...]}] - 배열 형태
         5. {"scriptId": "...", "embedding": [...]} - 단일 객체 (신규)
         """
-        normalized: Dict[str, Dict[str, List[float]]] = {}
-
         try:
             logger.info(f"🔧 [NORMALIZE] 입력 데이터 타입: {type(data)}")
             
@@ -46,10 +83,10 @@ class RAGClient:
                 logger.info("🔧 [NORMALIZE] 단일 객체 형태 감지")
                 script_id = data["scriptId"]
                 embedding = data["embedding"]
-                if isinstance(embedding, list):
-                    normalized[str(script_id)] = {"embedding": embedding}
+                if self._is_embedding(embedding):
+                    yield str(script_id), embedding, self._record_timestamp(data)
                     logger.info(f"🔧 [NORMALIZE] 단일 객체 처리 완료: {script_id}")
-                return normalized
+                return
 
             # 3) 배열 형태: [{"scriptId": "...", "embedding": [...]}]
             if isinstance(data, list):
@@ -58,11 +95,13 @@ class RAGClient:
                     if not isinstance(item, dict):
                         continue
                     sid = item.get("scriptId") or item.get("script_id") or item.get("id")
-                    embedding = item.get("embedding") or item.get("vector")
-                    if sid and isinstance(embedding, list):
-                        normalized[str(sid)] = {"embedding": embedding}
-                        logger.info(f"🔧 [NORMALIZE] 배열[{i}] 처리: {sid}")
-                return normalized
+                    embedding = item.get("embedding")
+                    if (len(embedding) == 0) if self._is_embedding(embedding) else not embedding:
+                        embedding = item.get("vector")
+                    if sid and self._is_embedding(embedding):
+                        yield str(sid), embedding, self._record_timestamp(item)
+                        logger.debug(f"🔧 [NORMALIZE] 배열[{i}] 처리: {sid}")
+                return
 
             # 4) 기존 dict 매핑 형태: {"script_id": {"embedding": [...]}} 또는 {"script_id": [...]}
             if isinstance(data, dict):
@@ -76,26 +115,83 @@ class RAGClient:
                     if isinstance(value, dict) and "embedding" in value:
                         # {"script_id": {"embedding": [...]}} 형태
                         embedding = value.get("embedding")
-                        if isinstance(embedding, list):
-                            normalized[str(key)] = {"embedding": embedding}
-                            logger.info(f"🔧 [NORMALIZE] Dict 중첩 처리: {key}")
-                    elif isinstance(value, list):
+                        if self._is_embedding(embedding):
+                            yield str(key), embedding, self._record_timestamp(value)
+                            logger.debug(f"🔧 [NORMALIZE] Dict 중첩 처리: {key}")
+                    elif self._is_embedding(value):
                         # {"script_id": [...]} 직접 임베딩 형태
-                        normalized[str(key)] = {"embedding": value}
-                        logger.info(f"🔧 [NORMALIZE] Dict 직접 처리: {key}")
-                return normalized
+                        yield str(key), value, None
+                        logger.debug(f"🔧 [NORMALIZE] Dict 직접 처리: {key}")
+                return
 
         except Exception as e:
             logger.error(f"🔧 [NORMALIZE] 처리 중 오류: {str(e)}")
-            pass
+            return
 
         logger.warning(f"🔧 [NORMALIZE] 처리할 수 없는 데이터 형태: {type(data)}")
+
+    def _iter_summaries(self, data: Any) -> Iterator[Tuple[str, List[float]]]:
+        """서버 응답에서 (script_id, embedding) 쌍을 순서대로 추출 (지원 형태는 _iter_summary_records 참고)"""
+        for script_id, embedding, _ in self._iter_summary_records(data):
+            yield script_id, embedding
+
+    def _normalize_summaries(self, data: Any) -> Dict[str, Dict[str, List[float]]]:
+        """서버 응답을 {script_id: {"embedding": [...]}} 형태로 정규화 (지원 형태는 _iter_summary_records 참고)"""
+        normalized: Dict[str, Dict[str, List[float]]] = {}
+        for script_id, embedding in self._iter_summaries(data):
+            normalized[script_id] = {"embedding": embedding}
         return normalized
 
+class RAGClient(SummaryResponseParser):
+    """RAG 서비스 클라이언트"""
+    
+    def __init__(self, base_url: str, timeout: int = 30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        })
+        
+        # 전체 요약본 스냅샷 (ETag 재검증 + stale-while-revalidate)
+        self._snapshot_store: Optional[SummaryEmbeddingStore] = None
+        self._snapshot_etag: Optional[str] = None
+        self._snapshot_fetched_at = 0.0
+        self._snapshot_max_age = float(SUMMARY_SNAPSHOT_MAX_AGE)
+        self._snapshot_refreshing = False
+        self._snapshot_generation = 0  # 스냅샷 내용이 바뀔 때마다 증가 (메모리 매핑으로 다시 여는 교체는 제외)
+        self._snapshot_watermark: Optional[str] = None  # 증분 동기화 기준 시각 (가장 최근 갱신 시각, 업스트림 원본 표기)
+        self._snapshot_watermark_epoch: Optional[float] = None  # 비교용 epoch 초
+        self._summary_timestamps: Dict[str, str] = {}
+        self._last_full_sync = 0.0
+        self._delta_supported = True
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_fetch_lock = threading.Lock()
+
+        # RAG 서비스 서킷 브레이커 (장애 시 즉시 실패, 멱등 GET은 헤지 요청)
+        self.breaker = get_circuit_breaker("rag_service")
+
+        # 디스크 스냅샷 (재시작/스케일아웃 시 원격 조회 없이 바로 검색 가능)
+        self._disk_snapshot = SummarySnapshotStore(SUMMARY_DISK_SNAPSHOT_DIR) if SUMMARY_DISK_SNAPSHOT_ENABLED else None
+        self._disk_persist_lock = threading.Lock()
+        self._load_disk_snapshot()
+    
+    def _get(self, url: str, hedge: bool = False, **kwargs) -> requests.Response:
+        """서킷 브레이커를 거친 GET (5xx/연결 오류는 실패로 집계, hedge=True면 p95 지연 후 헤지 요청)"""
+        def _send() -> requests.Response:
+            response = self.session.get(url, **kwargs)
+            if response.status_code >= 500:
+                response.close()
+                response.raise_for_status()
+            return response
+        # 헤지 경쟁에서 진 응답은 연결 풀로 돌려보내도록 닫는다 (stream=True면 본문을 읽지 않아 연결이 묶임)
+        return self.breaker.call(_send, hedge=hedge, discard=lambda response: response.close())
+
     def get_all_summaries(self) -> Dict[str, Dict[str, List[float]]]:
         """전체 요약본 임베딩 조회 (GET /api/rag/script-summaries)"""
         try:
-            response = self.session.get(
+            response = self._get(
                 f"{self.base_url}/api/rag/script-summaries",
                 timeout=self.timeout
             )
@@ -103,6 +199,8 @@ class RAGClient:
             result = response.json()
             logger.info("전체 요약본 조회 완료(GET)")
             return self._normalize_summaries(result)
+        except CircuitOpenError:
+            raise
         except requests.exceptions.RequestException as e:
             logger.error(f"전체 요약본 조회 실패: {str(e)}")
             raise Exception(f"전체 요약본 조회 실패: {str(e)}")
@@ -110,6 +208,270 @@ class RAGClient:
             logger.error(f"전체 요약본 조회 중 오류: {str(e)}")
             raise Exception(f"전체 요약본 조회 중 오류: {str(e)}")
 
+    def _parse_max_age(self, response) -> Optional[float]:
+        """Cache-Control: max-age=N 헤더 값 (없으면 None)"""
+        match = re.search(r"max-age=(\d+)", response.headers.get("Cache-Control", ""))
+        return float(match.group(1)) if match else None
+
+    def _load_disk_snapshot(self) -> None:
+        """디스크 스냅샷이 있으면 메모리 매핑으로 올리고, 첫 조회 때 백그라운드 재검증하도록 만료 처리"""
+        if self._disk_snapshot is None:
+            return
+        loaded = self._disk_snapshot.load()
+        if loaded is None:
+            return
+
+        store, manifest = loaded
+        metadata = manifest.get("metadata", {})
+        now = time.monotonic()
+        self._snapshot_store = store
+        self._snapshot_generation += 1
+        self._snapshot_etag = metadata.get("etag")
+        self._snapshot_watermark_epoch = self._timestamp_epoch(metadata.get("watermark"))
+        self._snapshot_watermark = metadata.get("watermark") if self._snapshot_watermark_epoch is not None else None
+        self._summary_timestamps = dict(metadata.get("timestamps") or {})
+        self._last_full_sync = now - max(0.0, time.time() - metadata.get("full_sync_at", 0.0))
+        self._snapshot_fetched_at = now - self._snapshot_max_age
+
+    def _persist_snapshot(self) -> None:
+        """현재 스냅샷을 백그라운드 스레드에서 디스크에 저장"""
+        if self._disk_snapshot is None:
+            return
+
+        def _run():
+            with self._disk_persist_lock:
+                with self._snapshot_lock:
+                    store = self._snapshot_store
+                    generation = self._snapshot_generation
+                    metadata = {
+                        "etag": self._snapshot_etag,
+                        "watermark": self._snapshot_watermark,
+                        "timestamps": dict(self._summary_timestamps),
+                        "full_sync_at": time.time() - (time.monotonic() - self._last_full_sync)
+                    }
+                if store is None:
+                    return
+                try:
+                    version = self._disk_snapshot.save(store, metadata)
+                except Exception as e:
+                    logger.warning(f"요약본 디스크 스냅샷 저장 실패: {str(e)}")
+                    return
+
+                # 저장한 버전을 메모리 매핑으로 다시 열어 프로세스 메모리의 행렬을 교체 (그 사이 바뀌었으면 유지)
+                loaded = self._disk_snapshot.load(version)
+                if loaded is None:
+                    return
+                with self._snapshot_lock:
+                    if self._snapshot_generation == generation:
+                        self._snapshot_store = loaded[0]
+
+        threading.Thread(target=_run, name="rag-snapshot-persist", daemon=True).start()
+
+    def _read_summary_payload(self, response) -> Any:
+        """요약본 응답 본문 디코딩 (스트리밍 시 임베딩을 float32 버퍼에 바로 기록)"""
+        if SUMMARY_STREAM_DECODE_ENABLED:
+            response.raw.decode_content = True
+            return decode_summary_stream(response.raw)
+        return response.json()
+
+    def _latest_timestamp(self, timestamps: List[str]) -> Tuple[Optional[str], Optional[float]]:
+        """가장 최근 갱신 시각 (원본 표기, epoch 초) — 해석할 수 없는 값이 하나라도 있으면 (None, None)"""
+        latest: Tuple[Optional[str], Optional[float]] = (None, None)
+        for ts in timestamps:
+            epoch = self._timestamp_epoch(ts)
+            if epoch is None:
+                logger.warning(f"요약본 갱신 시각 해석 실패, 증분 동기화 대신 전체 재동기화합니다: {ts!r}")
+                return None, None
+            if latest[1] is None or epoch > latest[1]:
+                latest = (ts, epoch)
+        return latest
+
+    def _is_superseded(self, generation: int) -> bool:
+        """갱신을 시작할 때의 스냅샷(세대)이 이미 다른 갱신으로 교체됐는지 (_snapshot_lock 보유 상태에서 호출)"""
+        if self._snapshot_generation == generation:
+            return False
+        logger.info("요약본 스냅샷이 다른 갱신으로 먼저 교체되어 이번 결과는 반영하지 않습니다.")
+        return True
+
+    def _apply_full_snapshot(self, records: List[Tuple[str, List[float], Optional[str]]], etag: Optional[str],
+                             generation: int) -> None:
+        """전체 응답으로 스냅샷 교체 (워터마크/갱신 시각 재계산)
+
+        저장소는 잠금 밖에서 만들고, 잠금 안에서 시작 시점 세대(generation)가 그대로일 때만 교체한다
+        (늦게 끝난 갱신이 더 새로운 스냅샷/워터마크를 덮어쓰지 않도록).
+        """
+        store = SummaryEmbeddingStore.from_items(
+            ((sid, embedding) for sid, embedding, _ in records), dtype=SUMMARY_EMBEDDING_DTYPE
+        )
+        logger.info(f"요약본 저장소 생성: {len(store)}개, {store.nbytes / 1024:.1f}KB ({store.dtype})")
+        timestamps = {sid: ts for sid, _, ts in records if ts}
+        watermark, watermark_epoch = self._latest_timestamp(list(timestamps.values()))
+        with self._snapshot_lock:
+            if self._is_superseded(generation):
+                return
+            self._snapshot_store = store
+            self._snapshot_generation += 1
+            self._snapshot_etag = etag
+            self._summary_timestamps = timestamps
+            self._snapshot_watermark = watermark
+            self._snapshot_watermark_epoch = watermark_epoch
+            self._last_full_sync = time.monotonic()
+        self._persist_snapshot()
+
+    def _mark_snapshot_fresh(self, response) -> None:
+        """스냅샷 조회 시각과 max-age 갱신"""
+        server_max_age = self._parse_max_age(response)
+        with self._snapshot_lock:
+            self._snapshot_fetched_at = time.monotonic()
+            self._snapshot_max_age = server_max_age if server_max_age is not None else SUMMARY_SNAPSHOT_MAX_AGE
+
+    def _can_delta_sync(self) -> bool:
+        """증분 동기화 가능 여부 (스냅샷/워터마크 존재 + 전체 재동기화 주기 이내)"""
+        return (
+            SUMMARY_DELTA_SYNC_ENABLED
+            and self._delta_supported
+            and self._snapshot_store is not None
+            and self._snapshot_watermark_epoch is not None
+            and time.monotonic() - self._last_full_sync < SUMMARY_FULL_RESYNC_INTERVAL
+        )
+
+    def _refresh_full(self) -> None:
+        """전체 요약본 다운로드 (ETag가 있으면 If-None-Match로 재검증)"""
+        generation = self._snapshot_generation
+        headers = {}
+        if self._snapshot_etag:
+            headers["If-None-Match"] = self._snapshot_etag
+
+        with self._get(
+            f"{self.base_url}/api/rag/script-summaries",
+            headers=headers,
+            timeout=self.timeout,
+            stream=True
+        ) as response:
+            if response.status_code == 304 and self._snapshot_store is not None:
+                logger.info("전체 요약본 스냅샷 재검증: 변경 없음(304)")
+                with self._snapshot_lock:
+                    self._last_full_sync = time.monotonic()
+            else:
+                response.raise_for_status()
+                result = self._read_summary_payload(response)
+                logger.info("전체 요약본 조회 완료(GET)")
+                self._apply_full_snapshot(list(self._iter_summary_records(result)), response.headers.get("ETag"), generation)
+            self._mark_snapshot_fresh(response)
+
+    def _refresh_delta(self) -> None:
+        """워터마크 이후 변경된 요약본만 조회해 스냅샷에 병합
+
+        업스트림이 필터를 지원하지 않아 워터마크 이전 항목까지 돌려주면 그 응답을 전체 스냅샷으로 사용하고
+        이후로는 증분 동기화를 끈다. 갱신 시각은 epoch 초로 정규화해 비교하고, 해석할 수 없는 값이 있으면
+        전체 재동기화한다.
+        """
+        with self._snapshot_lock:
+            base = self._snapshot_store
+            generation = self._snapshot_generation
+            watermark = self._snapshot_watermark
+            watermark_epoch = self._snapshot_watermark_epoch
+        with self._get(
+            f"{self.base_url}/api/rag/script-summaries",
+            params={SUMMARY_DELTA_PARAM: watermark},
+            timeout=self.timeout,
+            stream=True
+        ) as response:
+            if response.status_code in (400, 404, 422):
+                self._delta_supported = False
+                raise Exception(f"증분 조회 미지원 응답: {response.status_code}")
+            response.raise_for_status()
+            records = list(self._iter_summary_records(self._read_summary_payload(response)))
+
+        epochs = [self._timestamp_epoch(ts) for _, _, ts in records]
+        if any(ts is not None and epoch is None for (_, _, ts), epoch in zip(records, epochs)):
+            raise Exception("증분 응답의 갱신 시각 해석 실패")
+        if any(epoch is None or epoch < watermark_epoch for epoch in epochs):
+            logger.warning("업스트림이 증분 필터를 적용하지 않음 → 응답을 전체 스냅샷으로 사용하고 증분 동기화 중단")
+            self._delta_supported = False
+            self._apply_full_snapshot(records, response.headers.get("ETag"), generation)
+        elif records:
+            # 새 저장소는 잠금 밖에서 만들고, 시작 시점 스냅샷이 그대로일 때만 교체
+            store = base.upsert((sid, embedding) for sid, embedding, _ in records)
+            with self._snapshot_lock:
+                if self._is_superseded(generation):
+                    return
+                self._snapshot_store = store
+                self._snapshot_generation += 1
+                for sid, _, ts in records:
+                    self._summary_timestamps[sid] = ts
+                latest, latest_epoch = self._latest_timestamp([ts for _, _, ts in records])
+                if latest_epoch > watermark_epoch:
+                    self._snapshot_watermark = latest
+                    self._snapshot_watermark_epoch = latest_epoch
+            logger.info(f"요약본 증분 동기화: {len(records)}개 변경 반영 (워터마크 {self._snapshot_watermark})")
+            self._persist_snapshot()
+        else:
+            logger.info(f"요약본 증분 동기화: 변경 없음 (워터마크 {watermark})")
+        self._mark_snapshot_fresh(response)
+
+    def _refresh_snapshot(self) -> None:
+        """전체 요약본 스냅샷 갱신 (가능하면 증분, 실패/미지원 시 전체 재동기화)"""
+        try:
+            if self._can_delta_sync():
+                try:
+                    self._refresh_delta()
+                    return
+                except Exception as e:
+                    logger.warning(f"요약본 증분 동기화 실패, 전체 재동기화합니다: {str(e)}")
+            self._refresh_full()
+        except CircuitOpenError:
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.error(f"전체 요약본 조회 실패: {str(e)}")
+            raise Exception(f"전체 요약본 조회 실패: {str(e)}")
+        except Exception as e:
+            logger.error(f"전체 요약본 조회 중 오류: {str(e)}")
+            raise Exception(f"전체 요약본 조회 중 오류: {str(e)}")
+
+    def get_summary_timestamp(self, script_id: str) -> Optional[str]:
+        """스냅샷에 기록된 요약본 갱신 시각 (없으면 None)"""
+        return self._summary_timestamps.get(script_id)
+
+    def _refresh_snapshot_in_background(self) -> None:
+        """백그라운드 스레드에서 스냅샷 갱신 (동시에 하나만 실행)"""
+        with self._snapshot_lock:
+            if self._snapshot_refreshing:
+                return
+            self._snapshot_refreshing = True
+
+        def _run():
+            try:
+                self._refresh_snapshot()
+            except Exception as e:
+                logger.warning(f"요약본 스냅샷 백그라운드 갱신 실패, 기존 스냅샷 유지: {str(e)}")
+            finally:
+                with self._snapshot_lock:
+                    self._snapshot_refreshing = False
+
+        threading.Thread(target=_run, name="rag-snapshot-refresh", daemon=True).start()
+
+    def get_summary_store(self) -> SummaryEmbeddingStore:
+        """전체 요약본 임베딩을 압축 저장소 형태로 조회 (GET /api/rag/script-summaries)
+
+        - 스냅샷이 없으면 동기 조회 (동시 요청은 한 번만 다운로드)
+        - max-age가 지나면 기존 스냅샷을 바로 반환하고 백그라운드에서 재검증 (stale-while-revalidate)
+        - SUMMARY_SNAPSHOT_MAX_STALE을 넘기면 동기 갱신
+        """
+        store = self._snapshot_store
+        age = time.monotonic() - self._snapshot_fetched_at
+
+        if store is None or age > SUMMARY_SNAPSHOT_MAX_STALE:
+            with self._snapshot_fetch_lock:
+                # 대기하는 동안 다른 요청이 이미 갱신했으면 재사용
+                if self._snapshot_store is None or time.monotonic() - self._snapshot_fetched_at > SUMMARY_SNAPSHOT_MAX_STALE:
+                    self._refresh_snapshot()
+                return self._snapshot_store
+
+        if age > self._snapshot_max_age:
+            self._refresh_snapshot_in_background()
+        return store
+
     def get_summary_by_ids(self, script_ids: List[str]) -> Dict[str, Dict[str, List[float]]]:
         """특정 script_id들의 요약본 임베딩 조회 (GET, 쉼표 구분 다중 필터)"""
         try:
@@ -119,8 +481,9 @@ class RAGClient:
             params = {
                 "scriptIds": ",".join(script_ids)
             }
-            response = self.session.get(
+            response = self._get(
                 f"{self.base_url}/api/rag/script-summaries",
+                hedge=True,
                 params=params,
                 timeout=self.timeout
             )
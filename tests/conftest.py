@@ -0,0 +1,14 @@
+"""
+테스트 공통 설정 (설정 모듈 로드 전에 외부 서비스 없이 동작하도록 환경변수 기본값 지정)
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://test.openai.azure.com")
+os.environ.setdefault("AZURE_OPENAI_API_VERSION", "2024-02-01")
+os.environ.setdefault("AZURE_OPENAI_DEPLOYMENT_NAME", "test-deployment")
+os.environ.setdefault("EMBEDDING_BATCH_ENABLED", "false")
+os.environ.setdefault("EMBEDDING_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "embeddings.sqlite3"))
+os.environ.setdefault("SUMMARY_DISK_SNAPSHOT_DIR", os.path.join(tempfile.mkdtemp(), "summary_snapshot"))
@@ -0,0 +1,78 @@
+"""
+청크 선별 (BM25 하이브리드 점수, 역색인 재사용) 테스트
+"""
+
+import numpy as np
+import pytest
+
+from agents.steps.text_processing import TextProcessor
+from utils.bm25 import BM25Index, ChunkPostings
+
+DIM = 8
+
+def _unit(*values):
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[:len(values)] = values
+    return (vector / np.linalg.norm(vector)).tolist()
+
+@pytest.fixture
+def text_processor(monkeypatch):
+    processor = TextProcessor()
+    monkeypatch.setattr(processor.embedding_manager, "embed_query", lambda question, cache=None: _unit(1.0))
+    return processor
+
+def test_keyword_question_keeps_top_vector_hit(text_processor):
+    # 벡터 최상위 청크는 질의 용어가 없고, 다른 청크들은 질의 용어를 모두 포함
+    top_vector_hit = {"script_id": "s1", "chunk_index": 0, "chunk_text": "다음 분기 광고비를 두 배로 올리기로 했습니다.",
+                      "chunk_embedding": _unit(1.0)}
+    keyword_chunks = [
+        {"script_id": "s1", "chunk_index": i, "chunk_text": f"{topic} 관련 예산 증액 건은 보류합니다.",
+         "chunk_embedding": _unit(0.4, 1.0)}
+        for i, topic in enumerate(["채용", "서버 이전", "사무실 임대", "교육 프로그램", "출장비 정산"], start=1)
+    ]
+    state = {"processed_question": "예산 증액", "chunked_scripts": [top_vector_hit, *keyword_chunks]}
+
+    relevant_chunks = text_processor.select_relevant_chunks(state)["relevant_chunks"]
+
+    assert relevant_chunks[0]["chunk_text"] == top_vector_hit["chunk_text"]
+    assert {chunk["chunk_text"] for chunk in keyword_chunks} <= {chunk["chunk_text"] for chunk in relevant_chunks}
+    # relevance_score는 코사인 유사도 그대로, 순위는 결합 점수(hybrid_score)
+    assert relevant_chunks[0]["relevance_score"] == pytest.approx(1.0)
+    assert relevant_chunks[1]["relevance_score"] == pytest.approx(0.4 / np.hypot(0.4, 1.0))
+    hybrid_scores = [chunk["hybrid_score"] for chunk in relevant_chunks]
+    assert hybrid_scores == sorted(hybrid_scores, reverse=True)
+
+def test_single_weak_term_match_below_similarity_floor_is_not_admitted(text_processor):
+    top_vector_hit = {"script_id": "s1", "chunk_index": 0, "chunk_text": "다음 분기 광고비를 두 배로 올리기로 했습니다.",
+                      "chunk_embedding": _unit(1.0)}
+    # 질의 용어 중 흔한 '검토' 하나만 겹치고 유사도는 임계값(0.4) 미만
+    weak_matches = [
+        {"script_id": "s2", "chunk_index": i, "chunk_text": f"{topic} 건은 다음 회의에서 검토합니다.",
+         "chunk_embedding": _unit(0.3, 1.0)}
+        for i, topic in enumerate(["채용", "서버 이전", "사무실 임대"])
+    ]
+    # 질의 용어를 모두 포함하지만 유사도가 어휘 후보 하한(LEXICAL_MIN_SIMILARITY) 미만
+    unrelated = {"script_id": "s3", "chunk_index": 0, "chunk_text": "예산 증액 일정 검토",
+                 "chunk_embedding": _unit(0.05, 1.0)}
+    state = {"processed_question": "예산 증액 일정 검토", "chunked_scripts": [top_vector_hit, *weak_matches, unrelated]}
+
+    relevant_chunks = text_processor.select_relevant_chunks(state)["relevant_chunks"]
+
+    assert [chunk["chunk_text"] for chunk in relevant_chunks] == [top_vector_hit["chunk_text"]]
+
+def test_postings_match_only_identical_texts():
+    texts = ["예산 증액을 논의했습니다.", "채용 계획을 검토했습니다."]
+    postings = ChunkPostings(texts)
+
+    assert postings.matches(list(texts))
+    # 글자 수가 같아도 내용이 바뀌면 다른 청크 목록
+    assert not postings.matches(["예산 감액을 논의했습니다.", "채용 계획을 검토했습니다."])
+    assert not postings.matches(texts[:1])
+
+def test_stale_postings_are_rebuilt():
+    stale = ChunkPostings(["예산 감액을 논의했습니다."])
+    chunks = [{"script_id": "s1", "chunk_text": "예산 증액을 논의했습니다."}]
+
+    scores, _ = BM25Index.from_chunks(chunks, lambda script_id: stale).score("증액")
+
+    assert scores[0] > 0
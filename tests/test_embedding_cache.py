@@ -0,0 +1,25 @@
+"""
+임베딩 디스크 캐시 용량 관리 테스트
+"""
+
+from utils.embedding_cache import EmbeddingCache
+
+def _stored_bytes(cache):
+    return cache._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+def test_workers_sharing_a_file_respect_max_bytes(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    workers = [EmbeddingCache(path, "deployment", max_bytes=64 * 1024) for _ in range(3)]
+
+    for i in range(60):
+        workers[i % 3].put_many({f"chunk-{i}-{j}": [0.5] * 256 for j in range(4)})
+
+    assert _stored_bytes(workers[0]) <= 64 * 1024
+    assert all(worker.stats()["bytes"] == _stored_bytes(worker) for worker in workers)
+
+def test_replacing_an_entry_updates_total(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite3"), "deployment")
+    cache.put_many({"chunk": [0.5] * 256})
+    cache.put_many({"chunk": [0.5] * 16})
+
+    assert cache.stats()["bytes"] == _stored_bytes(cache) == 16 * 4
@@ -0,0 +1,88 @@
+"""
+같은 내용 청크 벡터 공유 / 유사 중복 검색 결과 접기 테스트
+"""
+
+import hashlib
+
+import numpy as np
+import pytest
+
+from agents.steps.text_processing import TextProcessor
+from utils.simhash import collapse_near_duplicates
+
+class RecordingEmbeddings:
+    """텍스트 해시로 만든 결정적 임베딩 + 임베딩한 텍스트 기록"""
+
+    def __init__(self):
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return [[byte / 255 - 0.5 for byte in hashlib.sha256(text.encode("utf-8")).digest()] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+@pytest.fixture
+def embeddings():
+    return RecordingEmbeddings()
+
+@pytest.fixture
+def text_processor(embeddings):
+    processor = TextProcessor()
+    processor.embedding_manager.embeddings = embeddings
+    processor.embedding_manager.cache = None
+    return processor
+
+SENTENCE = "김팀장: 이번 분기 마케팅 예산은 소셜미디어 캠페인 중심으로 다시 배분하겠습니다. "
+
+def test_chunk_with_appended_text_is_reembedded(text_processor, embeddings):
+    original = SENTENCE * 3
+    appended = original + "이대리: 틱톡 광고도 추가로 검토해 주세요."
+    first = text_processor.embed_chunks({"s1": [{"chunk_text": original, "chunk_index": 0}]})["s1"][0]
+    second = text_processor.embed_chunks({"s1": [{"chunk_text": appended, "chunk_index": 0}]})["s1"][0]
+
+    assert embeddings.texts == [original, appended]
+    assert not np.allclose(first["chunk_embedding"], second["chunk_embedding"])
+
+def test_incremental_rechunk_does_not_reuse_tail_vector(text_processor, embeddings):
+    script = {"script_id": "s1", "timestamp": "t1", "content": SENTENCE * 30}
+    version, _ = text_processor.lookup_stored_chunks(script)
+    chunks = text_processor.embed_chunks({"s1": text_processor.chunk_script(script)})["s1"]
+    text_processor.store_chunks(script, version, chunks)
+    old_vectors = {chunk["chunk_text"]: np.asarray(chunk["chunk_embedding"]) for chunk in chunks}
+
+    grown = {**script, "timestamp": "t2", "content": script["content"] + "이대리: 틱톡 광고도 추가로 검토해 주세요."}
+    embeddings.texts.clear()
+    regrown = text_processor.embed_chunks({"s1": text_processor.chunk_script(grown)})["s1"]
+
+    tail = regrown[-1]
+    assert tail["chunk_text"].endswith("검토해 주세요.")
+    assert tail["chunk_text"] in embeddings.texts
+    assert all(
+        not np.allclose(tail["chunk_embedding"], vector) for text, vector in old_vectors.items() if text != tail["chunk_text"]
+    )
+
+def test_identical_chunks_share_one_embedding(text_processor, embeddings):
+    chunks_by_script = {
+        "s1": [{"chunk_text": SENTENCE, "chunk_index": 0}],
+        "s2": [{"chunk_text": "  " + SENTENCE.upper(), "chunk_index": 0}]
+    }
+    embedded = text_processor.embed_chunks(chunks_by_script)
+
+    assert embeddings.texts == [SENTENCE]
+    assert np.array_equal(embedded["s1"][0]["chunk_embedding"], embedded["s2"][0]["chunk_embedding"])
+
+def test_collapse_across_scripts_keeps_highest_scoring_hit():
+    hits = [
+        {"script_id": "s1", "chunk_text": SENTENCE * 3, "relevance_score": 0.8, "hybrid_score": 0.7},
+        # 같은 회의를 다른 script_id로 다시 올린 청크 (결합 점수가 더 높음)
+        {"script_id": "s2", "chunk_text": SENTENCE * 3 + " ", "relevance_score": 0.75, "hybrid_score": 0.9},
+        {"script_id": "s1", "chunk_text": SENTENCE * 3, "relevance_score": 0.7},
+        {"script_id": "s1", "chunk_text": "이대리: 틱톡 광고도 추가로 검토해 주세요.", "relevance_score": 0.6}
+    ]
+    collapsed = collapse_near_duplicates(hits)
+
+    assert [(hit["script_id"], hit["chunk_text"]) for hit in collapsed] == [
+        ("s2", SENTENCE * 3 + " "), ("s1", "이대리: 틱톡 광고도 추가로 검토해 주세요.")
+    ]
@@ -0,0 +1,84 @@
+"""
+RAG 클라이언트 요약본 스냅샷 동기화 테스트
+"""
+
+import threading
+
+import pytest
+
+from services.rag_client import RAGClient
+from utils.summary_snapshot import SummarySnapshotStore
+from utils.summary_store import is_memory_mapped
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+@pytest.fixture
+def client(monkeypatch):
+    client = RAGClient("http://rag.test")
+    client._disk_snapshot = None
+    monkeypatch.setattr(client, "_read_summary_payload", lambda response: response.payload)
+    monkeypatch.setattr(client, "_iter_summary_records", lambda payload: iter(payload()))
+    client._apply_full_snapshot([("a", [1.0, 0.0], "2024-01-02T03:04:05Z")], None, client._snapshot_generation)
+    return client
+
+@pytest.mark.parametrize("timestamp", ["2024-01-02T12:04:05+09:00", "1704164645000", "2024-01-02 03:04:05"])
+def test_older_timestamps_in_other_formats_force_full_snapshot(client, monkeypatch, timestamp):
+    monkeypatch.setattr(client, "_get", lambda *args, **kwargs: FakeResponse(lambda: [("b", [0.0, 1.0], timestamp)]))
+    client._refresh_delta()
+
+    # 같은 시각(워터마크)은 증분 결과로 인정, 문자열 비교였다면 순서가 뒤바뀜
+    assert client._delta_supported
+    assert "b" in client._snapshot_store
+
+def test_unparseable_timestamp_disables_delta(client):
+    client._apply_full_snapshot([("a", [1.0, 0.0], "yesterday")], None, client._snapshot_generation)
+
+    assert client._snapshot_watermark is None
+    assert not client._can_delta_sync()
+
+def test_late_delta_does_not_overwrite_newer_full_snapshot(client, monkeypatch):
+    def delta_records():
+        # 증분 응답을 읽는 동안 전체 재동기화가 먼저 끝남
+        client._apply_full_snapshot(
+            [("a", [1.0, 0.0], "2024-01-03T00:00:00Z"), ("c", [0.0, 1.0], "2024-01-03T00:00:00Z")],
+            "etag-new", client._snapshot_generation
+        )
+        return [("b", [0.0, 1.0], "2024-01-02T05:00:00Z")]
+
+    monkeypatch.setattr(client, "_get", lambda *args, **kwargs: FakeResponse(delta_records))
+    client._refresh_delta()
+
+    assert "c" in client._snapshot_store and "b" not in client._snapshot_store
+    assert client._snapshot_etag == "etag-new"
+    assert client._snapshot_watermark == "2024-01-03T00:00:00Z"
+
+def _join_persist_threads():
+    for thread in threading.enumerate():
+        if thread.name == "rag-snapshot-persist":
+            thread.join()
+
+def test_persisted_snapshot_is_memory_mapped(client, monkeypatch, tmp_path):
+    client._disk_snapshot = SummarySnapshotStore(str(tmp_path))
+    client._apply_full_snapshot([("a", [1.0, 0.0], "2024-01-02T03:04:05Z")], None, client._snapshot_generation)
+    _join_persist_threads()
+    assert is_memory_mapped(client._snapshot_store.matrix)
+
+    # 메모리 매핑으로 다시 연 교체는 진행 중인 증분 동기화를 밀어내지 않음
+    monkeypatch.setattr(client, "_get", lambda *args, **kwargs: FakeResponse(lambda: [("b", [0.0, 1.0], "2024-01-02T05:00:00Z")]))
+    client._refresh_delta()
+    _join_persist_threads()
+    assert "b" in client._snapshot_store and is_memory_mapped(client._snapshot_store.matrix)
@@ -0,0 +1,73 @@
+"""
+요약본 임베딩 저장소 (양자화 후보 + 재채점 행렬 메모리 매핑) 테스트
+"""
+
+import numpy as np
+import pytest
+
+import utils.summary_store as summary_store
+import utils.summary_snapshot as summary_snapshot
+from utils.summary_snapshot import SummarySnapshotStore
+from utils.summary_store import SummaryEmbeddingStore, is_memory_mapped
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).normal(size=(2000, 64)).astype(np.float32)
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_quantized_store_keeps_only_codes_resident(monkeypatch, vectors, mode):
+    monkeypatch.setattr(summary_store, "SUMMARY_QUANTIZATION", mode)
+    store = SummaryEmbeddingStore.from_items((f"s{i}", vector) for i, vector in enumerate(vectors))
+
+    assert is_memory_mapped(store.matrix)
+    assert store.nbytes == store.quantized.codes.nbytes + store.ids.nbytes
+    assert store.nbytes < vectors.nbytes / 3
+
+    query = vectors[42] + 0.05 * np.random.default_rng(1).normal(size=64).astype(np.float32)
+    assert store.search(query, top_k=1) == store.search(query, top_k=1, exact=True)
+    assert store.search(query, top_k=1)[0][0] == "s42"
+
+def test_upserted_quantized_store_stays_mapped(monkeypatch, vectors):
+    monkeypatch.setattr(summary_store, "SUMMARY_QUANTIZATION", "int8")
+    store = SummaryEmbeddingStore.from_items((f"s{i}", vector) for i, vector in enumerate(vectors[:100]))
+    updated = store.upsert([("s1", vectors[500]), ("new", vectors[501])])
+
+    assert is_memory_mapped(updated.matrix)
+    assert updated.search(vectors[501], top_k=1)[0][0] == "new"
+    assert np.allclose(updated.get_embedding("s1"), vectors[500] / np.linalg.norm(vectors[500]), atol=1e-6)
+
+def _configure_ann(monkeypatch, min_size, nprobe):
+    for module in (summary_store, summary_snapshot):
+        monkeypatch.setattr(module, "SUMMARY_ANN_MIN_SIZE", min_size)
+        monkeypatch.setattr(module, "SUMMARY_ANN_NPROBE", nprobe)
+
+def test_snapshot_load_applies_current_settings(monkeypatch, tmp_path, vectors):
+    _configure_ann(monkeypatch, 1000, 4)
+    snapshots = SummarySnapshotStore(str(tmp_path))
+    snapshots.save(SummaryEmbeddingStore.from_items((f"s{i}", vector) for i, vector in enumerate(vectors)))
+
+    _configure_ann(monkeypatch, 1000, 16)
+    store, _ = snapshots.load()
+    assert store.ann is not None and store.ann.nprobe == 16
+
+    _configure_ann(monkeypatch, 5000, 16)
+    store, _ = snapshots.load()
+    assert store.ann is None
+
+    _configure_ann(monkeypatch, 1000, 16)
+    monkeypatch.setattr(summary_snapshot, "SUMMARY_EMBEDDING_DTYPE", "float16")
+    store, _ = snapshots.load()
+    assert store.dtype == "float16" and store.ann is not None and store.ann.nprobe == 16
+    assert store.search(vectors[7], top_k=1)[0][0] == "s7"
+
+def test_snapshot_save_keeps_newer_current_version(tmp_path, vectors):
+    snapshots = SummarySnapshotStore(str(tmp_path), keep_versions=1)
+    store = SummaryEmbeddingStore.from_items((f"s{i}", vector) for i, vector in enumerate(vectors[:10]))
+    newer = snapshots.save(store)
+    (tmp_path / "CURRENT").write_text("99991231000000-ffffffff", encoding="utf-8")
+    (tmp_path / "99991231000000-ffffffff").mkdir()
+
+    # 다른 워커가 더 최근 버전을 CURRENT로 올려 둔 상태에서 늦게 끝난 저장
+    snapshots.save(store)
+    assert (tmp_path / "CURRENT").read_text(encoding="utf-8") == "99991231000000-ffffffff"
+    assert (tmp_path / "99991231000000-ffffffff").exists() and not (tmp_path / newer).exists()
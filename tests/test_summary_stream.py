@@ -0,0 +1,35 @@
+"""
+요약본 스트리밍 디코더 테스트
+"""
+
+import io
+import json
+
+import numpy as np
+import pytest
+
+from utils.summary_stream import decode_summary_stream
+
+def _decode(payload, chunk_size=7):
+    return decode_summary_stream(io.BytesIO(json.dumps(payload).encode("utf-8")), chunk_size)
+
+def test_short_numeric_field_does_not_fix_dimension():
+    payload = [
+        {"scriptId": "a", "scores": [1, 2], "embedding": [0.1, 0.2, 0.3]},
+        {"scriptId": "b", "embedding": [0.4, 0.5, 0.6], "scores": [3]},
+    ]
+    decoded = _decode(payload)
+    assert decoded[0]["scores"] == [1, 2]
+    assert decoded[1]["scores"] == [3]
+    assert np.allclose(decoded[0]["embedding"], [0.1, 0.2, 0.3])
+    assert np.allclose(decoded[1]["embedding"], [0.4, 0.5, 0.6])
+
+def test_mapping_values_decoded_as_vectors():
+    decoded = _decode({"all_summaries": {"a": [0.1, 0.2], "b": {"embedding": [0.3, 0.4]}}})
+    assert np.allclose(decoded["all_summaries"]["a"], [0.1, 0.2])
+    assert np.allclose(decoded["all_summaries"]["b"]["embedding"], [0.3, 0.4])
+
+def test_mismatched_embedding_dimension_rejected():
+    payload = [{"scriptId": "a", "embedding": [0.1, 0.2, 0.3]}, {"scriptId": "b", "embedding": [0.4, 0.5]}]
+    with pytest.raises(ValueError, match="차원 불일치"):
+        _decode(payload)
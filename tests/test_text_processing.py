@@ -0,0 +1,64 @@
+"""
+chunk_text / split_text_spans 와 LangChain RecursiveCharacterTextSplitter 동등성 테스트
+"""
+
+import random
+
+import pytest
+
+from utils.text_processing import CHUNK_SEPARATORS, chunk_text, clean_text, split_text_spans
+
+text_splitters = pytest.importorskip("langchain_text_splitters")
+
+KOREAN_TEXT = (
+    "안녕하세요. 오늘 회의는 3분기 마케팅 예산 검토입니다.\n\n"
+    "김팀장: 인스타그램 캠페인 성과가 좋았습니다! 예산을 늘릴까요?\n"
+    "이대리: 네, 틱톡도 같이 검토하면 좋겠습니다. 다음 주까지 자료를 준비하겠습니다.\n\n"
+) * 20
+NO_SEPARATOR_TEXT = "가나다라마바사아자차카타파하" * 40
+WHITESPACE_TEXT = "회의   시작\n\n\n\n안건   검토 \t\t 결정\n \n  .  .   다음    회의\n\n" * 15
+
+def _reference(text, chunk_size, chunk_overlap, separators=CHUNK_SEPARATORS):
+    splitter = text_splitters.RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=separators
+    )
+    return [doc.page_content for doc in splitter.create_documents([text])]
+
+def _chunks(text, chunk_size, chunk_overlap, separators=None):
+    return [text[start:end] for start, end in split_text_spans(text, chunk_size, chunk_overlap, separators)]
+
+@pytest.mark.parametrize("text", [KOREAN_TEXT, NO_SEPARATOR_TEXT, WHITESPACE_TEXT, clean_text(WHITESPACE_TEXT)],
+                         ids=["korean", "no_separator", "whitespace_runs", "whitespace_cleaned"])
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(1000, 200), (100, 20), (50, 0), (30, 29), (20, 20), (7, 7), (1, 0), (1, 1)])
+def test_matches_langchain(text, chunk_size, chunk_overlap):
+    assert _chunks(text, chunk_size, chunk_overlap) == _reference(text, chunk_size, chunk_overlap)
+
+@pytest.mark.parametrize("separators", [["\n", " ", ""], [" "], ["\n\n"]])
+@pytest.mark.parametrize("text", [KOREAN_TEXT, NO_SEPARATOR_TEXT, WHITESPACE_TEXT], ids=["korean", "no_separator", "whitespace_runs"])
+def test_matches_langchain_custom_separators(text, separators):
+    assert _chunks(text, 60, 15, separators) == _reference(text, 60, 15, separators)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_langchain_random(seed):
+    rng = random.Random(seed)
+    alphabet = ["가", "회의", "a", " ", "   ", ".", ". ", "! ", "? ", "\n", "\n\n", "\t", "가" * 80, "...", "!?"]
+    for _ in range(50):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 300)))
+        chunk_size = rng.choice([5, 10, 50, 200])
+        chunk_overlap = rng.randint(0, chunk_size)
+        assert _chunks(text, chunk_size, chunk_overlap) == _reference(text, chunk_size, chunk_overlap)
+
+def test_overlap_larger_than_chunk_size_rejected():
+    with pytest.raises(ValueError):
+        _reference(KOREAN_TEXT, 10, 11)
+    with pytest.raises(ValueError):
+        split_text_spans(KOREAN_TEXT, 10, 11)
+
+@pytest.mark.parametrize("text", ["", "   ", "\n\n\n"])
+def test_blank_text(text):
+    assert _chunks(text, 10, 2) == _reference(text, 10, 2)
+
+def test_chunk_offsets_point_into_source():
+    chunks = chunk_text(KOREAN_TEXT, 100, 20)
+    assert [chunk["chunk_index"] for chunk in chunks] == list(range(len(chunks)))
+    assert all(KOREAN_TEXT[chunk["start"]:chunk["end"]] == chunk["chunk_text"] for chunk in chunks)
@@ -0,0 +1,148 @@
+"""
+요약본 검색용 근사 최근접 이웃(ANN) 인덱스 - IVF (k-means 조대 양자화)
+"""
+
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class IVFIndex:
+    """정규화된 벡터용 IVF 인덱스 (순수 NumPy)
+
+    - 구면 k-means로 nlist개 중심을 학습하고 각 행을 가장 가까운 중심의 역리스트에 배정
+    - 검색 시 쿼리와 가까운 nprobe개 리스트의 행만 후보로 반환 (정확도/지연 조절)
+    - 행 추가/갱신은 재학습 없이 역리스트만 수정 (증분 삽입)
+    """
+
+    # 중심 배정 시 한 번에 계산하는 행 수
+    BLOCK_ROWS = 8192
+
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray, trained_size: int, nprobe: int = 8):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.assignments = np.asarray(assignments, dtype=np.int32)
+        self.trained_size = trained_size
+        self.nprobe = nprobe
+        self.lists: List[np.ndarray] = self._build_lists(self.assignments, len(self.centroids))
+
+    @staticmethod
+    def _build_lists(assignments: np.ndarray, nlist: int) -> List[np.ndarray]:
+        """행→리스트 배정 배열에서 역리스트 생성"""
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(nlist + 1))
+        return [order[bounds[i]:bounds[i + 1]].astype(np.int64) for i in range(nlist)]
+
+    @classmethod
+    def _assign(cls, matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """각 행을 내적이 가장 큰 중심에 배정 (블록 단위)"""
+        if len(matrix) == 0:
+            return np.empty(0, dtype=np.int32)
+        parts = []
+        for start in range(0, len(matrix), cls.BLOCK_ROWS):
+            block = matrix[start:start + cls.BLOCK_ROWS].astype(np.float32, copy=False)
+            parts.append(np.argmax(block @ centroids.T, axis=1).astype(np.int32))
+        return np.concatenate(parts)
+
+    @classmethod
+    def train(
+        cls,
+        matrix: np.ndarray,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        iterations: int = 10,
+        max_train_rows_per_list: int = 64,
+        seed: int = 0
+    ) -> "IVFIndex":
+        """정규화된 행렬로 구면 k-means 학습 후 전체 행 배정"""
+        n = len(matrix)
+        if n == 0:
+            raise ValueError("빈 행렬로는 IVF 인덱스를 학습할 수 없습니다.")
+
+        nlist = nlist or int(np.sqrt(n))
+        nlist = max(1, min(nlist, n, 4096))
+        rng = np.random.default_rng(seed)
+
+        # 학습용 표본 추출
+        sample_size = min(n, nlist * max_train_rows_per_list)
+        sample_rows = rng.choice(n, size=sample_size, replace=False) if sample_size < n else np.arange(n)
+        sample = np.asarray(matrix[np.sort(sample_rows)], dtype=np.float32)
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = cls._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+
+            # 빈 클러스터는 임의의 표본으로 다시 시드
+            empty = np.flatnonzero(counts == 0)
+            if len(empty):
+                sums[empty] = sample[rng.choice(len(sample), size=len(empty), replace=False)]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = sums / norms
+
+        assignments = cls._assign(matrix, centroids)
+        logger.info(f"IVF 인덱스 학습 완료: {n}개 벡터, {nlist}개 리스트")
+        return cls(centroids, assignments, trained_size=n, nprobe=nprobe)
+
+    def __len__(self) -> int:
+        return len(self.assignments)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def needs_retrain(self, growth_factor: float = 4.0) -> bool:
+        """학습 시점 대비 크기가 많이 늘어 리스트 균형이 깨졌는지 여부"""
+        return len(self) > self.trained_size * growth_factor
+
+    def copy(self) -> "IVFIndex":
+        """중심은 공유하고 배정/역리스트만 복사 (읽기 중인 인덱스와 분리)"""
+        clone = IVFIndex.__new__(IVFIndex)
+        clone.centroids = self.centroids
+        clone.assignments = self.assignments.copy()
+        clone.trained_size = self.trained_size
+        clone.nprobe = self.nprobe
+        clone.lists = list(self.lists)
+        return clone
+
+    def add(self, vectors: np.ndarray) -> None:
+        """새 행을 끝에 추가 (행 번호는 기존 크기부터 이어짐)"""
+        if len(vectors) == 0:
+            return
+        start = len(self.assignments)
+        labels = self._assign(vectors, self.centroids)
+        self.assignments = np.concatenate([self.assignments, labels])
+        rows = np.arange(start, start + len(labels), dtype=np.int64)
+        for label in np.unique(labels):
+            self.lists[label] = np.concatenate([self.lists[label], rows[labels == label]])
+
+    def update(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """기존 행의 벡터가 바뀐 경우 리스트 재배정"""
+        if len(rows) == 0:
+            return
+        rows = np.asarray(rows, dtype=np.int64)
+        old_labels = self.assignments[rows]
+        new_labels = self._assign(vectors, self.centroids)
+        moved = old_labels != new_labels
+        if not moved.any():
+            return
+        for label in np.unique(old_labels[moved]):
+            self.lists[label] = np.setdiff1d(self.lists[label], rows[moved & (old_labels == label)])
+        for label in np.unique(new_labels[moved]):
+            self.lists[label] = np.union1d(self.lists[label], rows[moved & (new_labels == label)])
+        self.assignments[rows[moved]] = new_labels[moved]
+
+    def candidates(self, query: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """쿼리와 가까운 nprobe개 리스트에 속한 행 번호"""
+        nprobe = max(1, min(nprobe or self.nprobe, self.nlist))
+        centroid_scores = self.centroids @ np.asarray(query, dtype=np.float32)
+        if nprobe < self.nlist:
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probe = np.arange(self.nlist)
+        return np.concatenate([self.lists[i] for i in probe])
@@ -0,0 +1,136 @@
+"""
+청크 BM25 역색인 (한글 음절 바이그램 + 영문/숫자 단어)
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.text_processing import STOPWORDS, hash_chunk_texts
+
+# 한글 연속 구간과 영문/숫자 단어를 따로 추출 (한글은 조사/어미가 붙으므로 음절 바이그램으로 색인)
+_TOKEN_PATTERN = re.compile(r'[가-힣]+|[a-z0-9]+')
+
+def tokenize(text: str) -> List[str]:
+    """BM25 색인/질의 토큰 (한글: 음절 바이그램, 한 글자면 그대로 / 영문·숫자: 소문자 단어, 불용어 제외)"""
+    tokens: List[str] = []
+    for word in _TOKEN_PATTERN.findall((text or "").lower()):
+        if '가' <= word[0] <= '힣':
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        elif word not in STOPWORDS:
+            tokens.append(word)
+    return tokens
+
+class ChunkPostings:
+    """한 스크립트 청크들의 역색인 (용어 → (청크 위치 배열, 출현 빈도 배열)) + 청크별 토큰 수 + 청크 텍스트 해시"""
+
+    def __init__(self, texts: Sequence[str]):
+        rows_by_term: Dict[str, List[int]] = {}
+        tfs_by_term: Dict[str, List[int]] = {}
+        lengths = []
+        for row, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                rows_by_term.setdefault(term, []).append(row)
+                tfs_by_term.setdefault(term, []).append(tf)
+
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            term: (np.asarray(rows, dtype=np.int32), np.asarray(tfs_by_term[term], dtype=np.float32))
+            for term, rows in rows_by_term.items()
+        }
+        self.lengths = np.asarray(lengths, dtype=np.float32)
+        # 같은 청크 목록인지 확인용
+        self.texts_hash = hash_chunk_texts(texts)
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def matches(self, texts: Sequence[str]) -> bool:
+        """이 색인이 texts 청크 목록으로 만든 것인지 (청크 텍스트 해시 비교)"""
+        return len(texts) == len(self) and hash_chunk_texts(texts) == self.texts_hash
+
+class BM25Index:
+    """여러 스크립트의 ChunkPostings를 묶어 청크 목록 전체를 BM25로 점수화
+
+    스크립트별 역색인은 청크 저장소에 함께 저장된 것을 재사용하고, 문서 빈도/평균 길이는
+    질의 대상 청크 목록 기준으로 계산한다.
+    """
+
+    def __init__(self, parts: Sequence[Tuple[ChunkPostings, np.ndarray]], k1: float = 1.2, b: float = 0.75):
+        # parts: (스크립트 역색인, 역색인 위치 → 청크 목록 행 번호)
+        self.parts = list(parts)
+        self.k1 = k1
+        self.b = b
+        self.size = sum(len(rows) for _, rows in self.parts)
+        self.lengths = np.zeros(self.size, dtype=np.float32)
+        for postings, rows in self.parts:
+            self.lengths[rows] = postings.lengths
+        self.avg_length = float(self.lengths.mean()) if self.size and self.lengths.mean() > 0 else 1.0
+
+    @classmethod
+    def from_chunks(
+        cls,
+        chunks: Sequence[Dict],
+        postings_source: Optional[Callable[[str], Optional[ChunkPostings]]] = None
+    ) -> "BM25Index":
+        """청크 목록으로 색인 구성 (postings_source의 스크립트 역색인이 청크와 맞으면 재사용, 아니면 새로 생성)"""
+        rows_by_script: Dict[str, List[int]] = {}
+        for row, chunk in enumerate(chunks):
+            rows_by_script.setdefault(chunk.get("script_id"), []).append(row)
+
+        parts = []
+        for script_id, rows in rows_by_script.items():
+            texts = [chunks[row].get("chunk_text", "") for row in rows]
+            postings = postings_source(script_id) if postings_source and script_id is not None else None
+            if postings is None or not postings.matches(texts):
+                postings = ChunkPostings(texts)
+            parts.append((postings, np.asarray(rows, dtype=np.int64)))
+        return cls(parts)
+
+    def _idf(self, doc_freq: int) -> float:
+        return math.log(1 + (self.size - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def _doc_freq(self, term: str) -> int:
+        return sum(len(postings.postings[term][0]) for postings, _ in self.parts if term in postings.postings)
+
+    def score(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """질의에 대한 청크별 BM25 점수와 질의 용어 포함 비율 (질의 토큰이 없으면 모두 0)"""
+        scores = np.zeros(self.size, dtype=np.float32)
+        matched = np.zeros(self.size, dtype=np.float32)
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or self.size == 0:
+            return scores, matched
+
+        for term in terms:
+            hits = [(postings.postings[term], rows) for postings, rows in self.parts if term in postings.postings]
+            doc_freq = sum(len(term_rows) for (term_rows, _), _ in hits)
+            if doc_freq == 0:
+                continue
+            idf = self._idf(doc_freq)
+            for (term_rows, tfs), rows in hits:
+                target = rows[term_rows]
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[target] / self.avg_length)
+                scores[target] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+                matched[target] += 1
+
+        return scores, matched / len(terms)
+
+    def normalized_score(self, query: str) -> np.ndarray:
+        """질의 용어 IDF 합 대비 BM25 점수 (0~1로 자름)
+
+        IDF 합은 모든 질의 용어(말뭉치에 없는 용어 포함)가 평균 길이 청크에 한 번씩 나올 때의 점수라서,
+        질의마다 최고점으로 나누는 것과 달리 흔한 용어 하나만 겹친 청크는 낮은 점수에 머문다.
+        """
+        scores, _ = self.score(query)
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or self.size == 0:
+            return scores
+        bound = sum(self._idf(self._doc_freq(term)) for term in terms)
+        return np.minimum(scores / bound, 1.0).astype(np.float32)
@@ -0,0 +1,126 @@
+"""
+스크립트별 청크/임베딩 저장소 (버전 기반 무효화)
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.bm25 import ChunkPostings
+from utils.similarity import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+class ScriptChunkStore:
+    """script_id별 clean_text → chunk_text → 임베딩 결과 저장소
+
+    - 버전(timestamp + 콘텐츠 해시 + 청킹 설정)이 같으면 저장된 청크 행렬을 그대로 반환
+    - 임베딩 행렬은 행 단위 정규화해 저장 (검색 시 재정규화 없이 바로 점수 계산)
+    - 버전이 바뀌면 해당 항목은 무효 처리 (청킹 원문이 새 원문의 앞부분이면 증분 청킹에 재사용 가능)
+    - 청크 텍스트의 BM25 역색인을 함께 저장 (어휘 검색 시 재토큰화 생략)
+    - 스크립트 수 기준 LRU 제거
+    """
+
+    def __init__(self, max_scripts: int = 256):
+        self.max_scripts = max_scripts
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, script_id: str, version: str) -> Optional[List[Dict]]:
+        """버전이 일치하면 임베딩이 포함된 청크 리스트 반환, 아니면 None"""
+        with self._lock:
+            entry = self._entries.get(script_id)
+            if entry is None or entry["version"] != version:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(script_id)
+            self._hits += 1
+
+        return self._materialize(script_id, entry)
+
+    def get_prefix(self, script_id: str, config: str, source: str) -> Optional[Tuple[List[Dict], int]]:
+        """같은 청킹 설정으로 저장된 청킹 원문이 source의 앞부분이면 (임베딩 포함 청크, 저장 당시 원문 길이), 아니면 None"""
+        with self._lock:
+            entry = self._entries.get(script_id)
+        if entry is None or entry.get("config") != config or entry.get("source_length") is None:
+            return None
+        source_length = entry["source_length"]
+        if len(source) < source_length:
+            return None
+        if hashlib.sha256(source[:source_length].encode("utf-8")).hexdigest() != entry["source_hash"]:
+            return None
+        return self._materialize(script_id, entry), source_length
+
+    def get_postings(self, script_id: str) -> Optional[ChunkPostings]:
+        """저장된 청크들의 BM25 역색인 (없으면 None)"""
+        with self._lock:
+            entry = self._entries.get(script_id)
+        return entry["postings"] if entry is not None else None
+
+    def get_matrix(self, script_id: str, texts_hash: str) -> Optional[np.ndarray]:
+        """저장된 청크 텍스트 해시가 texts_hash와 같으면 정규화된 임베딩 행렬 (아니면 None)"""
+        with self._lock:
+            entry = self._entries.get(script_id)
+        if entry is None or entry["texts_hash"] != texts_hash:
+            return None
+        return entry["matrix"]
+
+    @staticmethod
+    def _materialize(script_id: str, entry: Dict) -> List[Dict]:
+        """저장된 청크 사본 (chunk_embedding은 저장 행렬의 읽기 전용 행 뷰, 리스트 변환 없음)"""
+        matrix = entry["matrix"]
+        return [
+            {**chunk, "chunk_embedding": matrix[i], "script_id": script_id}
+            for i, chunk in enumerate(entry["chunks"])
+        ]
+
+    def put(self, script_id: str, version: str, chunks: List[Dict],
+            config: Optional[str] = None, source: Optional[str] = None) -> None:
+        """임베딩이 추가된 청크 리스트 저장 (config/source를 주면 증분 청킹용 원문 길이/해시도 저장)"""
+        if not chunks:
+            return
+
+        matrix = normalize_rows(np.asarray([chunk["chunk_embedding"] for chunk in chunks], dtype=np.float32))
+        matrix.setflags(write=False)  # 반환한 행 뷰로 저장 행렬이 바뀌지 않도록
+        stored_chunks = [
+            {key: value for key, value in chunk.items() if key not in ("chunk_embedding", "script_id")}
+            for chunk in chunks
+        ]
+        texts = [chunk.get("chunk_text", "") for chunk in stored_chunks]
+        postings = ChunkPostings(texts)
+
+        with self._lock:
+            self._entries[script_id] = {
+                "version": version,
+                "chunks": stored_chunks,
+                "matrix": matrix,
+                "texts_hash": postings.texts_hash,
+                "postings": postings,
+                "config": config,
+                "source_length": len(source) if source is not None else None,
+                "source_hash": hashlib.sha256(source.encode("utf-8")).hexdigest() if source is not None else None
+            }
+            self._entries.move_to_end(script_id)
+            while len(self._entries) > self.max_scripts:
+                evicted_id, _ = self._entries.popitem(last=False)
+                logger.debug(f"청크 저장소에서 제거: {evicted_id}")
+
+    def invalidate(self, script_id: str) -> None:
+        """특정 스크립트 항목 제거"""
+        with self._lock:
+            self._entries.pop(script_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """저장소 적중/미적중 통계"""
+        with self._lock:
+            return {
+                "scripts": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses
+            }
@@ -0,0 +1,247 @@
+"""
+업스트림 서비스별 서킷 브레이커와 헤지(hedged) 요청
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+from config.settings import (
+    CIRCUIT_WINDOW_SECONDS, CIRCUIT_MIN_REQUESTS, CIRCUIT_FAILURE_RATIO,
+    CIRCUIT_SLOW_CALL_SECONDS, CIRCUIT_OPEN_SECONDS,
+    HEDGE_ENABLED, HEDGE_MIN_SAMPLES, HEDGE_MIN_DELAY, HEDGE_MAX_DELAY
+)
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 업스트림 호출을 바로 거절함"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} 서비스 일시 차단 중 ({retry_in:.0f}초 후 재시도)")
+        self.name = name
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """최근 호출의 실패율/지연 통계로 열리고 닫히는 서킷 브레이커
+
+    - closed: 최근 window_seconds 동안 min_requests 이상 호출됐고 실패율(느린 호출 포함)이 failure_ratio 이상이면 open
+    - open: open_seconds 동안 호출을 즉시 거절 (CircuitOpenError)
+    - half_open: 시험 호출 하나만 허용, 성공하면 closed, 실패하면 다시 open
+    - 성공한 호출의 p95 지연을 헤지 요청 대기 시간으로 사용
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = CIRCUIT_WINDOW_SECONDS,
+        min_requests: int = CIRCUIT_MIN_REQUESTS,
+        failure_ratio: float = CIRCUIT_FAILURE_RATIO,
+        slow_call_seconds: float = CIRCUIT_SLOW_CALL_SECONDS,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.failure_ratio = failure_ratio
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = "closed"
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._calls: Deque[Tuple[float, float, bool]] = deque()  # (종료 시각, 지연, 성공 여부)
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def allow(self) -> bool:
+        """호출 허용 여부 (open이면 거절, open_seconds가 지나면 시험 호출 하나 허용)"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def check(self) -> None:
+        """허용되지 않으면 CircuitOpenError"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, max(0.0, self.open_seconds - (time.monotonic() - self.opened_at)))
+
+    def record(self, latency: float, success: bool) -> None:
+        """호출 결과 기록 및 상태 전환 (느린 호출은 실패로 집계)"""
+        now = time.monotonic()
+        failed = not success or latency > self.slow_call_seconds
+        with self._lock:
+            self._calls.append((now, latency, success))
+            self._trim(now)
+
+            if self.state == "half_open":
+                self._probe_in_flight = False
+                if failed:
+                    self._open(now)
+                else:
+                    self.state = "closed"
+                    self._calls.clear()
+                    logger.info(f"[{self.name}] 서킷 닫힘 (시험 호출 성공)")
+                return
+
+            if self.state == "closed" and len(self._calls) >= self.min_requests:
+                failures = sum(1 for _, lat, ok in self._calls if not ok or lat > self.slow_call_seconds)
+                if failures / len(self._calls) >= self.failure_ratio:
+                    self._open(now)
+
+    def release_probe(self) -> None:
+        """결과 없이 끝난 시험 호출 슬롯 반환 (취소된 요청)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self, now: float) -> None:
+        self.state = "open"
+        self.opened_at = now
+        logger.warning(f"[{self.name}] 서킷 열림: {self.open_seconds:g}초 동안 호출 차단")
+
+    def hedge_delay(self) -> Optional[float]:
+        """헤지 요청을 보내기까지 기다릴 시간 (성공 호출 p95, 표본이 적거나 시험 호출 중이면 None)"""
+        with self._lock:
+            if not HEDGE_ENABLED or self.state != "closed":
+                return None
+            latencies = [lat for _, lat, ok in self._calls if ok]
+        if len(latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        return float(min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, np.percentile(latencies, 95))))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.monotonic())
+            latencies = [lat for _, lat, _ in self._calls]
+            failures = sum(1 for _, lat, ok in self._calls if not ok or lat > self.slow_call_seconds)
+            return {
+                "state": self.state,
+                "calls": len(self._calls),
+                "failure_ratio": failures / len(self._calls) if self._calls else 0.0,
+                "p95_latency": float(np.percentile(latencies, 95)) if latencies else 0.0
+            }
+
+    def _timed(self, fn: Callable[[], Any]) -> Any:
+        """fn 실행 후 지연/성공 여부 기록"""
+        start = time.monotonic()
+        try:
+            result = fn()
+        except Exception:
+            self.record(time.monotonic() - start, False)
+            raise
+        self.record(time.monotonic() - start, True)
+        return result
+
+    def call(self, fn: Callable[[], Any], hedge: bool = False,
+             discard: Optional[Callable[[Any], None]] = None) -> Any:
+        """서킷 확인 후 fn 실행 (hedge=True면 p95 지연이 지나도 응답이 없을 때 같은 요청을 한 번 더 보냄)
+
+        hedge는 멱등 GET에만 사용한다. 먼저 성공한 응답을 쓰고, 늦은 요청은 끝나는 대로 버린다.
+        discard를 주면 버려지는 늦은 요청의 결과에 호출한다 (응답 연결 반환 등).
+        """
+        self.check()
+        delay = self.hedge_delay() if hedge else None
+        if delay is None:
+            return self._timed(fn)
+
+        first = _hedge_executor.submit(self._timed, fn)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        logger.info(f"[{self.name}] {delay * 1000:.0f}ms 내 응답 없음 → 헤지 요청 전송")
+        pending = {first, _hedge_executor.submit(self._timed, fn)}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((future for future in done if future.exception() is None), None)
+            if winner is not None:
+                for future in (done | pending) - {winner}:
+                    self._discard_when_done(future, discard)
+                return winner.result()
+            error = next(iter(done)).exception()
+        raise error
+
+    @staticmethod
+    def _discard_when_done(future: Future, discard: Optional[Callable[[Any], None]]) -> None:
+        """진 헤지 요청이 성공으로 끝나면 그 결과를 discard로 정리"""
+        if discard is None:
+            return
+
+        def _cleanup(finished: Future) -> None:
+            if finished.cancelled() or finished.exception() is not None:
+                return
+            try:
+                discard(finished.result())
+            except Exception as e:
+                logger.debug(f"헤지 요청 결과 정리 실패: {str(e)}")
+
+        future.add_done_callback(_cleanup)
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]], hedge: bool = False) -> Any:
+        """call의 비동기 버전 (늦은 요청은 취소)"""
+        self.check()
+
+        async def _timed() -> Any:
+            start = time.monotonic()
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                self.release_probe()
+                raise
+            except Exception:
+                self.record(time.monotonic() - start, False)
+                raise
+            self.record(time.monotonic() - start, True)
+            return result
+
+        delay = self.hedge_delay() if hedge else None
+        if delay is None:
+            return await _timed()
+
+        first = asyncio.ensure_future(_timed())
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        logger.info(f"[{self.name}] {delay * 1000:.0f}ms 내 응답 없음 → 헤지 요청 전송")
+        pending = {first, asyncio.ensure_future(_timed())}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+# 헤지 요청용 스레드 풀 (동기 클라이언트 공용)
+_hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedged-request")
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """업스트림 이름별 프로세스 공용 서킷 브레이커"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
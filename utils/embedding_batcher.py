@@ -0,0 +1,162 @@
+"""
+요청 간 임베딩 마이크로 배처
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 보수적 추정 (UTF-8 바이트 / 3, 한글은 글자당 약 1토큰)"""
+    return len(text.encode("utf-8")) // 3 + 1
+
+def pack_batches(texts: List[str], max_batch_size: int, max_batch_tokens: int) -> List[List[str]]:
+    """텍스트 리스트를 개수/토큰 예산에 맞춰 순서대로 배치 분할"""
+    batches: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and (len(current) >= max_batch_size or current_tokens + tokens > max_batch_tokens):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(text)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+class EmbeddingBatcher:
+    """짧은 시간 창 안에 들어온 임베딩 요청을 하나의 embed_documents 호출로 묶는 배처
+
+    - 전용 스레드의 asyncio 이벤트 루프에서 요청을 수집
+    - window_ms 경과, max_batch_size 또는 max_batch_tokens 도달 시 전송
+    - 실제 Azure 호출은 스레드 풀에서 실행 (동시 전송 수 = max_concurrency)
+    - 각 호출자는 자기 텍스트의 벡터만 돌려받음
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        window_ms: float = 10,
+        max_batch_size: int = 256,
+        max_batch_tokens: int = 64000,
+        max_concurrency: int = 4
+    ):
+        self.embed_fn = embed_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="embedding-batch")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """배처 이벤트 루프 스레드 지연 시작"""
+        if self._loop is None:
+            with self._start_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    ready = threading.Event()
+
+                    def _run():
+                        asyncio.set_event_loop(loop)
+                        self._queue = asyncio.Queue()
+                        loop.create_task(self._collect())
+                        ready.set()
+                        loop.run_forever()
+
+                    threading.Thread(target=_run, name="embedding-batcher", daemon=True).start()
+                    ready.wait()
+                    self._loop = loop
+        return self._loop
+
+    async def _submit(self, texts: List[str]) -> List[List[float]]:
+        """배처 루프 안에서 실행: 텍스트를 배치 단위 조각으로 나눠 큐에 넣고 결과 취합"""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for piece in pack_batches(texts, self.max_batch_size, self.max_batch_tokens):
+            future = loop.create_future()
+            await self._queue.put((piece, sum(estimate_tokens(t) for t in piece), future))
+            futures.append(future)
+
+        results: List[List[float]] = []
+        for piece_vectors in await asyncio.gather(*futures):
+            results.extend(piece_vectors)
+        return results
+
+    async def _collect(self) -> None:
+        """요청 수집 루프"""
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            pending: List[Tuple[List[str], int, asyncio.Future]] = [first]
+            total_size = len(first[0])
+            total_tokens = first[1]
+            deadline = loop.time() + self.window
+
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                # 한도를 넘으면 현재 배치는 전송하고 새 배치를 시작
+                if total_size + len(item[0]) > self.max_batch_size or total_tokens + item[1] > self.max_batch_tokens:
+                    loop.create_task(self._dispatch(pending))
+                    pending = []
+                    total_size = 0
+                    total_tokens = 0
+                    deadline = loop.time() + self.window
+                pending.append(item)
+                total_size += len(item[0])
+                total_tokens += item[1]
+
+            if pending:
+                loop.create_task(self._dispatch(pending))
+
+    async def _dispatch(self, pending: List[Tuple[List[str], int, asyncio.Future]]) -> None:
+        """묶인 요청을 한 번의 embed_documents 호출로 전송 후 호출자별로 분배"""
+        loop = asyncio.get_running_loop()
+        texts = [text for piece, _, _ in pending for text in piece]
+        try:
+            if len(pending) > 1:
+                logger.info(f"임베딩 배치 전송: {len(pending)}개 요청, {len(texts)}개 텍스트")
+            vectors = await loop.run_in_executor(self._executor, self.embed_fn, texts)
+            if len(vectors) != len(texts):
+                raise ValueError(f"임베딩 개수 불일치: 요청 {len(texts)}개, 응답 {len(vectors)}개")
+        except Exception as e:
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for piece, _, future in pending:
+            if not future.done():
+                future.set_result(vectors[offset:offset + len(piece)])
+            offset += len(piece)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """동기 호출자용 (그래프 노드 워커 스레드)"""
+        if not texts:
+            return []
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(self._submit(texts), loop).result()
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """비동기 호출자용"""
+        if not texts:
+            return []
+        loop = self._ensure_started()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._submit(texts), loop))
@@ -0,0 +1,272 @@
+"""
+청크 임베딩 디스크 캐시 (콘텐츠 주소 기반)
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from config.settings import (
+    EMBEDDING_CACHE_ENABLED, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_BYTES,
+    AZURE_OPENAI_EMBEDDING_DEPLOYMENT, QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL
+)
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """hash(청크 텍스트, 임베딩 배포명) 키로 임베딩을 저장하는 SQLite 기반 캐시
+
+    - 벡터는 float32 바이트로 저장
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 제거
+      (전체 크기는 DB 안의 cache_meta 행에 트리거로 기록해 같은 파일을 쓰는 여러 워커가 공유)
+    - 적중/미적중 카운터 제공 (stats)
+    """
+
+    def __init__(self, path: str, deployment: str, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.deployment = deployment
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+        self._init_size_tracking()
+
+    def _init_size_tracking(self) -> None:
+        """전체 크기 행과 삽입/갱신/삭제 트리거 생성 (기존 파일이면 현재 합계로 초기화)"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._conn.execute(
+                "INSERT OR IGNORE INTO cache_meta (name, value) "
+                "SELECT 'total_bytes', COALESCE(SUM(size), 0) FROM embeddings"
+            )
+            self._conn.execute(
+                """CREATE TRIGGER IF NOT EXISTS embeddings_size_insert AFTER INSERT ON embeddings BEGIN
+                    UPDATE cache_meta SET value = value + NEW.size WHERE name = 'total_bytes';
+                END"""
+            )
+            self._conn.execute(
+                """CREATE TRIGGER IF NOT EXISTS embeddings_size_update AFTER UPDATE OF size ON embeddings BEGIN
+                    UPDATE cache_meta SET value = value + NEW.size - OLD.size WHERE name = 'total_bytes';
+                END"""
+            )
+            self._conn.execute(
+                """CREATE TRIGGER IF NOT EXISTS embeddings_size_delete AFTER DELETE ON embeddings BEGIN
+                    UPDATE cache_meta SET value = value - OLD.size WHERE name = 'total_bytes';
+                END"""
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _total_bytes(self) -> int:
+        """DB에 기록된 전체 크기 (모든 워커의 삽입/삭제 반영)"""
+        return self._conn.execute("SELECT value FROM cache_meta WHERE name = 'total_bytes'").fetchone()[0]
+
+    def make_key(self, text: str) -> str:
+        """텍스트 + 배포명 기반 캐시 키 생성"""
+        digest = hashlib.sha256()
+        digest.update(self.deployment.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get_many(self, texts: List[str]) -> Dict[str, List[float]]:
+        """캐시에 존재하는 텍스트의 임베딩 조회 ({text: embedding})"""
+        if not texts:
+            return {}
+
+        keys = {self.make_key(text): text for text in texts}
+        found: Dict[str, List[float]] = {}
+        key_list = list(keys.keys())
+
+        with self._lock:
+            # SQLite 변수 개수 제한을 고려해 나눠서 조회
+            for start in range(0, len(key_list), 500):
+                batch = key_list[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[keys[key]] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, self.make_key(text)) for text in found]
+                )
+
+            self._hits += len(found)
+            self._misses += len(keys) - len(found)
+
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """임베딩 저장 후 용량 초과 시 LRU 제거 (삽입/제거를 한 쓰기 트랜잭션으로 처리해 워커 간 직렬화)"""
+        if not items:
+            return
+
+        now = time.time()
+        rows = []
+        for text, embedding in items.items():
+            blob = np.asarray(embedding, dtype=np.float32).tobytes()
+            rows.append((self.make_key(text), blob, len(blob), now))
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO embeddings (key, vector, size, last_access) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET vector = excluded.vector, size = excluded.size, "
+                    "last_access = excluded.last_access",
+                    rows
+                )
+                if self._total_bytes() > self.max_bytes:
+                    self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self) -> None:
+        """max_bytes의 90%까지 오래된 항목 제거 (lock 보유 + 쓰기 트랜잭션 안에서 호출)"""
+        target = int(self.max_bytes * 0.9)
+        total = self._total_bytes()
+        cursor = self._conn.execute("SELECT key, size FROM embeddings ORDER BY last_access ASC")
+        victims = []
+        for key, size in cursor:
+            if total <= target:
+                break
+            victims.append((key,))
+            total -= size
+
+        if victims:
+            self._conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+            self._evictions += len(victims)
+            logger.info(f"임베딩 캐시 정리: {len(victims)}개 항목 제거")
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 적중/미적중 통계"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / total) if total else 0.0,
+                "evictions": self._evictions,
+                "bytes": self._total_bytes(),
+                "max_bytes": self.max_bytes
+            }
+
+_cache_instance: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """프로세스 공용 임베딩 캐시 (비활성화 또는 초기화 실패 시 None)"""
+    global _cache_instance
+
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                try:
+                    _cache_instance = EmbeddingCache(
+                        EMBEDDING_CACHE_PATH,
+                        AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+                        EMBEDDING_CACHE_MAX_BYTES
+                    )
+                    logger.info(f"임베딩 캐시 초기화: {EMBEDDING_CACHE_PATH}")
+                except Exception as e:
+                    logger.warning(f"임베딩 캐시 초기화 실패, 캐시 없이 진행합니다: {str(e)}")
+                    return None
+    return _cache_instance
+
+class QueryEmbeddingCache:
+    """쿼리 임베딩용 크기 제한 + TTL LRU 캐시 (프로세스 메모리)"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, query: str) -> Optional[List[float]]:
+        """만료되지 않은 쿼리 임베딩 조회"""
+        with self._lock:
+            entry = self._entries.get(query)
+            if entry is None:
+                self._misses += 1
+                return None
+            stored_at, embedding = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[query]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(query)
+            self._hits += 1
+            return embedding
+
+    def put(self, query: str, embedding: List[float]) -> None:
+        """쿼리 임베딩 저장 (초과 시 가장 오래된 항목 제거)"""
+        with self._lock:
+            self._entries[query] = (time.monotonic(), embedding)
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 적중/미적중 통계"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / total) if total else 0.0
+            }
+
+_query_cache_instance: Optional[QueryEmbeddingCache] = None
+
+def get_query_embedding_cache() -> Optional[QueryEmbeddingCache]:
+    """프로세스 공용 쿼리 임베딩 캐시 (크기 0이면 None)"""
+    global _query_cache_instance
+
+    if QUERY_EMBEDDING_CACHE_SIZE <= 0:
+        return None
+
+    if _query_cache_instance is None:
+        with _cache_lock:
+            if _query_cache_instance is None:
+                _query_cache_instance = QueryEmbeddingCache(QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL)
+    return _query_cache_instance
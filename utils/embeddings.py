@@ -1,48 +1,172 @@
 from langchain_openai import AzureOpenAIEmbeddings
-from typing import List, Dict
+from typing import List, Dict, Optional
+import httpx
 import numpy as np
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from config.settings import AZURE_OPENAI_CONFIG, AZURE_OPENAI_EMBEDDING_DEPLOYMENT
-from config.settings import AZURE_OPENAI_CONFIG, AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+from config.settings import (
+    EMBEDDING_HTTP_MAX_CONNECTIONS, EMBEDDING_HTTP_MAX_KEEPALIVE,
+    EMBEDDING_HTTP_KEEPALIVE_EXPIRY, EMBEDDING_HTTP_TIMEOUT,
+    EMBEDDING_BATCH_ENABLED, EMBEDDING_BATCH_WINDOW_MS, EMBEDDING_BATCH_MAX_SIZE,
+    EMBEDDING_BATCH_MAX_TOKENS, EMBEDDING_MAX_CONCURRENCY
+)
+from utils.embedding_cache import get_embedding_cache, get_query_embedding_cache
+from utils.embedding_batcher import EmbeddingBatcher, pack_batches, estimate_tokens
+from utils.similarity import SimilarityIndex, top_k_indices
+from utils.rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# 프로세스 공용 임베딩 클라이언트 (최초 사용 시 생성)
+_shared_embeddings: Optional[AzureOpenAIEmbeddings] = None
+_shared_embeddings_lock = threading.Lock()
+
+def get_shared_embeddings() -> AzureOpenAIEmbeddings:
+    """프로세스 공용 AzureOpenAIEmbeddings 반환
+
+    동기/비동기 httpx 클라이언트를 하나씩만 만들어 keep-alive 연결을 재사용한다.
+    httpx.Client는 스레드 안전하므로 여러 워커 스레드에서 공유해도 된다.
+    """
+    global _shared_embeddings
+
+    if _shared_embeddings is None:
+        with _shared_embeddings_lock:
+            if _shared_embeddings is None:
+                limits = httpx.Limits(
+                    max_connections=EMBEDDING_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=EMBEDDING_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=EMBEDDING_HTTP_KEEPALIVE_EXPIRY
+                )
+                timeout = httpx.Timeout(EMBEDDING_HTTP_TIMEOUT)
+                _shared_embeddings = AzureOpenAIEmbeddings(
+                    deployment=AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+                    api_version=AZURE_OPENAI_CONFIG["api_version"],
+                    azure_endpoint=AZURE_OPENAI_CONFIG["endpoint"],
+                    api_key=AZURE_OPENAI_CONFIG["api_key"],
+                    max_retries=0,  # 429/일시 오류 재시도는 embed_documents_with_limit에서 처리
+                    http_client=httpx.Client(limits=limits, timeout=timeout),
+                    http_async_client=httpx.AsyncClient(limits=limits, timeout=timeout)
+                )
+                logger.info(f"공용 임베딩 클라이언트 생성 (최대 연결 {EMBEDDING_HTTP_MAX_CONNECTIONS}개)")
+    return _shared_embeddings
+
+def embed_documents_with_limit(embeddings: AzureOpenAIEmbeddings, texts: List[str]) -> List[List[float]]:
+    """배포별 TPM/RPM 스케줄러를 거쳐 embed_documents 호출 (429 시 실패 대신 대기 후 재시도)"""
+    limiter = get_rate_limiter(AZURE_OPENAI_EMBEDDING_DEPLOYMENT)
+    tokens = sum(estimate_tokens(text) for text in texts)
+    return limiter.call(lambda: embeddings.embed_documents(texts), tokens=tokens)
+
+_shared_batcher: Optional[EmbeddingBatcher] = None
+
+def get_embedding_batcher() -> Optional[EmbeddingBatcher]:
+    """프로세스 공용 임베딩 마이크로 배처 (비활성화 시 None)"""
+    global _shared_batcher
+
+    if not EMBEDDING_BATCH_ENABLED:
+        return None
+
+    if _shared_batcher is None:
+        with _shared_embeddings_lock:
+            if _shared_batcher is None:
+                _shared_batcher = EmbeddingBatcher(
+                    lambda texts: embed_documents_with_limit(get_shared_embeddings(), texts),
+                    window_ms=EMBEDDING_BATCH_WINDOW_MS,
+                    max_batch_size=EMBEDDING_BATCH_MAX_SIZE,
+                    max_batch_tokens=EMBEDDING_BATCH_MAX_TOKENS,
+                    max_concurrency=EMBEDDING_MAX_CONCURRENCY
+                )
+    return _shared_batcher
+
 class EmbeddingManager:
     """임베딩 관리 클래스"""
     
     def __init__(self):
-        self.embeddings = AzureOpenAIEmbeddings(
-            deployment=AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
-            api_version=AZURE_OPENAI_CONFIG["api_version"],
-            azure_endpoint=AZURE_OPENAI_CONFIG["endpoint"],
-            api_key=AZURE_OPENAI_CONFIG["api_key"]
-        )
+        self.embeddings = get_shared_embeddings()
+        self.cache = get_embedding_cache()
+        self.query_cache = get_query_embedding_cache()
+        self.batcher = get_embedding_batcher()
+    
+    def _embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Azure 임베딩 호출
+
+        - 배처가 켜져 있으면 다른 요청과 묶어서 전송 (배처가 배치 분할/동시 전송 담당)
+        - 아니면 토큰 예산 기준 배치로 나눠 EMBEDDING_MAX_CONCURRENCY개까지 동시 전송
+        """
+        if self.batcher:
+            return self.batcher.embed(texts)
+        
+        batches = pack_batches(texts, EMBEDDING_BATCH_MAX_SIZE, EMBEDDING_BATCH_MAX_TOKENS)
+        if len(batches) == 1:
+            return embed_documents_with_limit(self.embeddings, texts)
+        
+        logger.info(f"임베딩 병렬 전송: {len(batches)}개 배치 (동시 {EMBEDDING_MAX_CONCURRENCY}개)")
+        with ThreadPoolExecutor(max_workers=min(EMBEDDING_MAX_CONCURRENCY, len(batches))) as executor:
+            results = list(executor.map(lambda batch: embed_documents_with_limit(self.embeddings, batch), batches))
+        return [vector for batch_vectors in results for vector in batch_vectors]
     
     def embed_texts(self, texts: List[str]) -> List[List[float]]:
-        """텍스트 리스트를 임베딩으로 변환"""
+        """텍스트 리스트를 임베딩으로 변환 (캐시 미적중 텍스트만 Azure 호출)"""
         try:
             if not texts:
                 return []
             
-            logger.info(f"임베딩 생성 시작: {len(texts)}개 텍스트")
-            embeddings = self.embeddings.embed_documents(texts)
-            logger.info(f"임베딩 생성 완료: {len(embeddings)}개 벡터")
+            # 배치 내 동일 텍스트 중복 제거 (입력 순서 유지)
+            unique_texts = list(dict.fromkeys(texts))
+            
+            # 캐시 조회
+            vectors = self.cache.get_many(unique_texts) if self.cache else {}
+            misses = [text for text in unique_texts if text not in vectors]
+            
+            if misses:
+                logger.info(f"임베딩 생성 시작: {len(misses)}개 텍스트 (전체 {len(texts)}개, 캐시 적중 {len(vectors)}개)")
+                new_embeddings = self._embed_documents(misses)
+                logger.info(f"임베딩 생성 완료: {len(new_embeddings)}개 벡터")
+                
+                new_vectors = dict(zip(misses, new_embeddings))
+                if self.cache:
+                    try:
+                        self.cache.put_many(new_vectors)
+                    except Exception as e:
+                        logger.warning(f"임베딩 캐시 저장 실패: {str(e)}")
+                vectors.update(new_vectors)
+            else:
+                logger.info(f"임베딩 캐시 전체 적중: {len(texts)}개 텍스트")
             
-            return embeddings
+            return [vectors[text] for text in texts]
             
         except Exception as e:
             logger.error(f"임베딩 생성 실패: {str(e)}")
             raise Exception(f"임베딩 생성 실패: {str(e)}")
     
-    def embed_query(self, query: str) -> List[float]:
-        """단일 쿼리를 임베딩으로 변환"""
+    def embed_query(self, query: str, memo: Optional[Dict[str, List[float]]] = None) -> List[float]:
+        """단일 쿼리를 임베딩으로 변환
+
+        memo: 요청 단위 메모 (MeetingQAState["query_embeddings"]), 조회 결과를 기록해 같은 요청 내 재호출 방지
+        """
         try:
             if not query:
                 return []
             
-            logger.info("쿼리 임베딩 생성 시작")
-            embedding = self.embeddings.embed_query(query)
-            logger.info("쿼리 임베딩 생성 완료")
+            # 1) 요청 단위 메모
+            if memo is not None and query in memo:
+                logger.info("쿼리 임베딩 재사용 (요청 메모)")
+                return memo[query]
+            
+            # 2) 프로세스 공용 TTL LRU
+            embedding = self.query_cache.get(query) if self.query_cache else None
+            if embedding is not None:
+                logger.info("쿼리 임베딩 재사용 (쿼리 캐시)")
+            else:
+                logger.info("쿼리 임베딩 생성 시작")
+                embedding = self._embed_documents([query])[0]
+                logger.info("쿼리 임베딩 생성 완료")
+                if self.query_cache:
+                    self.query_cache.put(query, embedding)
+            
+            if memo is not None:
+                memo[query] = embedding
             
             return embedding
             
@@ -72,6 +196,34 @@ class EmbeddingManager:
         except Exception as e:
             logger.error(f"청크 임베딩 추가 실패: {str(e)}")
             raise Exception(f"청크 임베딩 추가 실패: {str(e)}")
+    
+    def add_embeddings_to_script_chunks(self, chunks_by_script: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """여러 스크립트의 청크에 한 번에 임베딩 추가 (전체 청크를 배치로 묶어 동시 전송 후 스크립트별로 분배)
+
+        이미 임베딩이 있는 청크(증분 청킹으로 유지된 청크)는 다시 임베딩하지 않는다.
+        """
+        try:
+            all_texts = [
+                chunk["chunk_text"]
+                for chunks in chunks_by_script.values()
+                for chunk in chunks
+                if chunk.get("chunk_embedding") is None
+            ]
+            embeddings = self.embed_texts(all_texts) if all_texts else []
+            
+            offset = 0
+            for script_id, chunks in chunks_by_script.items():
+                for chunk in chunks:
+                    if chunk.get("chunk_embedding") is None:
+                        chunk["chunk_embedding"] = embeddings[offset]
+                        offset += 1
+                    chunk["script_id"] = script_id
+            
+            return chunks_by_script
+            
+        except Exception as e:
+            logger.error(f"스크립트별 청크 임베딩 추가 실패: {str(e)}")
+            raise Exception(f"스크립트별 청크 임베딩 추가 실패: {str(e)}")
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """코사인 유사도 계산"""
@@ -97,28 +249,58 @@ def find_most_relevant_chunks(
     query_embedding: List[float], 
     chunks: List[Dict], 
     top_k: int = 5,
-    similarity_threshold: float = 0.7
+    similarity_threshold: float = 0.7,
+    lexical_scores: Optional[np.ndarray] = None,
+    lexical_weight: float = 0.0,
+    lexical_threshold: float = 1.0,
+    lexical_min_similarity: float = 0.0,
+    index: Optional[SimilarityIndex] = None
 ) -> List[Dict]:
-    """쿼리와 가장 관련성 높은 청크들 찾기"""
+    """쿼리와 가장 관련성 높은 청크들 찾기
+
+    index: 청크 목록과 같은 순서의 정규화된 임베딩 색인 (청크 저장소 행렬 재사용, 없으면 청크 임베딩으로 생성)
+    lexical_scores(청크 목록과 같은 순서의 0~1 정규화 BM25 점수)를 주면
+    (1 - lexical_weight) * 유사도 + lexical_weight * 어휘 점수로 순위를 매기고,
+    유사도가 임계값 미만이어도 어휘 점수가 lexical_threshold 이상이고 유사도가 lexical_min_similarity 이상이면
+    후보로 남긴다.
+    relevance_score는 항상 코사인 유사도이고, 결합 점수는 hybrid_score로 따로 담는다.
+    """
     if not query_embedding or not chunks:
         return []
     
-    relevant_chunks = []
+    if index is not None:
+        scored_rows = list(range(len(chunks)))
+    else:
+        # 임베딩이 있는 청크만 하나의 행렬로 묶어 한 번에 점수 계산
+        scored_rows = [
+            row for row, chunk in enumerate(chunks)
+            if chunk.get("chunk_embedding") is not None and len(chunk["chunk_embedding"]) > 0
+        ]
+        if not scored_rows:
+            return []
+        index = SimilarityIndex([chunks[row]["chunk_embedding"] for row in scored_rows])
+    scored_chunks = [chunks[row] for row in scored_rows]
     
-    for chunk in chunks:
-        chunk_embedding = chunk.get("chunk_embedding", [])
-        if not chunk_embedding:
-            continue
-        
-        similarity = cosine_similarity(query_embedding, chunk_embedding)
-        
-        if similarity >= similarity_threshold:
-            chunk_with_score = chunk.copy()
+    relevant_chunks = []
+    if lexical_scores is None or lexical_weight <= 0:
+        for row, similarity in index.search(query_embedding, top_k=top_k, threshold=similarity_threshold):
+            chunk_with_score = scored_chunks[row].copy()
             chunk_with_score["relevance_score"] = similarity
             relevant_chunks.append(chunk_with_score)
+        return relevant_chunks
     
-    # 유사도 순으로 정렬
-    relevant_chunks.sort(key=lambda x: x["relevance_score"], reverse=True)
+    # 하이브리드: 벡터 유사도 + BM25 점수 결합
+    similarities = index.score(query_embedding)
+    lexical = np.asarray(lexical_scores, dtype=np.float32)[scored_rows]
+    fused = (1 - lexical_weight) * similarities + lexical_weight * lexical
+    lexical_hits = (lexical >= lexical_threshold) & (similarities >= lexical_min_similarity)
+    candidates = np.flatnonzero((similarities >= similarity_threshold) | lexical_hits)
+    for row in top_k_indices(fused, top_k, candidates):
+        chunk_with_score = scored_chunks[row].copy()
+        chunk_with_score["relevance_score"] = float(similarities[row])
+        chunk_with_score["hybrid_score"] = float(fused[row])
+        chunk_with_score["lexical_score"] = float(lexical[row])
+        relevant_chunks.append(chunk_with_score)
     
-    # 상위 k개 반환
-    return relevant_chunks[:top_k]
+    # 결합 점수 내림차순으로 정렬된 상위 k개
+    return relevant_chunks
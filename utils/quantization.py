@@ -0,0 +1,99 @@
+"""
+요약본 임베딩 양자화 (int8 스칼라 / 부호 비트) - 후보 선별용
+"""
+
+import logging
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 바이트별 1비트 개수 (해밍 거리 계산용)
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+class QuantizedIndex:
+    """양자화 코드로 후보를 빠르게 고르는 인덱스 (최종 점수는 원본 행렬로 재채점)
+
+    - int8: 차원별 스케일로 [-127, 127] 정수화 (float32 대비 1/4 메모리)
+    - binary: 부호 비트만 저장하고 해밍 거리로 비교 (float32 대비 1/32 메모리)
+    """
+
+    MODES = ("int8", "binary")
+
+    # 점수 계산 시 한 번에 처리하는 행 수
+    BLOCK_ROWS = 8192
+
+    def __init__(self, mode: str, codes: np.ndarray, scale: Optional[np.ndarray] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"지원하지 않는 양자화 방식: {mode}")
+        self.mode = mode
+        self.codes = codes
+        self.scale = scale
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, mode: str) -> "QuantizedIndex":
+        """정규화된 행렬을 양자화"""
+        if mode == "int8":
+            scale = np.abs(np.asarray(matrix, dtype=np.float32)).max(axis=0) if len(matrix) else np.ones(0, np.float32)
+            scale[scale == 0] = 1.0
+            index = cls(mode, cls._encode_int8(matrix, scale), scale.astype(np.float32))
+        else:
+            index = cls(mode, cls._encode_binary(matrix))
+        logger.info(f"요약본 양자화 완료 ({mode}): {len(matrix)}개, {index.codes.nbytes / 1024:.1f}KB")
+        return index
+
+    @staticmethod
+    def _encode_int8(matrix: np.ndarray, scale: np.ndarray) -> np.ndarray:
+        scaled = np.asarray(matrix, dtype=np.float32) / scale * 127.0
+        return np.clip(np.rint(scaled), -127, 127).astype(np.int8)
+
+    @staticmethod
+    def _encode_binary(matrix: np.ndarray) -> np.ndarray:
+        return np.packbits(np.asarray(matrix) > 0, axis=1)
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        if self.mode == "int8":
+            return self._encode_int8(vectors, self.scale)
+        return self._encode_binary(vectors)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def copy(self) -> "QuantizedIndex":
+        return QuantizedIndex(self.mode, self.codes.copy(), self.scale)
+
+    def add(self, vectors: np.ndarray) -> None:
+        """새 행 코드 추가 (int8 스케일은 유지, 범위 밖 값은 잘림)"""
+        if len(vectors):
+            self.codes = np.concatenate([self.codes, self._encode(vectors)], axis=0)
+
+    def update(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """기존 행 코드 갱신"""
+        if len(rows):
+            self.codes[rows] = self._encode(vectors)
+
+    def approximate_scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """근사 점수 (클수록 유사): int8은 근사 내적, binary는 -해밍 거리"""
+        codes = self.codes if rows is None else self.codes[rows]
+        query = np.asarray(query, dtype=np.float32)
+
+        if self.mode == "int8":
+            weights = query * self.scale / 127.0
+            return np.concatenate([
+                codes[start:start + self.BLOCK_ROWS].astype(np.float32) @ weights
+                for start in range(0, len(codes), self.BLOCK_ROWS)
+            ]) if len(codes) else np.empty(0, dtype=np.float32)
+
+        query_bits = self._encode_binary(query.reshape(1, -1))[0]
+        return -_POPCOUNT_TABLE[np.bitwise_xor(codes, query_bits)].sum(axis=1, dtype=np.int32).astype(np.float32)
+
+    def candidates(self, query: np.ndarray, count: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """근사 점수 상위 count개 행 번호 (rows가 주어지면 그 안에서 선택)"""
+        total = len(self.codes) if rows is None else len(rows)
+        if total <= count:
+            return np.arange(total, dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+
+        scores = self.approximate_scores(query, rows)
+        top = np.argpartition(-scores, count - 1)[:count]
+        return top.astype(np.int64) if rows is None else np.asarray(rows, dtype=np.int64)[top]
@@ -0,0 +1,189 @@
+"""
+Azure OpenAI 배포별 요청/토큰 한도 스케줄러 (토큰 버킷 + AIMD 동시성 제어)
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import (
+    AZURE_OPENAI_CONFIG, AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+    RATE_LIMIT_CHAT_TPM, RATE_LIMIT_CHAT_RPM,
+    RATE_LIMIT_EMBEDDING_TPM, RATE_LIMIT_EMBEDDING_RPM,
+    RATE_LIMIT_MAX_CONCURRENCY, RATE_LIMIT_MAX_RETRIES, CHAT_COMPLETION_TOKEN_ESTIMATE
+)
+from utils.embedding_batcher import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """429(요청 한도 초과) 오류 여부"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+def is_transient_error(error: Exception) -> bool:
+    """재시도할 만한 일시 오류 여부 (5xx, 연결/타임아웃) - SDK 자체 재시도를 끈 대신 여기서 처리"""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status >= 500
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """응답 헤더의 retry-after-ms / retry-after 값 (초)"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+class TokenBucket:
+    """분당 한도를 초당 보충하는 토큰 버킷 (limit_per_minute <= 0이면 무제한)"""
+
+    def __init__(self, limit_per_minute: float):
+        self.capacity = float(limit_per_minute)
+        self.tokens = self.capacity
+        self.rate = self.capacity / 60.0
+        self.updated_at = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """amount만큼 꺼내려면 기다려야 하는 시간 (초)"""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self.tokens -= min(amount, self.capacity)
+
+class AzureRateLimiter:
+    """배포 하나의 TPM/RPM 한도와 동시 요청 수를 관리하는 스케줄러
+
+    - 호출 전 acquire로 토큰/요청 버킷과 동시성 슬롯을 확보 (부족하면 실패 대신 대기)
+    - 429 발생 시 동시성 한도를 절반으로 줄이고 retry-after 동안 전체 호출을 멈춤 (AIMD의 MD)
+    - 연속 성공 시 동시성 한도를 1씩 늘림 (AIMD의 AI)
+    """
+
+    def __init__(self, name: str, tpm: float = 0, rpm: float = 0, max_concurrency: int = 8):
+        self.name = name
+        self.token_bucket = TokenBucket(tpm)
+        self.request_bucket = TokenBucket(rpm)
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency_limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, tokens: int) -> None:
+        """토큰/요청/동시성 여유가 생길 때까지 대기 후 확보"""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                wait = max(
+                    self.blocked_until - now,
+                    self.token_bucket.wait_time(tokens, now),
+                    self.request_bucket.wait_time(1, now)
+                )
+                if wait <= 0 and self.in_flight < int(self.concurrency_limit):
+                    self.token_bucket.take(tokens)
+                    self.request_bucket.take(1)
+                    self.in_flight += 1
+                    return
+                self._condition.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, rate_limited: bool = False, retry_after: Optional[float] = None) -> None:
+        """호출 종료 처리 및 동시성 한도 조정"""
+        with self._condition:
+            self.in_flight -= 1
+            if rate_limited:
+                self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+                self._successes = 0
+                pause = retry_after if retry_after is not None else 1.0
+                self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+                logger.warning(
+                    f"[{self.name}] 429 감지: 동시성 {int(self.concurrency_limit)}로 축소, {pause:.1f}초 대기"
+                )
+            else:
+                self._successes += 1
+                if self._successes >= int(self.concurrency_limit) and self.concurrency_limit < self.max_concurrency:
+                    self.concurrency_limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+    def call(self, fn: Callable[[], Any], tokens: int = 1, max_retries: int = RATE_LIMIT_MAX_RETRIES) -> Any:
+        """한도 안에서 fn 실행, 429/일시 오류는 대기 후 재시도 (max_retries 초과 시 마지막 오류 전달)"""
+        attempt = 0
+        while True:
+            self.acquire(tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    self.release(rate_limited=True, retry_after=get_retry_after(e))
+                    attempt += 1
+                    if attempt > max_retries:
+                        raise
+                    continue
+                self.release()
+                if is_transient_error(e) and attempt < max_retries:
+                    attempt += 1
+                    time.sleep(min(8.0, 0.5 * 2 ** (attempt - 1)))
+                    continue
+                raise
+            self.release()
+            return result
+
+    def stats(self) -> Dict[str, float]:
+        with self._condition:
+            return {
+                "in_flight": self.in_flight,
+                "concurrency_limit": int(self.concurrency_limit),
+                "blocked_for": max(0.0, self.blocked_until - time.monotonic())
+            }
+
+_limiters: Dict[str, AzureRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(deployment: str) -> AzureRateLimiter:
+    """배포명별 프로세스 공용 스케줄러"""
+    with _limiters_lock:
+        if deployment not in _limiters:
+            if deployment == AZURE_OPENAI_EMBEDDING_DEPLOYMENT:
+                tpm, rpm = RATE_LIMIT_EMBEDDING_TPM, RATE_LIMIT_EMBEDDING_RPM
+            else:
+                tpm, rpm = RATE_LIMIT_CHAT_TPM, RATE_LIMIT_CHAT_RPM
+            _limiters[deployment] = AzureRateLimiter(deployment, tpm, rpm, RATE_LIMIT_MAX_CONCURRENCY)
+        return _limiters[deployment]
+
+class RateLimitedLLM:
+    """LLM invoke 호출을 배포별 스케줄러를 통해 실행하는 래퍼 (나머지 속성은 원본 LLM에 위임)"""
+
+    def __init__(self, llm, limiter: Optional[AzureRateLimiter] = None):
+        self.llm = llm
+        self.limiter = limiter or get_rate_limiter(AZURE_OPENAI_CONFIG["deployment_name"] or "chat")
+
+    def invoke(self, prompt, *args, **kwargs):
+        tokens = estimate_tokens(str(prompt)) + CHAT_COMPLETION_TOKEN_ESTIMATE
+        return self.limiter.call(lambda: self.llm.invoke(prompt, *args, **kwargs), tokens=tokens)
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
@@ -0,0 +1,88 @@
+"""
+원본 스크립트 캐시 (바이트 크기 제한 LRU, 갱신 시각/TTL 검증)
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class ScriptCache:
+    """script_id → 정규화된 원본 스크립트 LRU 캐시
+
+    - 버전(요약본 갱신 시각 등)을 알면 저장 당시 버전과 같을 때만 사용
+    - 버전을 모르면 저장 후 ttl초 동안만 사용
+    - 스크립트 본문 바이트 합이 max_bytes를 넘으면 오래 안 쓴 항목부터 제거
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _size(script: Dict) -> int:
+        segments_size = sum(len(segment["text"].encode("utf-8")) + 64 for segment in script.get("segments") or [])
+        return len((script.get("content") or "").encode("utf-8")) + len(str(script.get("title") or "")) + segments_size + 256
+
+    def get(self, script_id: str, version: Optional[str] = None) -> Optional[Dict]:
+        """유효한 캐시 항목이면 스크립트 사본 반환, 아니면 None (무효 항목은 제거)"""
+        with self._lock:
+            entry = self._entries.get(script_id)
+            if entry is not None:
+                if version is not None:
+                    valid = entry["version"] == version
+                else:
+                    valid = time.monotonic() - entry["stored_at"] < self.ttl
+                if not valid:
+                    self._remove(script_id)
+                    entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(script_id)
+            self._hits += 1
+            return dict(entry["script"])
+
+    def put(self, script_id: str, script: Dict, version: Optional[str] = None) -> None:
+        """스크립트 저장 후 크기 제한까지 LRU 제거 (한 항목이 제한보다 크면 저장하지 않음)"""
+        size = self._size(script)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(script_id)
+            self._entries[script_id] = {
+                "script": dict(script),
+                "version": version,
+                "size": size,
+                "stored_at": time.monotonic()
+            }
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def _remove(self, script_id: str) -> None:
+        entry = self._entries.pop(script_id, None)
+        if entry is not None:
+            self._total_bytes -= entry["size"]
+
+    def invalidate(self, script_id: str) -> None:
+        with self._lock:
+            self._remove(script_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "scripts": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self._hits,
+                "misses": self._misses
+            }
@@ -0,0 +1,71 @@
+"""
+SimHash 기반 유사 중복 청크 검출 (64비트 서명 + shingle Jaccard 확인)
+"""
+
+import hashlib
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+def normalize_text(text: str) -> str:
+    """소문자/공백 정규화 (SimHash/shingle 비교 기준 텍스트)"""
+    return " ".join((text or "").lower().split())
+
+def content_digest(text: str) -> str:
+    """정규화된 텍스트의 sha256 (대소문자/공백만 다른 청크는 같은 값)"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+def shingles(text: str, shingle_size: int = 3) -> Counter:
+    """정규화된 텍스트의 글자 shingle 빈도"""
+    normalized = normalize_text(text)
+    if len(normalized) <= shingle_size:
+        return Counter([normalized])
+    return Counter(normalized[i:i + shingle_size] for i in range(len(normalized) - shingle_size + 1))
+
+def shingle_jaccard(a: str, b: str, shingle_size: int = 3) -> float:
+    """두 텍스트의 shingle 빈도 기준 (다중집합) Jaccard 유사도"""
+    shingles_a, shingles_b = shingles(a, shingle_size), shingles(b, shingle_size)
+    union = sum((shingles_a | shingles_b).values())
+    return sum((shingles_a & shingles_b).values()) / union if union else 1.0
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """소문자/공백 정규화 후 글자 shingle 빈도 가중 64비트 SimHash"""
+    features = shingles(text, shingle_size)
+
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little") for feature in features),
+        dtype=np.uint64,
+        count=len(features)
+    )
+    weights = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")  # (특징 수, 64)
+    votes = weights @ (bits.astype(np.float32) * 2 - 1)
+    return int(np.packbits(votes > 0, bitorder="little").view(np.uint64)[0])
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def collapse_near_duplicates(chunks: List[Dict], max_distance: int = 1, min_jaccard: float = 0.9) -> List[Dict]:
+    """점수 높은 청크부터 보며 앞서 남긴 청크와 유사 중복인 청크 제거 (점수 내림차순으로 반환)
+
+    해밍 거리 max_distance 이하이고 shingle Jaccard 유사도가 min_jaccard 이상이어야 중복으로 본다
+    (청크의 simhash가 없으면 계산). 점수는 hybrid_score(없으면 relevance_score)이며, 스크립트와 관계없이
+    비교하므로 같은 회의가 다른 script_id로 다시 올라와도 가장 점수 높은 청크 하나만 남는다.
+    """
+    ranked = sorted(chunks, key=lambda chunk: -chunk.get("hybrid_score", chunk.get("relevance_score", 0.0)))
+    kept: List[Dict] = []
+    kept_signatures: List[Tuple[int, str]] = []  # (서명, 청크 텍스트)
+    for chunk in ranked:
+        text = chunk.get("chunk_text", "")
+        signature = chunk.get("simhash")
+        if signature is None:
+            signature = simhash(text)
+        if any(
+            hamming_distance(signature, other_signature) <= max_distance and shingle_jaccard(text, other_text) >= min_jaccard
+            for other_signature, other_text in kept_signatures
+        ):
+            continue
+        kept.append(chunk)
+        kept_signatures.append((signature, text))
+    return kept
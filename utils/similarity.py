@@ -0,0 +1,130 @@
+"""
+벡터화된 유사도 검색 엔진 (정규화된 float32 행렬 + 행렬-벡터 곱)
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (영벡터 행은 0으로 유지)"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def top_k_indices(scores: np.ndarray, top_k: int, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+    """점수 상위 k개 인덱스 (argpartition 후 점수 내림차순, 동점은 인덱스 오름차순)"""
+    if candidates is None:
+        candidates = np.arange(len(scores))
+    if top_k <= 0 or len(candidates) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    candidate_scores = scores[candidates]
+    if len(candidates) > top_k:
+        part = np.argpartition(-candidate_scores, top_k - 1)[:top_k]
+        candidates = candidates[part]
+        candidate_scores = candidate_scores[part]
+
+    order = np.lexsort((candidates, -candidate_scores))
+    return candidates[order]
+
+class SimilarityIndex:
+    """정규화된 float32 행렬을 보관하고 쿼리를 한 번의 행렬-벡터 곱으로 점수화"""
+
+    # float16 행렬은 이 행 수 단위로 float32 변환 후 계산 (임시 메모리 제한)
+    BLOCK_ROWS = 8192
+
+    def __init__(self, vectors, normalized: bool = False):
+        matrix = np.asarray(vectors)
+        if matrix.dtype not in (np.float16, np.float32) or not normalized:
+            matrix = matrix.astype(np.float32, copy=False)
+        if matrix.size == 0:
+            matrix = matrix.reshape(0, 0)
+        elif matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        self.matrix = matrix if normalized else normalize_rows(matrix)
+
+    def _matmul(self, q: np.ndarray) -> np.ndarray:
+        """행렬 x 쿼리(들) 곱 (float16 행렬은 블록 단위로 float32 변환)"""
+        if self.matrix.dtype == np.float32:
+            return self.matrix @ q
+        blocks = [
+            self.matrix[start:start + self.BLOCK_ROWS].astype(np.float32) @ q
+            for start in range(0, len(self), self.BLOCK_ROWS)
+        ]
+        return np.concatenate(blocks, axis=0)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def _prepare_queries(self, queries) -> np.ndarray:
+        """쿼리(1개 또는 여러 개)를 정규화된 2차원 float32 배열로 변환"""
+        return normalize_rows(np.asarray(queries, dtype=np.float32))
+
+    def score(self, query: Sequence[float]) -> np.ndarray:
+        """모든 행에 대한 코사인 유사도"""
+        if len(self) == 0:
+            return np.empty(0, dtype=np.float32)
+        q = self._prepare_queries(query)[0]
+        return self._matmul(q)
+
+    def score_rows(self, query: Sequence[float], rows: np.ndarray) -> np.ndarray:
+        """지정한 행들에 대해서만 코사인 유사도 계산"""
+        q = self._prepare_queries(query)[0]
+        return self.matrix[rows].astype(np.float32, copy=False) @ q
+
+    def score_batch(self, queries: Sequence[Sequence[float]]) -> np.ndarray:
+        """여러 쿼리에 대한 코사인 유사도 (쿼리 수 x 행 수)"""
+        if len(self) == 0:
+            return np.empty((len(queries), 0), dtype=np.float32)
+        q = self._prepare_queries(queries)
+        return self._matmul(q.T).T
+
+    @staticmethod
+    def _select(scores: np.ndarray, top_k: int, threshold: Optional[float], inclusive: bool) -> List[Tuple[int, float]]:
+        """임계값 마스크 적용 후 상위 k개 선택"""
+        candidates = None
+        if threshold is not None:
+            mask = scores >= threshold if inclusive else scores > threshold
+            candidates = np.flatnonzero(mask)
+        indices = top_k_indices(scores, top_k, candidates)
+        return [(int(i), float(scores[i])) for i in indices]
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int = 5,
+        threshold: Optional[float] = None,
+        inclusive: bool = True,
+        candidates: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """단일 쿼리 검색 → [(행 인덱스, 유사도)] (유사도 내림차순)
+
+        candidates: 주어지면 해당 행들만 정확히 점수화 (ANN/양자화 후보 재채점용)
+        """
+        if len(self) == 0 or query is None or len(query) == 0:
+            return []
+        if candidates is None:
+            return self._select(self.score(query), top_k, threshold, inclusive)
+
+        candidates = np.asarray(candidates, dtype=np.int64)
+        if len(candidates) == 0:
+            return []
+        results = self._select(self.score_rows(query, candidates), top_k, threshold, inclusive)
+        return [(int(candidates[i]), similarity) for i, similarity in results]
+
+    def search_batch(
+        self,
+        queries: Sequence[Sequence[float]],
+        top_k: int = 5,
+        threshold: Optional[float] = None,
+        inclusive: bool = True
+    ) -> List[List[Tuple[int, float]]]:
+        """여러 쿼리를 한 번에 검색"""
+        if len(self) == 0 or len(queries) == 0:
+            return [[] for _ in queries]
+        all_scores = self.score_batch(queries)
+        return [self._select(scores, top_k, threshold, inclusive) for scores in all_scores]
@@ -0,0 +1,179 @@
+"""
+요약본 저장소 디스크 스냅샷 (버전 디렉터리 + manifest.json, np.load(mmap_mode="r")로 로드)
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows - 디렉터리 잠금 없이 동작
+    fcntl = None
+
+from config.settings import (
+    SUMMARY_ANN_ENABLED, SUMMARY_ANN_MIN_SIZE, SUMMARY_ANN_NPROBE,
+    SUMMARY_EMBEDDING_DTYPE, SUMMARY_QUANTIZATION
+)
+from utils.ann_index import IVFIndex
+from utils.quantization import QuantizedIndex
+from utils.summary_store import SummaryEmbeddingStore
+
+logger = logging.getLogger(__name__)
+
+# 스냅샷 파일 형식 버전 (배열 구성이 바뀌면 올려서 이전 스냅샷을 무시)
+SNAPSHOT_FORMAT = 1
+
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".lock"
+
+class SummarySnapshotStore:
+    """요약본 임베딩 저장소를 디렉터리에 버전별로 저장하고 메모리 매핑으로 불러오는 저장소
+
+    - 저장: 임시 디렉터리에 배열(.npy)과 manifest.json을 쓴 뒤 이름을 바꾸고 CURRENT 파일을 원자적으로 교체
+    - 로드: CURRENT가 가리키는 버전을 mmap_mode="r"로 열어 복사 없이 사용 (같은 호스트의 워커끼리 페이지 공유)
+    - 최근 keep_versions개 버전만 남김 (이미 매핑 중인 파일은 삭제돼도 계속 읽을 수 있음)
+    - CURRENT 교체와 정리는 잠금 파일(.lock)을 잡고 수행해 여러 워커가 같은 디렉터리에 써도 안전하며,
+      CURRENT보다 오래된 버전만 삭제하고 CURRENT를 더 오래된 버전으로 되돌리지 않는다
+    """
+
+    def __init__(self, directory: str, keep_versions: int = 2):
+        self.directory = Path(directory)
+        self.keep_versions = max(1, keep_versions)
+
+    def _current_version(self) -> Optional[str]:
+        try:
+            return (self.directory / CURRENT_FILE).read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    @contextmanager
+    def _locked(self):
+        """디렉터리 잠금 (CURRENT 교체/버전 정리를 워커 간 직렬화)"""
+        with open(self.directory / LOCK_FILE, "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def save(self, store: SummaryEmbeddingStore, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """저장소를 새 버전으로 기록하고 버전명 반환"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        version = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        staging = self.directory / f".tmp-{version}"
+        staging.mkdir()
+
+        try:
+            np.save(staging / "matrix.npy", store.matrix)
+            np.save(staging / "ids.npy", store.ids)
+
+            manifest: Dict[str, Any] = {
+                "format": SNAPSHOT_FORMAT,
+                "version": version,
+                "saved_at": time.time(),
+                "count": len(store),
+                "dim": store.dim,
+                "dtype": store.dtype,
+                "ann": None,
+                "quantized": None,
+                "metadata": metadata or {}
+            }
+            if store.ann is not None:
+                np.save(staging / "ann_centroids.npy", store.ann.centroids)
+                np.save(staging / "ann_assignments.npy", store.ann.assignments)
+                manifest["ann"] = {"trained_size": store.ann.trained_size, "nprobe": store.ann.nprobe}
+            if store.quantized is not None:
+                np.save(staging / "quantized_codes.npy", store.quantized.codes)
+                if store.quantized.scale is not None:
+                    np.save(staging / "quantized_scale.npy", store.quantized.scale)
+                manifest["quantized"] = {"mode": store.quantized.mode}
+
+            (staging / MANIFEST_FILE).write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+            os.replace(staging, self.directory / version)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        with self._locked():
+            current = self._current_version()
+            if current is None or current < version:
+                pointer = self.directory / f".{CURRENT_FILE}-{version}"
+                pointer.write_text(version, encoding="utf-8")
+                os.replace(pointer, self.directory / CURRENT_FILE)
+                current = version
+            else:
+                logger.info(f"더 최근 요약본 디스크 스냅샷이 있어 CURRENT를 유지합니다: {current}")
+            self._remove_old_versions(current)
+        logger.info(f"요약본 디스크 스냅샷 저장: {version} ({len(store)}개, {store.nbytes / 1024:.1f}KB)")
+        return version
+
+    def _remove_old_versions(self, current: str) -> None:
+        """CURRENT보다 오래된 버전 중 최근 keep_versions-1개를 제외하고 삭제 (잠금 안에서 호출)"""
+        older = sorted(
+            path for path in self.directory.iterdir()
+            if path.is_dir() and not path.name.startswith(".") and path.name < current
+        )
+        for path in older[:max(0, len(older) - (self.keep_versions - 1))]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def load(self, version: Optional[str] = None) -> Optional[Tuple[SummaryEmbeddingStore, Dict[str, Any]]]:
+        """버전(기본: CURRENT)을 메모리 매핑으로 로드 → (저장소, manifest), 없거나 형식이 다르면 None"""
+        version = version or self._current_version()
+        if version is None:
+            return None
+        path = self.directory / version
+
+        try:
+            manifest = json.loads((path / MANIFEST_FILE).read_text(encoding="utf-8"))
+            if manifest.get("format") != SNAPSHOT_FORMAT:
+                logger.info(f"요약본 디스크 스냅샷 형식이 달라 무시합니다: {manifest.get('format')}")
+                return None
+
+            matrix = np.load(path / "matrix.npy", mmap_mode="r")
+            ids = np.load(path / "ids.npy", mmap_mode="r")
+
+            # 현재 설정과 맞는 인덱스만 재사용 (다르면 저장소가 현재 설정으로 다시 학습/양자화)
+            same_dtype = manifest["dtype"] == SUMMARY_EMBEDDING_DTYPE
+            if not same_dtype:
+                logger.info(
+                    f"요약본 디스크 스냅샷 dtype이 현재 설정과 달라 변환 후 인덱스를 다시 만듭니다: "
+                    f"{manifest['dtype']} → {SUMMARY_EMBEDDING_DTYPE}"
+                )
+            ann = None
+            if (
+                same_dtype and manifest.get("ann") and SUMMARY_ANN_ENABLED
+                and manifest["count"] >= SUMMARY_ANN_MIN_SIZE
+            ):
+                ann = IVFIndex(
+                    np.load(path / "ann_centroids.npy", mmap_mode="r"),
+                    np.load(path / "ann_assignments.npy", mmap_mode="r"),
+                    trained_size=manifest["ann"]["trained_size"],
+                    nprobe=SUMMARY_ANN_NPROBE
+                )
+            quantized = None
+            if same_dtype and manifest.get("quantized") and manifest["quantized"]["mode"] == SUMMARY_QUANTIZATION:
+                scale_path = path / "quantized_scale.npy"
+                quantized = QuantizedIndex(
+                    manifest["quantized"]["mode"],
+                    np.load(path / "quantized_codes.npy", mmap_mode="r"),
+                    np.load(scale_path) if scale_path.exists() else None
+                )
+
+            store = SummaryEmbeddingStore(ids, matrix, SUMMARY_EMBEDDING_DTYPE, ann, quantized)
+            logger.info(f"요약본 디스크 스냅샷 로드: {version} ({len(store)}개)")
+            return store, manifest
+        except Exception as e:
+            logger.warning(f"요약본 디스크 스냅샷 로드 실패, 원격 조회로 진행합니다: {str(e)}")
+            return None
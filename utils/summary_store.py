@@ -0,0 +1,218 @@
+"""
+요약본 임베딩 저장소 (연속 float32/float16 행렬 + script_id 테이블)
+"""
+
+import logging
+import mmap
+import tempfile
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import (
+    SUMMARY_ANN_ENABLED, SUMMARY_ANN_MIN_SIZE, SUMMARY_ANN_NPROBE,
+    SUMMARY_QUANTIZATION, SUMMARY_RERANK_CANDIDATES
+)
+from utils.ann_index import IVFIndex
+from utils.quantization import QuantizedIndex
+from utils.similarity import SimilarityIndex, normalize_rows
+
+logger = logging.getLogger(__name__)
+
+def is_memory_mapped(array: np.ndarray) -> bool:
+    """배열(또는 그 원본)이 메모리 매핑 파일인지"""
+    base = array
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return True
+        base = getattr(base, "base", None)
+    return False
+
+def map_to_temp_file(matrix: np.ndarray) -> np.ndarray:
+    """행렬을 이름 없는 임시 파일에 쓰고 읽기 전용 메모리 매핑으로 반환 (프로세스 메모리 대신 페이지 캐시에 둠)"""
+    with tempfile.TemporaryFile() as handle:
+        np.ascontiguousarray(matrix).tofile(handle)
+        handle.flush()
+        return np.memmap(handle, dtype=matrix.dtype, mode="r", shape=matrix.shape)
+
+class SummaryEmbeddingStore:
+    """요약본 임베딩을 하나의 정규화된 행렬로 보관하는 저장소
+
+    - matrix: (요약본 수 x 차원) 정규화된 float32 (또는 float16) 행렬
+    - ids: script_id 배열, row_by_id: script_id → 행 번호
+    - ann: 요약본 수가 SUMMARY_ANN_MIN_SIZE 이상이면 IVF 인덱스로 후보를 줄인 뒤 정확히 재채점
+    - quantized: SUMMARY_QUANTIZATION(int8/binary) 설정 시 양자화 코드로 후보를 고른 뒤 정확히 재채점
+      이때 메모리에는 코드만 두고, 재채점용 행렬은 메모리 매핑(디스크 스냅샷 또는 임시 파일)으로 두어
+      후보 행만 읽는다.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        matrix: np.ndarray,
+        dtype: str = "float32",
+        ann: Optional[IVFIndex] = None,
+        quantized: Optional[QuantizedIndex] = None
+    ):
+        self.ids = np.asarray(list(ids), dtype=str)
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.dtype(dtype))
+        self.dtype = self.matrix.dtype.name
+        self.row_by_id: Dict[str, int] = {sid: i for i, sid in enumerate(self.ids.tolist())}
+        self.ann = ann if ann is not None else self._build_ann()
+        self.quantized = quantized if quantized is not None else self._build_quantized()
+        if self.quantized is not None and self.matrix.size and not is_memory_mapped(self.matrix):
+            self.matrix = map_to_temp_file(self.matrix)
+        self._index = SimilarityIndex(self.matrix, normalized=True)
+
+    def _build_ann(self) -> Optional[IVFIndex]:
+        """말뭉치가 충분히 클 때만 IVF 인덱스 생성 (작으면 전수 검색)"""
+        if not SUMMARY_ANN_ENABLED or len(self) < SUMMARY_ANN_MIN_SIZE:
+            return None
+        try:
+            return IVFIndex.train(self.matrix, nprobe=SUMMARY_ANN_NPROBE)
+        except Exception as e:
+            logger.warning(f"IVF 인덱스 생성 실패, 전수 검색으로 진행합니다: {str(e)}")
+            return None
+
+    def _build_quantized(self) -> Optional[QuantizedIndex]:
+        """양자화 후보 인덱스 생성 (설정이 none이거나 비어 있으면 생략)"""
+        if SUMMARY_QUANTIZATION not in QuantizedIndex.MODES or len(self) == 0:
+            return None
+        try:
+            return QuantizedIndex.from_matrix(self.matrix, SUMMARY_QUANTIZATION)
+        except Exception as e:
+            logger.warning(f"요약본 양자화 실패, 원본 행렬로 검색합니다: {str(e)}")
+            return None
+
+    @staticmethod
+    def _collect_rows(items: Iterable[Tuple[str, List[float]]]) -> Dict[str, List[float]]:
+        """(script_id, embedding) 스트림을 dict로 모음 (같은 script_id는 마지막 값 사용)"""
+        rows: Dict[str, List[float]] = {}
+        for script_id, embedding in items:
+            rows[str(script_id)] = embedding
+        return rows
+
+    @staticmethod
+    def _drop_mismatched(rows: Dict[str, List[float]], dim: Optional[int] = None) -> Dict[str, List[float]]:
+        """차원이 다른 임베딩 제외 (dim 미지정 시 가장 많은 차원 기준)"""
+        dims = {len(vector) for vector in rows.values()}
+        if dim is None:
+            if len(dims) <= 1:
+                return rows
+            dim = max(dims, key=lambda d: sum(1 for v in rows.values() if len(v) == d))
+        elif dims <= {dim}:
+            return rows
+        skipped = [sid for sid, vector in rows.items() if len(vector) != dim]
+        logger.warning(f"요약본 임베딩 차원 불일치로 {len(skipped)}개 제외: {skipped[:5]}")
+        return {sid: vector for sid, vector in rows.items() if len(vector) == dim}
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[str, List[float]]], dtype: str = "float32") -> "SummaryEmbeddingStore":
+        """(script_id, embedding) 스트림에서 저장소 생성 (같은 script_id는 마지막 값 사용)"""
+        rows = cls._drop_mismatched(cls._collect_rows(items))
+        if not rows:
+            return cls.empty(dtype)
+
+        ids = list(rows.keys())
+        matrix = normalize_rows(np.asarray([rows[sid] for sid in ids], dtype=np.float32))
+        return cls(ids, matrix, dtype)
+
+    @classmethod
+    def empty(cls, dtype: str = "float32") -> "SummaryEmbeddingStore":
+        """빈 저장소"""
+        return cls([], np.empty((0, 0), dtype=np.float32), dtype)
+
+    def upsert(self, items: Iterable[Tuple[str, List[float]]]) -> "SummaryEmbeddingStore":
+        """요약본 추가/갱신을 반영한 새 저장소 반환 (기존 저장소는 그대로 읽기 가능)
+
+        IVF 인덱스는 재학습 없이 새 행만 역리스트에 삽입하고, 크기가 학습 시점의 4배를 넘으면 재학습한다.
+        """
+        rows = self._collect_rows(items)
+        if not rows:
+            return self
+        if len(self) == 0:
+            return SummaryEmbeddingStore.from_items(rows.items(), dtype=self.dtype)
+
+        rows = self._drop_mismatched(rows, self.dim)
+        updated_ids = [sid for sid in rows if sid in self.row_by_id]
+        new_ids = [sid for sid in rows if sid not in self.row_by_id]
+
+        matrix = np.array(self.matrix, dtype=self.matrix.dtype)
+        if updated_ids:
+            updated_rows = np.array([self.row_by_id[sid] for sid in updated_ids], dtype=np.int64)
+            matrix[updated_rows] = normalize_rows(np.asarray([rows[sid] for sid in updated_ids], dtype=np.float32))
+        if new_ids:
+            new_matrix = normalize_rows(np.asarray([rows[sid] for sid in new_ids], dtype=np.float32))
+            matrix = np.concatenate([matrix, new_matrix.astype(matrix.dtype)], axis=0)
+
+        ann = None
+        if self.ann is not None and not self.ann.needs_retrain():
+            ann = self.ann.copy()
+            if updated_ids:
+                ann.update(updated_rows, matrix[updated_rows])
+            if new_ids:
+                ann.add(matrix[len(self):])
+
+        quantized = None
+        if self.quantized is not None:
+            quantized = self.quantized.copy()
+            if updated_ids:
+                quantized.update(updated_rows, matrix[updated_rows])
+            if new_ids:
+                quantized.add(matrix[len(self):])
+
+        logger.info(f"요약본 저장소 갱신: {len(updated_ids)}개 수정, {len(new_ids)}개 추가")
+        return SummaryEmbeddingStore(self.ids.tolist() + new_ids, matrix, self.dtype, ann, quantized)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, script_id: str) -> bool:
+        return script_id in self.row_by_id
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1] if self.matrix.ndim == 2 else 0
+
+    @property
+    def nbytes(self) -> int:
+        """프로세스 메모리에 상주하는 바이트 (메모리 매핑된 행렬 제외)"""
+        quantized_bytes = self.quantized.codes.nbytes if self.quantized is not None else 0
+        matrix_bytes = 0 if is_memory_mapped(self.matrix) else self.matrix.nbytes
+        return int(matrix_bytes + self.ids.nbytes + quantized_bytes)
+
+    def get_embedding(self, script_id: str) -> Optional[np.ndarray]:
+        """정규화된 요약본 임베딩 (없으면 None)"""
+        row = self.row_by_id.get(script_id)
+        return None if row is None else self.matrix[row]
+
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        top_k: int = 5,
+        threshold: Optional[float] = None,
+        inclusive: bool = True,
+        nprobe: Optional[int] = None,
+        exact: bool = False
+    ) -> List[Tuple[str, float]]:
+        """쿼리와 유사한 요약본 검색 → [(script_id, 유사도)] (유사도 내림차순)
+
+        nprobe: IVF 탐색 리스트 수 (클수록 재현율↑, 지연↑), exact=True면 항상 전수 검색
+        후보 단계(IVF → 양자화 코드)를 거친 뒤 임계값/top_k는 원본 행렬 점수로 적용한다.
+        """
+        if len(self) == 0 or query_embedding is None or len(query_embedding) == 0:
+            return []
+
+        candidates = None
+        if not exact and (self.ann is not None or self.quantized is not None):
+            query = normalize_rows(np.asarray(query_embedding, dtype=np.float32))[0]
+            if self.ann is not None:
+                candidates = self.ann.candidates(query, nprobe)
+            if self.quantized is not None:
+                count = max(top_k * 10, SUMMARY_RERANK_CANDIDATES)
+                candidates = self.quantized.candidates(query, count, candidates)
+
+        return [
+            (str(self.ids[row]), similarity)
+            for row, similarity in self._index.search(query_embedding, top_k, threshold, inclusive, candidates)
+        ]
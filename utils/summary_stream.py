@@ -0,0 +1,250 @@
+"""
+요약본 응답 스트리밍 디코더 (청크 단위 JSON 스캐너 → float32 행 버퍼)
+"""
+
+import codecs
+import json
+import logging
+import re
+from typing import Any, BinaryIO, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SCALAR_END = re.compile(r"[,\]\}\s]")
+# 숫자 배열 본문에 올 수 없는 문자 (이 문자가 없으면 임베딩 행으로 보고 한 번에 디코딩)
+_NON_NUMERIC = re.compile(r"[^0-9eE+\-.,\s]")
+_NUMBER_START = "-0123456789"
+# 요약본 항목에서 임베딩을 담는 필드 (이 필드의 숫자 배열만 행 버퍼에 기록)
+_EMBEDDING_KEYS = ("embedding", "vector")
+# script_id → 임베딩 매핑을 감싸는 필드
+_WRAPPER_KEYS = ("all_summaries", "selected_summary")
+
+class _RowBuffer:
+    """임베딩 행을 차례로 기록하는 float32 버퍼 (가득 차면 2배로 재할당)"""
+
+    def __init__(self, initial_rows: int = 1024):
+        self.initial_rows = initial_rows
+        self.buffer: Optional[np.ndarray] = None
+        self.count = 0
+
+    def append(self, values: List[float]) -> int:
+        """행 기록 후 행 번호 반환 (첫 임베딩과 차원이 다르면 ValueError)"""
+        if self.buffer is None:
+            self.buffer = np.empty((self.initial_rows, len(values)), dtype=np.float32)
+        if len(values) != self.buffer.shape[1]:
+            raise ValueError(
+                f"요약본 임베딩 차원 불일치: {self.count + 1}번째 임베딩 {len(values)}차원 (첫 임베딩 {self.buffer.shape[1]}차원)"
+            )
+        if self.count == len(self.buffer):
+            grown = np.empty((len(self.buffer) * 2, self.buffer.shape[1]), dtype=np.float32)
+            grown[:self.count] = self.buffer[:self.count]
+            self.buffer = grown
+        self.buffer[self.count] = values
+        self.count += 1
+        return self.count - 1
+
+    def matrix(self) -> np.ndarray:
+        if self.buffer is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self.buffer[:self.count]
+
+class _Row:
+    """디코딩 중 임베딩 자리 표시 (버퍼 재할당이 끝난 뒤 행 뷰로 교체)"""
+
+    __slots__ = ("index",)
+
+    def __init__(self, index: int):
+        self.index = index
+
+class _StreamScanner:
+    """바이트 스트림을 청크 단위로 읽으며 JSON 값을 하나씩 디코딩
+
+    구조(객체/문자열/스칼라)는 파이썬 값으로 만들고, 숫자로만 된 배열은 json 디코더로 한 번에 읽는다.
+    요약본 항목의 embedding/vector 필드 값만 _RowBuffer에 기록하고, script_id → 배열 매핑의 값은
+    개별 float32 배열로, 그 밖의 숫자 배열은 일반 리스트로 둔다. 버퍼에는 아직 처리하지 않은 부분만 남긴다.
+    """
+
+    def __init__(self, stream: BinaryIO, rows: _RowBuffer, chunk_size: int = 1 << 20):
+        self.stream = stream
+        self.rows = rows
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """다음 청크를 읽어 버퍼 뒤에 붙임 (처리한 앞부분은 버림, 더 읽을 게 없으면 False)"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if chunk:
+            text = self.text_decoder.decode(chunk)
+        else:
+            self.eof = True
+            text = self.text_decoder.decode(b"", final=True)
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"요약본 응답 JSON 형식 오류: {message} (근처: {self.buf[self.pos:self.pos + 40]!r})")
+
+    def _peek(self) -> str:
+        """공백을 건너뛴 다음 문자 (끝이면 빈 문자열)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise self._error(f"'{char}' 필요")
+        self.pos += 1
+
+    def value(self, slot: Optional[str] = None, mapping: bool = False) -> Any:
+        """다음 JSON 값 디코딩
+
+        slot: "embedding"(임베딩 필드 값) / "mapping"(script_id → 배열 매핑의 값) / None
+        mapping: 객체라면 script_id → 임베딩 매핑일 수 있는지 (최상위 또는 래핑 필드 값)
+        """
+        char = self._peek()
+        if char == "{":
+            return self._object(mapping)
+        if char == "[":
+            return self._array(slot)
+        if char == '"':
+            return self._string()
+        if char == "":
+            raise self._error("예상치 못한 응답 끝")
+        return self._scalar()
+
+    def _string(self) -> str:
+        while True:
+            try:
+                text, end = json.decoder.scanstring(self.buf, self.pos + 1)
+                self.pos = end
+                return text
+            except ValueError:
+                if not self._fill():
+                    raise self._error("닫히지 않은 문자열")
+
+    def _scalar(self) -> Any:
+        """숫자/true/false/null (구분자가 버퍼에 들어올 때까지 읽은 뒤 디코딩)"""
+        while not _SCALAR_END.search(self.buf, self.pos) and self._fill():
+            pass
+        try:
+            value, self.pos = self.decoder.raw_decode(self.buf, self.pos)
+        except ValueError:
+            raise self._error("알 수 없는 값")
+        return value
+
+    def _object(self, mapping: bool = False) -> Dict[str, Any]:
+        self.pos += 1
+        result: Dict[str, Any] = {}
+        if self._peek() == "}":
+            self.pos += 1
+            return result
+        while True:
+            if self._peek() != '"':
+                raise self._error("객체 키는 문자열이어야 함")
+            key = self._string()
+            self._expect(":")
+            if key in _EMBEDDING_KEYS:
+                result[key] = self.value(slot="embedding")
+            else:
+                result[key] = self.value(slot="mapping" if mapping else None, mapping=key in _WRAPPER_KEYS)
+            char = self._peek()
+            self.pos += 1
+            if char == "}":
+                return result
+            if char != ",":
+                raise self._error("',' 또는 '}' 필요")
+
+    def _first_item_char(self) -> str:
+        """'[' 바로 뒤 첫 값의 시작 문자 (버퍼 위치는 '['에 그대로 둠)"""
+        while True:
+            index = _WHITESPACE.match(self.buf, self.pos + 1).end()
+            if index < len(self.buf):
+                return self.buf[index]
+            if not self._fill():
+                return ""
+
+    def _array(self, slot: Optional[str] = None) -> Any:
+        first = self._first_item_char()
+        if first and first in _NUMBER_START:
+            row = self._number_row(slot)
+            if row is not None:
+                return row
+
+        self.pos += 1
+        items: List[Any] = []
+        if self._peek() == "]":
+            self.pos += 1
+            return items
+        while True:
+            items.append(self.value())
+            char = self._peek()
+            self.pos += 1
+            if char == "]":
+                return items
+            if char != ",":
+                raise self._error("',' 또는 ']' 필요")
+
+    def _number_row(self, slot: Optional[str]) -> Any:
+        """숫자로만 된 배열을 한 번에 디코딩 (숫자 배열이 아니면 None)
+
+        임베딩 필드 값은 행 버퍼에 기록(첫 임베딩과 차원이 다르면 ValueError), 매핑 값은 float32 배열,
+        그 밖의 배열은 float 리스트로 반환한다.
+        """
+        end = self.buf.find("]", self.pos)
+        while end < 0:
+            if not self._fill():
+                raise self._error("닫히지 않은 배열")
+            end = self.buf.find("]", self.pos)
+        if _NON_NUMERIC.search(self.buf, self.pos + 1, end):
+            return None
+
+        values, self.pos = self.decoder.raw_decode(self.buf, self.pos)
+        if slot == "embedding":
+            return _Row(self.rows.append(values))
+        if slot == "mapping":
+            return np.asarray(values, dtype=np.float32)
+        return values
+
+def _resolve_rows(value: Any, matrix: np.ndarray) -> Any:
+    """자리 표시(_Row)를 최종 버퍼의 행 뷰로 교체"""
+    if isinstance(value, _Row):
+        return matrix[value.index]
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, (_Row, dict, list)):
+                value[key] = _resolve_rows(item, matrix)
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            if isinstance(item, (_Row, dict, list)):
+                value[i] = _resolve_rows(item, matrix)
+    return value
+
+def decode_summary_stream(stream: BinaryIO, chunk_size: int = 1 << 20) -> Any:
+    """JSON 응답을 청크 단위로 읽어 구조는 dict/list로, 숫자 배열(임베딩)은 float32 행 뷰로 디코딩
+
+    모든 임베딩 행은 하나의 연속 float32 버퍼에 기록되므로 응답 전체를 파이썬 float 리스트로 만들지 않는다.
+    응답 형태 해석은 호출 측(SummaryResponseParser)이 그대로 담당한다.
+    요약본 항목의 embedding/vector 필드만 임베딩으로 보며, 첫 임베딩과 차원이 다르면 ValueError.
+    """
+    rows = _RowBuffer()
+    scanner = _StreamScanner(stream, rows, chunk_size)
+    root = scanner.value(mapping=True)
+    if scanner._peek() != "":
+        raise scanner._error("값 뒤에 남은 데이터")
+
+    matrix = rows.matrix()
+    logger.info(f"요약본 응답 스트리밍 디코딩 완료: 임베딩 {len(matrix)}행, {matrix.nbytes / 1024:.1f}KB")
+    return _resolve_rows(root, matrix)
@@ -1,30 +1,187 @@
-from typing import List, Dict
+import hashlib
+from collections import deque
+from typing import Deque, List, Dict, Optional, Tuple
 import re
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+# 키워드/유사도 계산용 단어 패턴 (한글, 영문, 숫자)
+WORD_PATTERN = re.compile(r'[가-힣a-z0-9]+')
+
+# 불용어 (간단한 버전)
+STOPWORDS = frozenset({
+    '그리고', '그런데', '하지만', '그러나', '또한', '따라서', '그래서', '이런', '저런',
+    '이것', '저것', '그것', '여기서', '거기서', '저기서', '때문에', '그런지',
+    'and', 'or', 'but', 'the', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 'with'
+})
+
+# 분할 구분자 (앞에서부터 본문에 있는 첫 구분자로 나누고, 긴 조각은 다음 구분자로 재분할)
+CHUNK_SEPARATORS = ["\n\n", "\n", ". ", ".", "! ", "? ", " "]
+
+def _split_spans(text: str, start: int, end: int, separator: str) -> List[Tuple[int, int]]:
+    """text[start:end]를 separator 위치에서 나눈 (start, end) 목록 (구분자는 뒤 조각 앞에 붙임, 빈 조각 제외)"""
+    if not separator:
+        return [(i, i + 1) for i in range(start, end)]
+    spans = []
+    piece_start = start
+    position = text.find(separator, start, end)
+    while position != -1:
+        if position > piece_start:
+            spans.append((piece_start, position))
+        piece_start = position
+        position = text.find(separator, position + len(separator), end)
+    if end > piece_start:
+        spans.append((piece_start, end))
+    return spans
+
+def _strip_span(text: str, start: int, end: int) -> Optional[Tuple[int, int]]:
+    """앞뒤 공백을 제외한 범위 (공백뿐이면 None)"""
+    piece = text[start:end]
+    left = piece.lstrip()
+    if not left:
+        return None
+    start += len(piece) - len(left)
+    return start, start + len(left.rstrip())
+
+def split_text_spans(text: str, chunk_size: int = 1000, chunk_overlap: int = 200,
+                     separators: Optional[List[str]] = None) -> List[Tuple[int, int]]:
+    """텍스트를 청크 범위 (start, end) 목록으로 분할
+
+    LangChain RecursiveCharacterTextSplitter(keep_separator=True, strip_whitespace=True)와 같은
+    청크를 만들되, 문자열 복사 없이 원문 위치만 다룬다. text[start:end]가 청크 본문이다.
+    """
+    if chunk_overlap > chunk_size:
+        raise ValueError(f"chunk_overlap({chunk_overlap})이 chunk_size({chunk_size})보다 큽니다.")
+    separators = separators or CHUNK_SEPARATORS
+    spans: List[Tuple[int, int]] = []
+
+    def _merge(pieces: List[Tuple[int, int]]) -> None:
+        # 인접 조각을 chunk_size 이하로 이어 붙이고, 다음 청크는 끝에서 chunk_overlap 이하 조각부터 시작
+        current: Deque[Tuple[int, int]] = deque()
+        total = 0
+        for piece_start, piece_end in pieces:
+            length = piece_end - piece_start
+            if total + length > chunk_size and current:
+                stripped = _strip_span(text, current[0][0], current[-1][1])
+                if stripped is not None:
+                    spans.append(stripped)
+                while total > chunk_overlap or (total + length > chunk_size and total > 0):
+                    first_start, first_end = current.popleft()
+                    total -= first_end - first_start
+            current.append((piece_start, piece_end))
+            total += length
+        if current:
+            stripped = _strip_span(text, current[0][0], current[-1][1])
+            if stripped is not None:
+                spans.append(stripped)
+
+    def _split(start: int, end: int, remaining: List[str]) -> None:
+        separator = remaining[-1]
+        next_separators: List[str] = []
+        for i, candidate in enumerate(remaining):
+            if not candidate or text.find(candidate, start, end) != -1:
+                separator = candidate
+                next_separators = remaining[i + 1:]
+                break
+
+        good: List[Tuple[int, int]] = []
+        for piece_start, piece_end in _split_spans(text, start, end, separator):
+            if piece_end - piece_start < chunk_size:
+                good.append((piece_start, piece_end))
+                continue
+            if good:
+                _merge(good)
+                good = []
+            if next_separators:
+                _split(piece_start, piece_end, next_separators)
+            else:
+                # 더 나눌 구분자가 없으면 긴 조각을 그대로 사용
+                spans.append((piece_start, piece_end))
+        if good:
+            _merge(good)
+
+    _split(0, len(text), separators)
+    return spans
 
 def chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[Dict]:
-    """텍스트를 청크로 분할 (LangChain RecursiveCharacterTextSplitter 사용)"""
+    """텍스트를 청크로 분할 (원문 기준 start/end 위치 포함)"""
     if not text:
         return []
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        separators=["\n\n", "\n", ". ", ".", "! ", "? ", " "]
+    return [
+        {
+            "chunk_text": text[start:end],
+            "chunk_index": idx,
+            "start": start,
+            "end": end
+        }
+        for idx, (start, end) in enumerate(split_text_spans(text, chunk_size, chunk_overlap))
+    ]
+
+def speaker_turn_text(segments: List[Dict]) -> str:
+    """segments를 "speaker: text" 줄(줄바꿈 구분)로 이어 붙인 원문 (ScriptFetcher의 content와 같음)"""
+    return "\n".join(
+        f"{segment['speaker']}: {segment['text']}" if segment.get("speaker") else segment["text"]
+        for segment in segments
     )
 
-    docs = splitter.create_documents([text])
+def chunk_speaker_turns(segments: List[Dict], chunk_size: int = 1000, resume_from: int = 0) -> List[Dict]:
+    """화자 발화(segment) 단위 청킹
+
+    segments를 ScriptFetcher와 같은 "speaker: text" 줄(줄바꿈 구분)로 이어 붙인 원문을 기준으로,
+    연속된 발화를 chunk_size 이하로 통째로 묶는다. 문자 겹침 대신 발화 경계에서 나누며,
+    chunk_size보다 긴 발화 하나만 문장 구분자로 나눈다 (겹침 없음).
+    각 청크에 원문 start/end, 화자 목록(speakers), 발화 ID 목록(segment_ids)을 담는다.
+    resume_from을 주면 그 위치 이후에 시작하는 발화만 청킹한다 (증분 청킹, 위치는 원문 기준 유지).
+    """
+    turns: List[Tuple[int, int, str, object]] = []  # (start, end, speaker, segment_id)
+    lines: List[str] = []
+    offset = 0
+    for segment in segments:
+        speaker = segment.get("speaker") or ""
+        line = f"{speaker}: {segment['text']}" if speaker else segment["text"]
+        turns.append((offset, offset + len(line), speaker, segment.get("segment_id")))
+        lines.append(line)
+        offset += len(line) + 1
+    text = "\n".join(lines)
 
     chunks: List[Dict] = []
-    for idx, doc in enumerate(docs):
+
+    def _emit(start: int, end: int, group: List[Tuple[int, int, str, object]]) -> None:
         chunks.append({
-            "chunk_text": doc.page_content,
-            "chunk_index": idx,
-            # start/end는 TextSplitter에서 직접 제공되지 않으므로 생략
+            "chunk_text": text[start:end],
+            "chunk_index": len(chunks),
+            "start": start,
+            "end": end,
+            "speakers": list(dict.fromkeys(speaker for _, _, speaker, _ in group if speaker)),
+            "segment_ids": [segment_id for _, _, _, segment_id in group]
         })
 
+    group: List[Tuple[int, int, str, object]] = []
+    for turn in turns:
+        turn_start, turn_end = turn[0], turn[1]
+        if turn_start < resume_from:
+            continue
+        if group and turn_end - group[0][0] > chunk_size:
+            _emit(group[0][0], group[-1][1], group)
+            group = []
+        if turn_end - turn_start > chunk_size:
+            # 긴 발화는 단독으로 나눠 담음
+            for start, end in split_text_spans(text[turn_start:turn_end], chunk_size, 0):
+                _emit(turn_start + start, turn_start + end, [turn])
+            continue
+        group.append(turn)
+    if group:
+        _emit(group[0][0], group[-1][1], group)
+
     return chunks
 
+def hash_chunk_texts(texts: List[str]) -> str:
+    """청크 텍스트 목록의 내용 해시 (저장된 행렬/색인이 같은 청크 목록인지 확인용)"""
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
 def clean_text(text: str) -> str:
     """텍스트 정리"""
     if not text:
@@ -50,16 +207,10 @@ def extract_keywords_simple(text: str, max_keywords: int = 10) -> List[str]:
     text = clean_text(text.lower())
     
     # 단어 추출 (한글, 영문, 숫자만)
-    words = re.findall(r'[가-힣a-z0-9]+', text)
-    
-    # 불용어 제거 (간단한 버전)
-    stopwords = {
-        '그리고', '그런데', '하지만', '그러나', '또한', '따라서', '그래서', '이런', '저런',
-        '이것', '저것', '그것', '여기서', '거기서', '저기서', '때문에', '그런지',
-        'and', 'or', 'but', 'the', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 'with'
-    }
+    words = WORD_PATTERN.findall(text)
     
-    words = [word for word in words if word not in stopwords and len(word) > 1]
+    # 불용어 제거
+    words = [word for word in words if word not in STOPWORDS and len(word) > 1]
     
     # 빈도 계산
     word_freq = {}
@@ -79,8 +230,8 @@ def calculate_text_similarity(text1: str, text2: str) -> float:
     if not text1 or not text2:
         return 0.0
     
-    words1 = set(re.findall(r'[가-힣a-z0-9]+', text1.lower()))
-    words2 = set(re.findall(r'[가-힣a-z0-9]+', text2.lower()))
+    words1 = set(WORD_PATTERN.findall(text1.lower()))
+    words2 = set(WORD_PATTERN.findall(text2.lower()))
     
     if not words1 or not words2:
         return 0.0